@@ -0,0 +1,432 @@
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import (RISK_LEVELS, baggage_records, lost_baggage_records, scale_openflights,
+                                 write_raw_dataset)
+from src.baggage.baggage_flow import Baggage, BaggageIndex, BaggageMinHeap
+from src.baggage.baggage_store import BaggageStore
+from src.baggage.lost_baggage_tracker import LostBaggageTracker, open_tracker
+from src.baggage.scan_ingest import ScanIngestPipeline, write_scan_events
+from src.graph.cleaning import (build_airport_id_map, clean_airports, clean_route_chunk, generate_cleaning_report,
+                                load_airports_local, load_routes_clean, load_routes_local, run_full_cleaning_pipeline)
+from src.graph.flight_graph import WEIGHT_KEYS, FlightGraph
+from src.graph.graph_snapshot import read_snapshot, write_snapshot
+from src.graph.spatial import AirportIndex
+
+# ---------- RESULTS ----------
+# Every measurement is one record:
+#   {"suite", "name", "params", "times" (seconds per repeat), "min", "median", "digest"}
+# digest summarizes the answers (e.g. summed path costs), so a run compared
+# against a baseline catches wrong results as well as slow ones.
+RESULT_FORMAT = 1
+
+class Recorder:
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results = []
+
+    def measure(self, suite: str, name: str, fn, repeat=None, setup=None, **params):
+        """Time fn() repeat times (after setup(), untimed, if given); returns the last result"""
+        times = []
+        result = None
+        for _ in range(repeat or self.repeat):
+            args = setup() if setup else ()
+            start = time.perf_counter()
+            result = fn(*args)
+            times.append(time.perf_counter() - start)
+        record = {"suite": suite, "name": name, "params": params, "times": times,
+                  "min": min(times), "median": statistics.median(times), "digest": None}
+        self.results.append(record)
+        print(f"  {name:<38} {json.dumps(params):<48} median {record['median'] * 1000:10.2f} ms")
+        return result, record
+
+def run_metadata(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"format": RESULT_FORMAT, "commit": commit, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0], "numpy": np.__version__, "pandas": pd.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count(), "args": vars(args)}
+
+# ---------- CLEANING AND GRAPH BUILD ----------
+def bench_cleaning(rec: Recorder, scale: int, raw_paths, work_dir: str):
+    """Each run_full_cleaning_pipeline stage on its own, then the whole pipeline cold and cached"""
+    airports_src, routes_src = raw_paths
+    suite = "cleaning"
+    airports_raw, _ = rec.measure(suite, "load_airports_local", lambda: load_airports_local(airports_src), scale=scale)
+    airports_clean, _ = rec.measure(suite, "clean_airports", clean_airports,
+                                    setup=lambda: (airports_raw.copy(),), scale=scale)
+    rec.measure(suite, "AirportIndex.from_airports", lambda: AirportIndex.from_airports(airports_clean), scale=scale)
+    routes_raw, _ = rec.measure(suite, "load_routes_local", lambda: load_routes_local(routes_src), scale=scale)
+    id_map, _ = rec.measure(suite, "build_airport_id_map",
+                            lambda: build_airport_id_map(airports_clean, airports_raw), scale=scale)
+    (routes_clean, _, summary), record = rec.measure(suite, "clean_route_chunk", clean_route_chunk,
+                                                     setup=lambda: (routes_raw.copy(), airports_clean, id_map),
+                                                     scale=scale)
+    record["digest"] = summary
+    log_path = os.path.join(work_dir, "unresolved_routes_log.csv")
+    clean_route_chunk(routes_raw.copy(), airports_clean, id_map)[1].to_csv(log_path, index=False)
+    rec.measure(suite, "generate_cleaning_report",
+                lambda: generate_cleaning_report(airports_raw, airports_clean, routes_raw, summary, log_path),
+                scale=scale)
+    routes_path = os.path.join(work_dir, "routes.csv")
+    rec.measure(suite, "routes.to_csv", lambda: routes_clean.to_csv(routes_path, index=False), scale=scale)
+    routes_df, _ = rec.measure(suite, "load_routes_clean", lambda: load_routes_clean(routes_path), scale=scale)
+
+    suite = "graph_build"
+    graph, record = rec.measure(suite, "FlightGraph.from_routes_df", lambda: FlightGraph.from_routes_df(routes_df),
+                                scale=scale)
+    record["digest"] = {"nodes": graph.num_nodes, "edges": graph.num_edges}
+    rec.measure(suite, "set_coordinates", lambda: graph.set_coordinates(
+        airports_clean.index, airports_clean["Latitude"], airports_clean["Longitude"]), scale=scale)
+    graph_path = os.path.join(work_dir, "routes.graph")
+    rec.measure(suite, "write_snapshot", lambda: write_snapshot(graph, graph_path), scale=scale)
+    rec.measure(suite, "read_snapshot", lambda: read_snapshot(graph_path), scale=scale)
+
+    suite = "pipeline"
+    out_dir = os.path.join(work_dir, "out")
+    cache_dir = os.path.join(work_dir, "cache")
+
+    def run(cache):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return run_full_cleaning_pipeline(airports_src, routes_src, out_dir=out_dir, cache_dir=cache)
+    rec.measure(suite, "run_full_cleaning_pipeline", lambda: run(None), scale=scale, cache="off")
+    rec.measure(suite, "run_full_cleaning_pipeline", lambda: run(cache_dir), scale=scale, cache="cold",
+                setup=lambda: shutil.rmtree(cache_dir, ignore_errors=True) or ())
+    rec.measure(suite, "run_full_cleaning_pipeline", lambda: run(cache_dir), scale=scale, cache="warm")
+    return read_snapshot(graph_path)
+
+# ---------- PATH QUERIES ----------
+def query_pairs(graph: FlightGraph, count: int, seed: int):
+    """A fixed list of (source, target) codes for a graph and seed"""
+    rng = random.Random(seed)
+    codes = graph.node_codes
+    return [(rng.choice(codes), rng.choice(codes)) for _ in range(count)]
+
+def _digest(answers):
+    # Summed costs of the answered queries plus how many had no route
+    costs = [a[0] for a in answers if a[0] is not None]
+    return {"answered": len(costs), "unreachable": len(answers) - len(costs), "total_cost": round(sum(costs), 6)}
+
+def bench_queries(rec: Recorder, scale: int, graph: FlightGraph, count: int, bf_count: int, seed: int):
+    pairs = query_pairs(graph, count, seed)
+    bf_pairs = pairs[:bf_count]
+    searches = [
+        ("dijkstra", graph.dijkstra, pairs),
+        ("astar", graph.astar, pairs),
+        ("bidirectional_dijkstra", graph.bidirectional_dijkstra, pairs),
+        ("bellman_ford", graph.bellman_ford, bf_pairs),
+        ("spfa", graph.spfa, bf_pairs),
+        ("bellman_ford_vectorized", graph.bellman_ford_vectorized, bf_pairs),
+    ]
+    for weight_key in WEIGHT_KEYS:
+        for name, search, batch in searches:
+            # Measure the searches themselves, not the shortest-path tree cache
+            budget = graph.tree_cache.max_bytes
+            graph.tree_cache.resize(0)
+            answers, record = rec.measure("queries", name, lambda: [search(s, t, weight_key) for s, t in batch],
+                                          scale=scale, weight=weight_key, queries=len(batch))
+            graph.tree_cache.resize(budget)
+            record["digest"] = _digest(answers)
+
+    # Repeated origins, as a route server sees them: fresh targeted searches against the tree cache
+    hub_pairs = [(pairs[i % 32][0], t) for i, (_, t) in enumerate(pairs)]
+    budget = graph.tree_cache.max_bytes
+    for cache, size in (("off", 0), ("on", budget)):
+        graph.tree_cache.resize(size)
+        answers, record = rec.measure("queries", "dijkstra_repeated_origins",
+                                      lambda: [graph.dijkstra(s, t) for s, t in hub_pairs],
+                                      setup=lambda: graph.tree_cache.invalidate() or (), scale=scale,
+                                      weight="distance", queries=len(hub_pairs), tree_cache=cache)
+        record["digest"] = _digest(answers)
+    graph.tree_cache.resize(budget)
+
+# ---------- BAGGAGE STRUCTURES ----------
+def _order_digest(ids) -> str:
+    # Pins the exact order, so a change in tie-breaking shows up as a changed result
+    return hashlib.sha1("\n".join(ids).encode()).hexdigest()[:16]
+
+def _ingest_events(path: str) -> ScanIngestPipeline:
+    pipeline = ScanIngestPipeline()
+    asyncio.run(pipeline.ingest_file(path))
+    return pipeline
+
+def _heap_of(records) -> BaggageMinHeap:
+    heap = BaggageMinHeap()
+    heap.heapify(Baggage(*r) for r in records)
+    return heap
+
+def bench_baggage(rec: Recorder, sizes, seed: int):
+    suite = "baggage"
+    for n in sizes:
+        records = baggage_records(n, seed)
+        bags = [Baggage(*r) for r in records]
+        probes = [r[0] for r in random.Random(seed).sample(records, min(n, 10_000))]
+
+        def build_index(order):
+            index = BaggageIndex()
+            for bag in order:
+                index.insert(bag)
+            return index
+        index, _ = rec.measure(suite, "BaggageIndex.insert", build_index, setup=lambda: (bags,), items=n)
+        # baggage.csv arrives sorted by passenger ID, which a plain BST turns into a list
+        rec.measure(suite, "BaggageIndex.insert", build_index,
+                    setup=lambda: (sorted(bags, key=lambda b: b.passenger_id),), items=n, order="sorted")
+        rec.measure(suite, "BaggageIndex.insert_many", lambda: BaggageIndex().insert_many(bags), items=n)
+        found, record = rec.measure(suite, "BaggageIndex.search",
+                                    lambda: sum(index.search(p) is not None for p in probes),
+                                    items=n, probes=len(probes))
+        record["digest"] = found
+        rec.measure(suite, "BaggageIndex.inorder", index.inorder, items=n)
+        matches, record = rec.measure(suite, "BaggageIndex.filter",
+                                      lambda: len(index.filter(priority=3, bag_type="fragile", risk_level="high")),
+                                      items=n)
+        record["digest"] = matches
+        del index
+
+        store, _ = rec.measure(suite, "BaggageStore.from_records", lambda: BaggageStore.from_records(records), items=n)
+        matches, record = rec.measure(suite, "BaggageStore.filter",
+                                      lambda: len(store.filter(priority=3, bag_type="fragile", risk_level="high")),
+                                      items=n)
+        record["digest"] = matches
+        top, record = rec.measure(suite, "BaggageStore.top_k", lambda: store.top_k(1000), items=n, k=1000)
+        record["digest"] = _order_digest(store.passenger_id[top].tolist())
+        groups, record = rec.measure(suite, "BaggageStore.group_counts",
+                                     lambda: store.group_counts("priority", "bag_type", "risk_level"), items=n)
+        record["digest"] = len(groups)
+        del store
+
+        def build_heap():
+            heap = BaggageMinHeap()
+            for bag in bags:
+                heap.push(bag)
+            return heap
+        heap, _ = rec.measure(suite, "BaggageMinHeap.push", build_heap, items=n)
+
+        def fresh_heap():
+            heap = BaggageMinHeap()
+            heap.heapify(bags)
+            return heap
+        rec.measure(suite, "BaggageMinHeap.heapify", fresh_heap, items=n)
+
+        def drain(heap):
+            return [bag.passenger_id for bag in iter(heap.pop, None)]
+        order, record = rec.measure(suite, "BaggageMinHeap.pop_all", drain, setup=lambda: (fresh_heap(),), items=n)
+        record["digest"] = _order_digest(order)
+        del order
+
+        # update re-ranks the queue it is given, so every run starts from a new one
+        changes = [(p, 1 + i % 5, RISK_LEVELS[i % 3]) for i, p in enumerate(probes)]
+
+        def reprioritize(heap):
+            for pid, priority, risk in changes:
+                heap.update(pid, priority=priority, risk_level=risk)
+            return heap
+        updated, record = rec.measure(suite, "BaggageMinHeap.update", reprioritize,
+                                      setup=lambda: (_heap_of(records),), items=n, probes=len(probes))
+        record["digest"] = _order_digest([bag.passenger_id for bag in iter(updated.pop, None)])
+        del updated
+        rec.measure(suite, "BaggageMinHeap.remove", lambda heap: [heap.remove(p) for p in probes],
+                    setup=lambda: (fresh_heap(),), items=n, probes=len(probes))
+        del heap, bags
+
+        lost = lost_baggage_records(n, seed)
+        lost_probes = [r[0] for r in random.Random(seed).sample(lost, min(n, 10_000))]
+
+        def build_tracker():
+            tracker = LostBaggageTracker()
+            for bag_id, checkpoint, metadata in lost:
+                tracker.insert_baggage(bag_id, checkpoint, metadata)
+            return tracker
+        tracker, _ = rec.measure(suite, "LostBaggageTracker.insert", build_tracker, items=n)
+        rec.measure(suite, "LostBaggageTracker.get_baggage_info",
+                    lambda: [tracker.get_baggage_info(b) for b in lost_probes], items=n, probes=len(lost_probes))
+        rec.measure(suite, "LostBaggageTracker.update_checkpoint",
+                    lambda: [tracker.update_checkpoint(b, "Claims") for b in lost_probes], items=n,
+                    probes=len(lost_probes))
+        rec.measure(suite, "LostBaggageTracker.traverse_order", tracker.traverse_order, items=n)
+        rec.measure(suite, "LostBaggageTracker.remove_baggage",
+                    lambda t: [t.remove_baggage(b) for b in lost_probes], setup=lambda: (build_tracker(),),
+                    items=n, probes=len(lost_probes))
+
+        # The same inserts and updates with every change journaled, then recovery from the journal directory
+        with tempfile.TemporaryDirectory() as tmp:
+            runs = iter(range(1 << 30))
+
+            def journaled(directory):
+                tracker = open_tracker(directory)
+                for bag_id, checkpoint, metadata in lost:
+                    tracker.insert_baggage(bag_id, checkpoint, metadata)
+                for b in lost_probes:
+                    tracker.update_checkpoint(b, "Claims")
+                tracker.journal.close()
+                return directory
+            directory, _ = rec.measure(suite, "TrackerJournal.insert_update", journaled,
+                                       setup=lambda: (os.path.join(tmp, f"run{next(runs)}"),), items=n,
+                                       probes=len(lost_probes))
+
+            def recover():
+                recovered = open_tracker(directory)
+                recovered.journal.close()
+                return recovered
+            recovered, record = rec.measure(suite, "open_tracker", recover, items=n)
+            record["digest"] = recovered.traverse_order() == tracker.traverse_order()
+            del recovered
+        del tracker, lost
+
+        # Scan stream of n events replayed from a file through the asyncio pipeline
+        with tempfile.TemporaryDirectory() as tmp:
+            events = write_scan_events(os.path.join(tmp, "scan_events.jsonl"), n, seed)
+            pipeline, record = rec.measure(suite, "ScanIngestPipeline.ingest_file", _ingest_events,
+                                           setup=lambda: (events,), items=n)
+            record["digest"] = dict(pipeline.ingestor.stats, queued=sum(pipeline.ingestor.queued().values()))
+
+# ---------- START-UP ----------
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Appended to every start-up case: the child reports whether pandas was imported and its peak RSS.
+# VmHWM belongs to the new process image; ru_maxrss would carry over the benchmark's own peak
+_STARTUP_PROBE = ("\nimport json, sys\n"
+                  "hwm = [int(l.split()[1]) for l in open('/proc/self/status') if l.startswith('VmHWM')]\n"
+                  "print(json.dumps({'pandas': 'pandas' in sys.modules, 'max_rss_kb': hwm[0] if hwm else None}))")
+
+def bench_startup(rec: Recorder, work_dir: str, seed: int, baggage_csv: str, lost_baggage_csv: str):
+    """Wall time of fresh interpreters running query-only and tracker workloads"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_full_cleaning_pipeline(out_dir=work_dir, cache_dir=None)
+    snapshot = os.path.join(work_dir, "routes.graph")
+    routes = os.path.join(work_dir, "routes.csv")
+    (src, dst), = query_pairs(read_snapshot(snapshot), 1, seed)
+    cli = os.path.join(REPO_ROOT, "examples", "shortest_path_cli.py")
+    cases = {
+        "import flight_graph": "import src.graph.flight_graph",
+        "query from snapshot": f"from src.graph.graph_snapshot import load_graph\n"
+                               f"load_graph({snapshot!r}).dijkstra({src!r}, {dst!r})",
+        "query from routes.csv": f"from src.graph.graph_snapshot import load_graph\n"
+                                 f"load_graph('', {routes!r}).dijkstra({src!r}, {dst!r})",
+        "shortest_path_cli": f"import contextlib, io, runpy, sys\n"
+                             f"sys.argv = ['shortest_path_cli.py', '--from', {src!r}, '--to', {dst!r}, "
+                             f"'--snapshot', {snapshot!r}]\n"
+                             f"with contextlib.redirect_stdout(io.StringIO()):\n"
+                             f"    runpy.run_path({cli!r}, run_name='__main__')",
+        "load_baggage_csv": f"from src.baggage.lost_baggage_tracker import load_baggage_csv\n"
+                            f"load_baggage_csv({lost_baggage_csv!r})",
+        "load_baggage_data": f"from src.baggage.baggage_flow import load_baggage_data\n"
+                             f"load_baggage_data({baggage_csv!r})",
+    }
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    env.pop("FLIGHT_PROFILE", None)
+
+    def run(code):
+        out = subprocess.run([sys.executable, "-c", code + _STARTUP_PROBE], cwd=REPO_ROOT, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        return json.loads(out.strip().splitlines()[-1])
+    for name, code in cases.items():
+        probe, record = rec.measure("startup", name, lambda: run(code))
+        # A workload that starts importing pandas again shows up as changed results
+        record["digest"] = {"pandas": probe["pandas"]}
+        record["max_rss_kb"] = probe["max_rss_kb"]
+
+# ---------- REGRESSION CHECK ----------
+def _key(record):
+    return record["suite"], record["name"], json.dumps(record["params"], sort_keys=True)
+
+def compare(results, baseline_path: str, tolerance: float) -> int:
+    """Print best-time ratios against a baseline results file; returns the number of regressions"""
+    with open(baseline_path) as f:
+        baseline = {_key(r): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"\n[Compare] against {baseline_path} (tolerance {tolerance:.0%})")
+    for record in results:
+        old = baseline.get(_key(record))
+        if old is None:
+            continue
+        ratio = record["min"] / old["min"] if old["min"] else float("inf")
+        flags = []
+        if ratio > 1 + tolerance:
+            flags.append("SLOWER")
+        if old["digest"] is not None and record["digest"] != old["digest"]:
+            flags.append("RESULTS DIFFER")
+        regressions += bool(flags)
+        print(f"  {record['name']:<38} {json.dumps(record['params']):<48} x{ratio:6.2f} {' '.join(flags)}")
+    return regressions
+
+# ---------- MAIN ----------
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cleaning, graph build, path queries and baggage structures")
+    parser.add_argument("--suites", nargs="+", default=["cleaning", "queries", "baggage", "startup"],
+                        choices=["cleaning", "queries", "baggage", "startup"], help="Benchmark groups to run")
+    parser.add_argument("--scales", nargs="+", type=int, default=[1],
+                        help="Copies of the OpenFlights network to benchmark on (1 = the raw data as is)")
+    parser.add_argument("--queries", type=int, default=200, help="Random pairs per metric for the Dijkstra-family searches")
+    parser.add_argument("--bf-queries", type=int, default=10, help="Random pairs per metric for the Bellman-Ford searches")
+    parser.add_argument("--baggage-sizes", nargs="+", type=int, default=[10_000, 100_000],
+                        help="Item counts for the baggage structures (e.g. 10000 100000 1000000 10000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per measurement")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic data and query sets")
+    parser.add_argument("--airports", default="data/raw/airports.dat", help="Raw OpenFlights airports file")
+    parser.add_argument("--routes", default="data/raw/routes.dat", help="Raw OpenFlights routes file")
+    parser.add_argument("--baggage", default="data/raw/baggage.csv", help="Baggage file for the start-up runs")
+    parser.add_argument("--lost-baggage", default="data/raw/lost_baggage.csv",
+                        help="Lost baggage file for the start-up runs")
+    parser.add_argument("--out", default="bench_output.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a result counts as a regression")
+    args = parser.parse_args()
+
+    rec = Recorder(args.repeat)
+    work_root = tempfile.mkdtemp(prefix="global-air-bench-")
+    try:
+        for scale in args.scales if {"cleaning", "queries"} & set(args.suites) else []:
+            work_dir = os.path.join(work_root, f"x{scale}")
+            os.makedirs(work_dir)
+            if scale == 1:
+                raw_paths = (args.airports, args.routes)
+            else:
+                raw_paths = write_raw_dataset(*scale_openflights(scale, args.seed, args.airports, args.routes),
+                                              os.path.join(work_dir, "raw"))
+            print(f"[INFO] Scale x{scale}")
+            if "cleaning" in args.suites:
+                graph = bench_cleaning(rec, scale, raw_paths, work_dir)
+            else:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    run_full_cleaning_pipeline(*raw_paths, out_dir=work_dir, cache_dir=None)
+                graph = read_snapshot(os.path.join(work_dir, "routes.graph"))
+            if "queries" in args.suites:
+                bench_queries(rec, scale, graph, args.queries, args.bf_queries, args.seed)
+        if "baggage" in args.suites:
+            print("[INFO] Baggage structures")
+            bench_baggage(rec, args.baggage_sizes, args.seed)
+        if "startup" in args.suites:
+            print("[INFO] Start-up of query and tracker processes")
+            work_dir = os.path.join(work_root, "startup")
+            bench_startup(rec, work_dir, args.seed, args.baggage, args.lost_baggage)
+    finally:
+        shutil.rmtree(work_root, ignore_errors=True)
+
+    meta = run_metadata(args)
+    meta["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(args.out, "w") as f:
+        json.dump({"meta": meta, "results": rec.results}, f, indent=2, default=str)
+    print(f"[INFO] {len(rec.results)} results saved to {os.path.abspath(args.out)}")
+
+    if args.baseline and compare(rec.results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import numpy as np
+import pandas as pd
+from src.graph.cleaning import load_airports_local, load_routes_local
+
+# ---------- SYNTHETIC DATASETS ----------
+# Share of each copy's routes redirected to the same airport in another copy,
+# so a scaled network stays one connected graph instead of factor islands
+BRIDGE_FRACTION = 0.02
+# Standard deviation (degrees) of the coordinate jitter applied to copied airports
+COORD_JITTER = 0.3
+
+def _suffix(codes: pd.Series, copy: np.ndarray) -> pd.Series:
+    # Copy 0 keeps the real codes; copy i appends i, e.g. JFK -> JFK3
+    tags = pd.Series(np.where(copy == 0, "", copy.astype(str)), index=codes.index)
+    return codes.where(codes.isna(), codes.astype(str) + tags)
+
+def scale_openflights(factor: int, seed: int = 0, airports_src="data/raw/airports.dat",
+                      routes_src="data/raw/routes.dat", bridge: float = BRIDGE_FRACTION):
+    """Raw (airports, routes) frames holding factor copies of the OpenFlights network.
+
+    Every copy gets its own airport IDs and codes and slightly jittered
+    coordinates, and a small share of its routes lead into another copy.
+    The frames have the raw column layout, so they go through the cleaning
+    pipeline exactly like airports.dat / routes.dat.
+    """
+    rng = np.random.default_rng(seed)
+    airports = load_airports_local(airports_src)
+    routes = load_routes_local(routes_src)
+    id_span = int(airports["Airport ID"].max()) + 1
+
+    copy = np.repeat(np.arange(factor), len(airports))
+    scaled_airports = pd.concat([airports] * factor, ignore_index=True)
+    scaled_airports["Airport ID"] += copy * id_span
+    scaled_airports["IATA"] = _suffix(scaled_airports["IATA"], copy)
+    scaled_airports["ICAO"] = _suffix(scaled_airports["ICAO"], copy)
+    jitter = rng.normal(0.0, COORD_JITTER, (len(scaled_airports), 2)) * (copy > 0)[:, None]
+    scaled_airports["Latitude"] = (scaled_airports["Latitude"] + jitter[:, 0]).clip(-89.9, 89.9)
+    scaled_airports["Longitude"] = (scaled_airports["Longitude"] + jitter[:, 1] + 180) % 360 - 180
+
+    src_copy = np.repeat(np.arange(factor), len(routes))
+    dst_copy = src_copy.copy()
+    if factor > 1:
+        bridged = rng.random(len(dst_copy)) < bridge
+        dst_copy[bridged] = rng.integers(0, factor, int(bridged.sum()))
+    scaled_routes = pd.concat([routes] * factor, ignore_index=True)
+    scaled_routes["Source airport"] = _suffix(scaled_routes["Source airport"], src_copy)
+    scaled_routes["Destination airport"] = _suffix(scaled_routes["Destination airport"], dst_copy)
+    scaled_routes["Source airport ID"] += src_copy * id_span
+    scaled_routes["Destination airport ID"] += dst_copy * id_span
+    return scaled_airports, scaled_routes
+
+def write_raw_dataset(airports: pd.DataFrame, routes: pd.DataFrame, out_dir: str):
+    """Write frames in the headerless OpenFlights .dat format; returns (airports_path, routes_path)"""
+    os.makedirs(out_dir, exist_ok=True)
+    airports_path = os.path.join(out_dir, "airports.dat")
+    routes_path = os.path.join(out_dir, "routes.dat")
+    airports.to_csv(airports_path, header=False, index=False, na_rep="\\N")
+    routes.to_csv(routes_path, header=False, index=False, na_rep="\\N", float_format="%.0f")
+    return airports_path, routes_path
+
+# ---------- SYNTHETIC BAGGAGE ----------
+BAG_TYPES = ("check-in", "carry-on", "oversized", "fragile")
+RISK_LEVELS = ("low", "medium", "high")
+CHECKPOINTS = ("Check-in", "Security", "Sorting Facility", "Gate A", "Gate B", "Loading", "Transfer")
+
+def baggage_records(n: int, seed: int = 0):
+    """n (passenger_id, priority, bag_type, risk_level) tuples with unique IDs in random order"""
+    rng = np.random.default_rng(seed)
+    ids = rng.permutation(n)
+    width = len(str(max(n - 1, 0)))
+    priorities = rng.integers(1, 6, n).tolist()
+    types = rng.integers(0, len(BAG_TYPES), n).tolist()
+    risks = rng.integers(0, len(RISK_LEVELS), n).tolist()
+    return [(f"P{i:0{width}d}", p, BAG_TYPES[t], RISK_LEVELS[r])
+            for i, p, t, r in zip(ids.tolist(), priorities, types, risks)]
+
+def lost_baggage_records(n: int, seed: int = 0):
+    """n (bag_id, last_checkpoint, metadata) tuples with unique IDs in random order"""
+    rng = np.random.default_rng(seed)
+    ids = rng.permutation(n)
+    width = len(str(max(n - 1, 0)))
+    checkpoints = rng.integers(0, len(CHECKPOINTS), n).tolist()
+    flights = rng.integers(100, 1000, n).tolist()
+    return [(f"B{i:0{width}d}", CHECKPOINTS[c], {"owner": f"Owner{i}", "flight": f"AI{f}"})
+            for i, c, f in zip(ids.tolist(), checkpoints, flights)]
@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import socket
+import time
+from src.baggage.lost_baggage_tracker import open_tracker
+from src.baggage.scan_ingest import ScanIngestor, ScanIngestPipeline, write_scan_events
+
+DEFAULT_PORT = 8766
+
+def replay(address: str, path: str):
+    """Send an event file to a running ingestor; sendall blocks while the ingestor applies backpressure"""
+    if address.startswith("unix:"):
+        family, target = socket.AF_UNIX, address[len("unix:"):]
+    else:
+        host, _, port = address.rpartition(":")
+        family, target = socket.AF_INET, (host or "127.0.0.1", int(port))
+    start = time.perf_counter()
+    sent = 0
+    with socket.socket(family, socket.SOCK_STREAM) as sock, open(path, "rb") as f:
+        sock.connect(target)
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            sock.sendall(chunk)
+            sent += chunk.count(b"\n")
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] Sent {sent} events in {elapsed:.2f}s ({sent / max(elapsed, 1e-9):,.0f} events/s)")
+
+def report(pipeline: ScanIngestPipeline, elapsed: float):
+    stats = pipeline.ingestor.stats
+    busy = pipeline.stats["seconds"]
+    print(f"[INFO] {stats['events']} events in {elapsed:.2f}s, {busy:.2f}s of it applying them "
+          f"({stats['events'] / max(busy, 1e-9):,.0f} events/s), {stats['errors']} bad, "
+          f"{pipeline.stats['stalls']} backpressure waits")
+    print(f"[INFO] Queued per checkpoint: {pipeline.ingestor.queued()}")
+    print(f"[INFO] Lost bags tracked: {len(pipeline.ingestor.tracker.lookup)}")
+    if pipeline.ingestor.last_error:
+        print(f"[WARN] Last bad event: {pipeline.ingestor.last_error}")
+
+async def serve(pipeline: ScanIngestPipeline, args):
+    start = time.perf_counter()
+    server = asyncio.ensure_future(pipeline.serve(args.host, args.port, args.unix_path))
+    try:
+        while not server.done():
+            await asyncio.sleep(args.report_every)
+            report(pipeline, time.perf_counter() - start)
+    finally:
+        server.cancel()
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest baggage scan events into urgency queues and the lost baggage tracker")
+    parser.add_argument("--events", default="data/scan_events.jsonl", help="JSON-lines event file to ingest, write or replay")
+    parser.add_argument("--follow", action="store_true", help="Keep ingesting lines appended to --events (like tail -f)")
+    parser.add_argument("--generate", type=int, metavar="N", help="Write N synthetic events to --events and exit")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic event stream")
+    parser.add_argument("--listen", action="store_true", help="Accept event streams over TCP (or --unix) instead of reading --events")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port to listen on")
+    parser.add_argument("--unix", dest="unix_path", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--replay", metavar="ADDRESS", help="Send --events to an ingestor listening at host:port or unix:/path")
+    parser.add_argument("--journal", metavar="DIR", help="Keep the lost baggage tracker durable in this journal directory")
+    parser.add_argument("--max-pending", type=int, default=32, help="Micro-batches buffered before sources are held back")
+    parser.add_argument("--report-every", type=float, default=5.0, help="Seconds between reports while listening")
+    args = parser.parse_args()
+
+    if args.generate is not None:
+        write_scan_events(args.events, args.generate, args.seed)
+        print(f"[INFO] Wrote {args.generate} events to {args.events}")
+        return
+    if args.replay:
+        replay(args.replay, args.events)
+        return
+
+    tracker = open_tracker(args.journal) if args.journal else None
+    pipeline = ScanIngestPipeline(ScanIngestor(tracker), max_pending=args.max_pending)
+    start = time.perf_counter()
+    try:
+        if args.listen or args.unix_path:
+            asyncio.run(serve(pipeline, args))
+        else:
+            asyncio.run(pipeline.ingest_file(args.events, args.follow))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if tracker is not None:
+            tracker.journal.close()
+    report(pipeline, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
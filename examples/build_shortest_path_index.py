@@ -0,0 +1,25 @@
+import argparse
+from src.graph.contraction import ShortestPathIndex, verify_index
+from src.graph.flight_graph import WEIGHT_KEYS
+from src.graph.graph_snapshot import read_snapshot
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the shortest-path index next to the cleaned data")
+    parser.add_argument("--snapshot", default="data/new/routes.graph", help="Binary graph snapshot written by the cleaning pipeline")
+    parser.add_argument("--out-dir", default="data/new", help="Directory for the ch_<weight>.npz files")
+    parser.add_argument("--weights", nargs="+", default=list(WEIGHT_KEYS), choices=list(WEIGHT_KEYS), help="Weight metrics to index")
+    parser.add_argument("--check-pairs", type=int, default=200, help="Random pairs per metric checked against Dijkstra")
+    args = parser.parse_args()
+
+    graph = read_snapshot(args.snapshot)
+    index = ShortestPathIndex.build(graph, args.weights)
+    index.save(args.out_dir)
+    for key, ch in index.hierarchies.items():
+        print(f"[INFO] {key}: {ch.num_shortcuts} shortcuts saved to {args.out_dir}/ch_{key}.npz")
+    mismatches = verify_index(graph, index, pairs=args.check_pairs)
+    print(f"[INFO] Consistency check: {len(mismatches)} mismatches against Dijkstra")
+    for source, target, key, expected, got in mismatches[:10]:
+        print(f"  {source} -> {target} by {key}: dijkstra={expected} index={got}")
+
+if __name__ == "__main__":
+    main()
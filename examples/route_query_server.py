@@ -0,0 +1,26 @@
+import argparse
+import asyncio
+from src.graph.query_server import DEFAULT_PORT, DEFAULT_ROUTES, DEFAULT_SNAPSHOT, MAX_IN_FLIGHT, RouteQueryServer
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve shortest-path queries over JSON lines with the graph kept in memory")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port to listen on")
+    parser.add_argument("--unix", dest="unix_path", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="Query worker processes (0 answers on the server thread; default: one per CPU)")
+    parser.add_argument("--snapshot", default=DEFAULT_SNAPSHOT, help="Binary graph snapshot written by the cleaning pipeline")
+    parser.add_argument("--routes", default=DEFAULT_ROUTES, help="Cleaned routes CSV, used when the snapshot is missing")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT, help="Requests per connection answered at a time before reading stops")
+    args = parser.parse_args()
+
+    server = RouteQueryServer(args.snapshot, args.routes, workers=args.workers, max_in_flight=args.max_in_flight)
+    status = server.dataset.describe()
+    where = f"unix:{args.unix_path}" if args.unix_path else f"{args.host}:{args.port}"
+    print(f"[INFO] Serving {status['nodes']} airports / {status['edges']} routes on {where} with {server.workers} workers")
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix_path))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,59 @@
 import argparse
-import pandas as pd
-from src.graph.flight_graph import FlightGraph
+import os
+from src.graph.graph_snapshot import load_graph
+
+def query_server(args):
+    # Client mode: the resident server (examples/route_query_server.py) already holds the graph
+    from src.graph.query_server import send_requests
+    if args.algorithm == "index":
+        raise SystemExit("--algorithm index is answered locally; drop --server")
+    response, = send_requests(args.server, [{"from": args.src, "to": args.dst, "weight": args.weight,
+                                             "algorithm": args.algorithm}])
+    if "error" in response:
+        raise SystemExit(f"[ERROR] {response['error']}")
+    extra = f", negative cycle={response['negative_cycle']}" if "negative_cycle" in response else ""
+    print(f"{args.src} -> {args.dst} by {args.weight}: cost={response['distance']}, path={response['path']}{extra}")
+    print(f"[{args.algorithm}] server stats: {response['stats']}")
 
 def main():
     parser = argparse.ArgumentParser(description="Query shortest path in flight graph")
     parser.add_argument("--from", dest="src", required=True, help="Source airport code (primary_code)")
     parser.add_argument("--to", dest="dst", required=True, help="Destination airport code")
     parser.add_argument("--weight", dest="weight", default="distance", choices=["distance", "cost", "delay"], help="Edge weight to optimize")
+    parser.add_argument("--algorithm", default="dijkstra", choices=["dijkstra", "astar", "bidirectional", "index", "spfa", "bellman_ford"], help="Search algorithm (index uses the precomputed ch_<weight>.npz files; spfa and bellman_ford allow negative weights)")
+    parser.add_argument("--snapshot", default="data/new/routes.graph", help="Binary graph snapshot written by the cleaning pipeline")
+    parser.add_argument("--routes", default="data/new/routes.csv", help="Cleaned routes CSV, used when the snapshot is missing")
+    parser.add_argument("--server", help="Send the query to a running route query server (host:port or unix:/path)")
     args = parser.parse_args()
 
-    routes_df = pd.read_csv("data/cleaned/routes.csv")
-    graph = FlightGraph.from_routes_df(routes_df)
-    if args.weight == "delay":
-        # example: if negative delays are modeled you might use Bellman-Ford; else Dijkstra
-        dist, path = graph.dijkstra(args.src, args.dst, weight_key=args.weight)
-        print(f"[Dijkstra] {args.src} -> {args.dst} by {args.weight}: distance={dist}, path={path}")
-    else:
-        dist, path = graph.dijkstra(args.src, args.dst, weight_key=args.weight)
-        print(f"{args.src} -> {args.dst} by {args.weight}: cost={dist}, path={path}")
+    if args.server:
+        query_server(args)
+        return
+
+    graph = load_graph(args.snapshot, args.routes)
+    if args.algorithm == "index":
+        from src.graph.contraction import ContractionHierarchy
+        try:
+            # Checked against the graph: an index left over from older routes is refused
+            ch = ContractionHierarchy.load(os.path.join(os.path.dirname(args.snapshot), f"ch_{args.weight}.npz"),
+                                           graph=graph)
+        except ValueError as e:
+            raise SystemExit(f"[ERROR] {e} (python -m examples.build_shortest_path_index)")
+        dist, path = ch.query(args.src, args.dst)
+        print(f"[{args.algorithm}] {args.src} -> {args.dst} by {args.weight}: cost={dist}, path={path}")
+        return
+
+    if args.algorithm in ("spfa", "bellman_ford"):
+        search = graph.spfa if args.algorithm == "spfa" else graph.bellman_ford_vectorized
+        dist, path, neg_cycle = search(args.src, args.dst, weight_key=args.weight)
+        print(f"{args.src} -> {args.dst} by {args.weight}: cost={dist}, path={path}, negative cycle={neg_cycle}")
+        print(f"[{args.algorithm}] scanned {graph.last_stats.get('settled', 0)} nodes")
+        return
+    search = {"dijkstra": graph.dijkstra, "astar": graph.astar, "bidirectional": graph.bidirectional_dijkstra}[args.algorithm]
+    # Negative delays need --algorithm spfa or bellman_ford; every other metric goes through the chosen search
+    dist, path = search(args.src, args.dst, weight_key=args.weight)
+    print(f"[{args.algorithm}] {args.src} -> {args.dst} by {args.weight}: cost={dist}, path={path}")
+    print(f"[{args.algorithm}] settled {graph.last_stats.get('settled', 0)} nodes")
 
 if __name__ == "__main__":
     main()
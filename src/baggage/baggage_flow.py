@@ -1,8 +1,13 @@
-import pandas as pd
+import csv
 import heapq
-from typing import List, Dict
+from bisect import bisect_left, bisect_right
+from operator import attrgetter, itemgetter
+from typing import List, Dict, Optional
 
 # ------------------ Baggage Class ------------------
+# Risk level rank inside one priority band: high risk is handled first, unknown levels last
+RISK_RANK = {"low": 2, "medium": 1, "high": 0}
+
 class Baggage:
     def __init__(self, passenger_id, priority, bag_type, risk_level):
         self.passenger_id = passenger_id
@@ -11,8 +16,7 @@ class Baggage:
         self.risk_level = risk_level
 
     def urgency_score(self):
-        risk_map = {"low": 2, "medium": 1, "high": 0}
-        return self.priority * 10 + risk_map.get(self.risk_level.lower(), 2)
+        return self.priority * 10 + RISK_RANK.get(self.risk_level.lower(), 2)
 
     def __lt__(self, other):
         return self.urgency_score() < other.urgency_score()
@@ -20,92 +24,403 @@ class Baggage:
     def __repr__(self):
         return f"(ID:{self.passenger_id}, P:{self.priority}, T:{self.bag_type}, R:{self.risk_level})"
 
-# ------------------ BST ------------------
-class BaggageBSTNode:
-    def __init__(self, baggage: Baggage):
-        self.baggage = baggage
-        self.left = None
-        self.right = None
+# ------------------ Sorted Index ------------------
+# Keys per block of a SortedIndex; a block splits once it holds twice as many
+INDEX_BLOCK_SIZE = 512
+
+class SortedIndex:
+    """Ordered multimap kept as a list of sorted blocks of (key, item).
+
+    Lookups bisect the block maxima and then one block; inserts and removals
+    shift at most one block, which splits once it reaches twice
+    INDEX_BLOCK_SIZE keys. Every operation is iterative and costs
+    O(log n + block size) whatever order the keys arrive in. Equal keys keep
+    their insertion order.
+    """
 
-class BaggageBST:
     def __init__(self):
-        self.root = None
+        self._keys: List[list] = []
+        self._items: List[list] = []
+        self._maxes: list = []
+        self._len = 0
 
-    def insert(self, baggage: Baggage):
-        def _insert(node, baggage):
-            if not node:
-                return BaggageBSTNode(baggage)
-            if baggage.passenger_id < node.baggage.passenger_id:
-                node.left = _insert(node.left, baggage)
-            else:
-                node.right = _insert(node.right, baggage)
-            return node
-        self.root = _insert(self.root, baggage)
-
-    def search(self, passenger_id):
-        def _search(node, pid):
-            if not node:
-                return None
-            if pid == node.baggage.passenger_id:
-                return node.baggage
-            elif pid < node.baggage.passenger_id:
-                return _search(node.left, pid)
-            else:
-                return _search(node.right, pid)
-        return _search(self.root, passenger_id)
+    def __len__(self):
+        return self._len
+
+    def insert(self, key, item):
+        maxes = self._maxes
+        if not maxes:
+            self._keys.append([key])
+            self._items.append([item])
+            maxes.append(key)
+            self._len = 1
+            return
+        # Equal keys go after the ones already stored; keys past every max join the last block
+        b = bisect_right(maxes, key)
+        if b == len(maxes):
+            b -= 1
+            maxes[b] = key
+        keys = self._keys[b]
+        i = bisect_right(keys, key)
+        keys.insert(i, key)
+        self._items[b].insert(i, item)
+        self._len += 1
+        if len(keys) >= 2 * INDEX_BLOCK_SIZE:
+            items = self._items[b]
+            self._keys[b:b + 1] = [keys[:INDEX_BLOCK_SIZE], keys[INDEX_BLOCK_SIZE:]]
+            self._items[b:b + 1] = [items[:INDEX_BLOCK_SIZE], items[INDEX_BLOCK_SIZE:]]
+            maxes[b:b + 1] = [keys[INDEX_BLOCK_SIZE - 1], keys[-1]]
 
-    def inorder(self):
-        result = []
-        def _inorder(node):
-            if not node:
+    def update(self, pairs):
+        """Insert many (key, item) pairs with one sort instead of one insert each"""
+        merged = list(zip(self._all_keys(), self)) if self._len else []
+        merged.extend(pairs)
+        merged.sort(key=itemgetter(0))
+        size = INDEX_BLOCK_SIZE
+        self._keys = [[k for k, _ in merged[i:i + size]] for i in range(0, len(merged), size)]
+        self._items = [[v for _, v in merged[i:i + size]] for i in range(0, len(merged), size)]
+        self._maxes = [keys[-1] for keys in self._keys]
+        self._len = len(merged)
+
+    def _all_keys(self):
+        for keys in self._keys:
+            yield from keys
+
+    def _locate(self, key):
+        """(block, position) of the first entry with a key >= key"""
+        b = bisect_left(self._maxes, key)
+        if b == len(self._maxes):
+            return b, 0
+        return b, bisect_left(self._keys[b], key)
+
+    def find(self, key):
+        """First item stored under key, or None"""
+        b, i = self._locate(key)
+        if b < len(self._keys) and self._keys[b][i] == key:
+            return self._items[b][i]
+        return None
+
+    def remove(self, key, item=None) -> bool:
+        """Drop the first entry under key (the one holding item, if given); False if there is none"""
+        b, i = self._locate(key)
+        while b < len(self._keys):
+            keys, items = self._keys[b], self._items[b]
+            while i < len(keys) and keys[i] == key:
+                if item is None or items[i] is item:
+                    del keys[i]
+                    del items[i]
+                    self._len -= 1
+                    if keys:
+                        self._maxes[b] = keys[-1]
+                    else:
+                        del self._keys[b], self._items[b], self._maxes[b]
+                    return True
+                i += 1
+            if i < len(keys):
+                break
+            b, i = b + 1, 0
+        return False
+
+    def irange(self, low=None, high=None):
+        """Items with low <= key <= high in key order; a None bound is open"""
+        b, i = (0, 0) if low is None else self._locate(low)
+        while b < len(self._keys):
+            keys, items = self._keys[b], self._items[b]
+            if high is None or keys[-1] <= high:
+                yield from items[i:]
+            else:
+                yield from items[i:bisect_right(keys, high, i)]
                 return
-            _inorder(node.left)
-            result.append(node.baggage)
-            _inorder(node.right)
-        _inorder(self.root)
-        return result
+            b, i = b + 1, 0
+
+    def __iter__(self):
+        return self.irange()
+
+# ------------------ Baggage Index ------------------
+class BaggageIndex:
+    """Baggage ordered by passenger ID, with secondary indexes for filtering.
+
+    Replaces the recursive BST, which degenerated into a list on the sorted
+    IDs of baggage.csv. The secondary indexes (priority, bag type, risk
+    level) are hash groups: each value maps to its bags, keyed by object id
+    so removal is O(1). filter() reads only the smallest matching group and
+    puts it in passenger ID order once; the ordered copy is reused until
+    that group changes.
+    """
+    SECONDARY = ("priority", "bag_type", "risk_level")
+
+    def __init__(self):
+        self.by_id = SortedIndex()
+        self.by_attribute: Dict[str, Dict[object, Dict[int, Baggage]]] = {attr: {} for attr in self.SECONDARY}
+        self._ordered: Dict[tuple, List[Baggage]] = {}
+
+    def __len__(self):
+        return len(self.by_id)
+
+    @staticmethod
+    def _value(value):
+        # Type and risk are matched case-insensitively, like urgency_score does
+        return value.lower() if isinstance(value, str) else value
+
+    def insert(self, baggage: Baggage):
+        self.by_id.insert(baggage.passenger_id, baggage)
+        for attr in self.SECONDARY:
+            value = self._value(getattr(baggage, attr))
+            self.by_attribute[attr].setdefault(value, {})[id(baggage)] = baggage
+            self._ordered.pop((attr, value), None)
+
+    def insert_many(self, bags):
+        """Bulk insert, sorting once; the fast way to load a whole file"""
+        bags = list(bags)
+        self.by_id.update((bag.passenger_id, bag) for bag in bags)
+        for attr in self.SECONDARY:
+            groups = self.by_attribute[attr]
+            values: Dict[object, object] = {}
+            for bag in bags:
+                raw = getattr(bag, attr)
+                value = values.get(raw)
+                if value is None:
+                    value = values[raw] = self._value(raw)
+                group = groups.get(value)
+                if group is None:
+                    group = groups[value] = {}
+                group[id(bag)] = bag
+            for value in set(values.values()):
+                self._ordered.pop((attr, value), None)
+
+    def remove(self, passenger_id) -> Optional[Baggage]:
+        """Remove and return the first bag of passenger_id, or None"""
+        baggage = self.by_id.find(passenger_id)
+        if baggage is None:
+            return None
+        self.by_id.remove(passenger_id, baggage)
+        for attr in self.SECONDARY:
+            value = self._value(getattr(baggage, attr))
+            group = self.by_attribute[attr][value]
+            del group[id(baggage)]
+            if not group:
+                del self.by_attribute[attr][value]
+            self._ordered.pop((attr, value), None)
+        return baggage
+
+    def search(self, passenger_id) -> Optional[Baggage]:
+        return self.by_id.find(passenger_id)
+
+    def inorder(self) -> List[Baggage]:
+        return list(self.by_id)
+
+    def range(self, low=None, high=None) -> List[Baggage]:
+        """Bags with low <= passenger_id <= high, in ID order"""
+        return list(self.by_id.irange(low, high))
+
+    def _group(self, attr: str, value) -> List[Baggage]:
+        ordered = self._ordered.get((attr, value))
+        if ordered is None:
+            # Stable sort: bags of one passenger stay in insertion order, as in by_id
+            ordered = sorted(self.by_attribute[attr].get(value, {}).values(), key=attrgetter("passenger_id"))
+            self._ordered[(attr, value)] = ordered
+        return ordered
+
+    def filter(self, priority=None, bag_type=None, risk_level=None) -> List[Baggage]:
+        """Bags matching every given attribute, in passenger ID order"""
+        wanted = {attr: self._value(value)
+                  for attr, value in (("priority", priority), ("bag_type", bag_type), ("risk_level", risk_level))
+                  if value is not None}
+        if not wanted:
+            return self.inorder()
+        # Order only the smallest group and keep its bags that are also in the other groups
+        attr = min(wanted, key=lambda a: len(self.by_attribute[a].get(wanted[a], ())))
+        group = self._group(attr, wanted[attr])
+        others = [self.by_attribute[a].get(v, {}) for a, v in wanted.items() if a != attr]
+        if not others:
+            return list(group)
+        return [bag for bag in group if all(id(bag) in other for other in others)]
+
+# Former name, kept for existing callers
+BaggageBST = BaggageIndex
 
 # ------------------ Min Heap ------------------
 class BaggageMinHeap:
+    """Indexed min-priority queue of bags by urgency, looked up by passenger ID.
+
+    Entries are [urgency, arrival, seq, bag], with the urgency score computed
+    once on entry, arrival the bag's arrival number and seq unique per entry,
+    so bags with equal scores leave in arrival order and bags are never
+    compared themselves. A passenger may queue several bags: the first one
+    is indexed by passenger ID and later ones wait in arrival order in a
+    side table, so passengers with one bag pay nothing for it. update and
+    remove act on a passenger's first queued bag unless given the bag
+    itself. They retire the old entry in place (its bag becomes None) and
+    pop skips retired entries, as in the heapq documentation; the heap is
+    compacted once retired entries outnumber live ones.
+    """
+
     def __init__(self):
         self.heap = []
+        self._entries: Dict[object, list] = {}
+        self._more: Dict[object, List[list]] = {}
+        self._extra = 0
+        self._seq = 0
+        self._arrivals = 0
+        self._retired = 0
+
+    def __len__(self):
+        return len(self._entries) + self._extra
+
+    def __contains__(self, passenger_id):
+        return passenger_id in self._entries
+
+    def _entry(self, baggage: Baggage) -> list:
+        entry = [baggage.urgency_score(), self._arrivals, self._seq, baggage]
+        self._arrivals += 1
+        self._seq += 1
+        if baggage.passenger_id in self._entries:
+            self._more.setdefault(baggage.passenger_id, []).append(entry)
+            self._extra += 1
+        else:
+            self._entries[baggage.passenger_id] = entry
+        return entry
+
+    def _find(self, passenger_id, baggage=None) -> Optional[list]:
+        """First entry of passenger_id (the one holding baggage, if given), or None"""
+        entry = self._entries.get(passenger_id)
+        if entry is None or baggage is None or entry[3] is baggage:
+            return entry
+        for entry in self._more.get(passenger_id, ()):
+            if entry[3] is baggage:
+                return entry
+        return None
+
+    def _unlink(self, passenger_id, entry: list, fresh: Optional[list] = None):
+        """Take entry out of the passenger ID lookup, or put fresh in its place"""
+        more = self._more.get(passenger_id)
+        if self._entries[passenger_id] is entry:
+            if fresh is not None:
+                self._entries[passenger_id] = fresh
+            elif more:
+                # The passenger's next bag becomes the first
+                self._entries[passenger_id] = more.pop(0)
+                self._extra -= 1
+            else:
+                del self._entries[passenger_id]
+        else:
+            i = next(i for i, e in enumerate(more) if e is entry)
+            if fresh is not None:
+                more[i] = fresh
+            else:
+                del more[i]
+                self._extra -= 1
+        if more is not None and not more:
+            del self._more[passenger_id]
 
     def push(self, baggage: Baggage):
-        heapq.heappush(self.heap, baggage)
+        heapq.heappush(self.heap, self._entry(baggage))
+
+    def heapify(self, bags):
+        """Queue many bags at once (e.g. from load_baggage_data) in O(n)"""
+        self.heap.extend(self._entry(bag) for bag in bags)
+        heapq.heapify(self.heap)
+
+    def _skip_retired(self):
+        heap = self.heap
+        while heap and heap[0][3] is None:
+            heapq.heappop(heap)
+            self._retired -= 1
+
+    def peek(self) -> Optional[Baggage]:
+        self._skip_retired()
+        return self.heap[0][3] if self.heap else None
+
+    def pop(self) -> Optional[Baggage]:
+        self._skip_retired()
+        if not self.heap:
+            return None
+        entry = heapq.heappop(self.heap)
+        baggage = entry[3]
+        if self._more:
+            self._unlink(baggage.passenger_id, entry)
+        else:
+            del self._entries[baggage.passenger_id]
+        self._compact()
+        return baggage
+
+    def _retire(self, entry: list):
+        entry[3] = None
+        self._retired += 1
+        self._compact()
 
-    def pop(self):
-        return heapq.heappop(self.heap) if self.heap else None
+    def _compact(self):
+        if self._retired > len(self):
+            self.heap = [e for e in self.heap if e[3] is not None]
+            heapq.heapify(self.heap)
+            self._retired = 0
+
+    def remove(self, passenger_id, baggage: Optional[Baggage] = None) -> Optional[Baggage]:
+        """Withdraw the first queued bag of passenger_id (or baggage itself); returns it, or None if not queued"""
+        entry = self._find(passenger_id, baggage)
+        if entry is None:
+            return None
+        baggage = entry[3]
+        self._unlink(passenger_id, entry)
+        self._retire(entry)
+        return baggage
+
+    def update(self, passenger_id, priority=None, risk_level=None, baggage: Optional[Baggage] = None) -> Baggage:
+        """Change the priority and/or risk level of a queued bag and re-queue it under its new urgency.
+
+        Acts on the first queued bag of passenger_id, or on baggage itself.
+        The queued bag is replaced by a changed copy, which is returned: the
+        old object is left as it was, so a BaggageIndex holding it (its
+        groups are keyed on these attributes) stays consistent; remove the
+        old bag from such an index and insert the returned one to move it.
+        The bag keeps its arrival number, so it stays ahead of later bags
+        with the same score.
+        """
+        entry = self._find(passenger_id, baggage)
+        if entry is None:
+            raise KeyError(f"Passenger {passenger_id} has no such bag in the queue")
+        old = entry[3]
+        baggage = Baggage(old.passenger_id, old.priority if priority is None else priority, old.bag_type,
+                          old.risk_level if risk_level is None else risk_level)
+        fresh = [baggage.urgency_score(), entry[1], self._seq, baggage]
+        self._seq += 1
+        self._unlink(passenger_id, entry, fresh)
+        heapq.heappush(self.heap, fresh)
+        self._retire(entry)
+        return baggage
 
     def all_baggage(self):
-        return list(self.heap)
+        return [entry[3] for entry in self.heap if entry[3] is not None]
 
 # ------------------ Main Flow ------------------
 def load_baggage_data(csv_path: str) -> List[Baggage]:
-    df = pd.read_csv(csv_path)
+    # Streamed row by row with the csv module: loading baggage never needs pandas
     bag_list = []
-    for _, row in df.iterrows():
-        bag = Baggage(
-            passenger_id=row["PassengerID"],
-            priority=row["Priority"],
-            bag_type=row["BaggageType"],
-            risk_level=row["RiskLevel"]
-        )
-        bag_list.append(bag)
+    with open(csv_path, newline="") as f:
+        for row in csv.DictReader(f):
+            bag = Baggage(
+                passenger_id=row["PassengerID"],
+                priority=row["Priority"],
+                bag_type=row["BaggageType"],
+                risk_level=row["RiskLevel"]
+            )
+            bag_list.append(bag)
     return bag_list
 
 def run_baggage_flow(csv_path: str):
-    bags = load_baggage_data(csv_path)
+    # Imported here: baggage_store builds on this module and pulls in NumPy
+    from src.baggage.baggage_store import BaggageStore
+    store = BaggageStore.from_csv(csv_path)
+    bags = store.bags()
 
-    # Build BST
-    bst = BaggageBST()
-    for bag in bags:
-        bst.insert(bag)
-    sorted_bags = bst.inorder()
+    # Build the passenger ID index
+    index = BaggageIndex()
+    index.insert_many(bags)
+    sorted_bags = index.inorder()
 
     # Build Min Heap
     heap = BaggageMinHeap()
-    for bag in bags:
-        heap.push(bag)
+    heap.heapify(bags)
 
     # Heap processing order
     heap_order = []
@@ -116,7 +431,7 @@ def run_baggage_flow(csv_path: str):
         heap_order.append(next_bag)
 
     # Show results
-    print("\n[Sorted by Passenger ID - BST]:")
+    print("\n[Sorted by Passenger ID - Index]:")
     for b in sorted_bags:
         print(b)
 
@@ -124,14 +439,27 @@ def run_baggage_flow(csv_path: str):
     for b in heap_order:
         print(b)
 
+    print("\n[Bags per Priority and Risk Level - Columnar Store]:")
+    for (priority, risk_level), count in sorted(store.group_counts("priority", "risk_level").items()):
+        print(f"P:{priority} R:{risk_level} -> {count}")
+
     # Optional: search
     pid = input("\nEnter Passenger ID to search: ").strip().upper()
-    found = bst.search(pid)
+    found = index.search(pid)
     if found:
         print(f"[FOUND] {found}")
     else:
         print("[NOT FOUND] Passenger ID not in system.")
 
+    # Optional: filter through the secondary indexes
+    priority = input("\nFilter by priority (blank for any): ").strip()
+    bag_type = input("Filter by baggage type (blank for any): ").strip()
+    risk_level = input("Filter by risk level (blank for any): ").strip()
+    matches = index.filter(int(priority) if priority.isdigit() else None, bag_type or None, risk_level or None)
+    print(f"\n[FILTER] {len(matches)} bag(s):")
+    for b in matches:
+        print(b)
+
 # ------------------ Entry ------------------
 if __name__ == "__main__":
     run_baggage_flow("data/raw/baggage.csv")
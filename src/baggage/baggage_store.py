@@ -0,0 +1,173 @@
+import csv
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from src.baggage.baggage_flow import RISK_RANK, Baggage
+
+# ---------- COLUMNAR BAGGAGE STORE ----------
+# CSV rows converted to arrays at a time; bounds the Python lists alive while loading
+LOAD_BLOCK = 1_000_000
+COLUMNS = ("priority", "bag_type", "risk_level")
+
+def _encode(values: np.ndarray, categories: Dict[str, int]) -> np.ndarray:
+    """Codes of values in categories, adding unseen values in order of first appearance"""
+    uniques, first, inverse = np.unique(values, return_index=True, return_inverse=True)
+    for u in uniques[np.argsort(first)].tolist():
+        categories.setdefault(u, len(categories))
+    lookup = np.array([categories[u] for u in uniques.tolist()], dtype=np.int16)
+    return lookup[inverse.reshape(-1)]
+
+class BaggageStore:
+    """Bags as parallel NumPy columns instead of one Baggage object each.
+
+    passenger_id is a string array, priority an int array, and bag_type and
+    risk_level are int16 codes into the types and risks lists; urgency holds
+    Baggage.urgency_score for every bag. Filters, top-k and group counts run
+    on whole columns and return row positions or plain dicts; Baggage objects
+    are only built by bags() for the rows asked for. Like BaggageIndex, they
+    match and group bag types and risk levels by their lowercase form, while
+    bags() keeps each value as it was stored.
+    """
+
+    def __init__(self, passenger_id, priority, bag_type, risk_level):
+        self._type_codes: Dict[str, int] = {}
+        self._risk_codes: Dict[str, int] = {}
+        self.passenger_id = np.asarray(passenger_id, dtype=str)
+        self.priority = np.asarray(priority).astype(np.int64)
+        self.type_code = _encode(np.asarray(bag_type, dtype=str), self._type_codes)
+        self.risk_code = _encode(np.asarray(risk_level, dtype=str), self._risk_codes)
+        self._refresh()
+
+    def _refresh(self):
+        self.types: List[str] = list(self._type_codes)
+        self.risks: List[str] = list(self._risk_codes)
+        rank = np.array([RISK_RANK.get(r.lower(), 2) for r in self.risks], dtype=np.int64)
+        self.urgency = self.priority * 10 + (rank[self.risk_code] if len(rank) else 0)
+        self._by_id = None
+
+    @classmethod
+    def from_baggage(cls, bags: Iterable[Baggage]) -> "BaggageStore":
+        bags = list(bags)
+        return cls([b.passenger_id for b in bags], [b.priority for b in bags],
+                   [b.bag_type for b in bags], [b.risk_level for b in bags])
+
+    @classmethod
+    def from_records(cls, records, block: int = LOAD_BLOCK) -> "BaggageStore":
+        """Store (passenger_id, priority, bag_type, risk_level) rows, converting block rows at a time"""
+        store = cls([], [], [], [])
+        records = iter(records)
+        parts = []
+        while True:
+            rows = list(islice(records, block))
+            if not rows:
+                break
+            ids, priority, types, risks = zip(*rows)
+            parts.append((np.array(ids, dtype=str), np.array(priority, dtype=np.int64),
+                          _encode(np.array(types, dtype=str), store._type_codes),
+                          _encode(np.array(risks, dtype=str), store._risk_codes)))
+        if parts:
+            store.passenger_id, store.priority, store.type_code, store.risk_code = (
+                np.concatenate(column) for column in zip(*parts))
+        store._refresh()
+        return store
+
+    @classmethod
+    def from_csv(cls, csv_path: str, block: int = LOAD_BLOCK) -> "BaggageStore":
+        """Load baggage.csv (PassengerID, Priority, BaggageType, RiskLevel) with the csv module"""
+        with open(csv_path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            cols = [header.index(name) for name in ("PassengerID", "Priority", "BaggageType", "RiskLevel")]
+            return cls.from_records(([row[c] for c in cols] for row in reader), block)
+
+    def __len__(self) -> int:
+        return len(self.passenger_id)
+
+    # ---------- Row access ----------
+    def bags(self, positions=None) -> List[Baggage]:
+        """Baggage objects for the rows at positions (all rows by default), in that order"""
+        if positions is None:
+            positions = slice(None)
+        return [Baggage(pid, p, self.types[t], self.risks[r]) for pid, p, t, r in
+                zip(self.passenger_id[positions].tolist(), self.priority[positions].tolist(),
+                    self.type_code[positions].tolist(), self.risk_code[positions].tolist())]
+
+    def find(self, passenger_id) -> int:
+        """Row of the first bag with passenger_id, or -1"""
+        if self._by_id is None:
+            self._by_id = np.argsort(self.passenger_id, kind="stable")
+        ids = self.passenger_id[self._by_id]
+        at = int(np.searchsorted(ids, str(passenger_id)))
+        return int(self._by_id[at]) if at < len(ids) and ids[at] == str(passenger_id) else -1
+
+    def search(self, passenger_id) -> Optional[Baggage]:
+        at = self.find(passenger_id)
+        return self.bags([at])[0] if at >= 0 else None
+
+    # ---------- Vectorized queries ----------
+    def _codes_of(self, column: str, values) -> np.ndarray:
+        values = [values] if isinstance(values, (str, int, np.integer)) else list(values)
+        if column == "priority":
+            return np.array(values, dtype=np.int64)
+        codes = self._type_codes if column == "bag_type" else self._risk_codes
+        # Every stored spelling of a wanted value, e.g. "Fragile" and "FRAGILE" for "fragile"
+        wanted = {v.lower() if isinstance(v, str) else v for v in values}
+        return np.array([code for value, code in codes.items() if value.lower() in wanted], dtype=np.int16)
+
+    def _column(self, column: str) -> np.ndarray:
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown baggage column: {column} (expected one of {', '.join(COLUMNS)})")
+        return {"priority": self.priority, "bag_type": self.type_code, "risk_level": self.risk_code}[column]
+
+    def mask(self, priority=None, bag_type=None, risk_level=None) -> np.ndarray:
+        """Boolean row mask; each criterion is one value or a collection of accepted values"""
+        keep = np.ones(len(self), dtype=bool)
+        for column, values in zip(COLUMNS, (priority, bag_type, risk_level)):
+            if values is not None:
+                keep &= np.isin(self._column(column), self._codes_of(column, values))
+        return keep
+
+    def filter(self, priority=None, bag_type=None, risk_level=None) -> np.ndarray:
+        """Rows matching every given criterion, in store order"""
+        return np.flatnonzero(self.mask(priority, bag_type, risk_level))
+
+    def top_k(self, k: int, where: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rows of the k most urgent bags (lowest urgency), ties in store order, like BaggageMinHeap"""
+        rows = np.arange(len(self)) if where is None else np.asarray(where)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        if k <= 0 or not len(rows):
+            return rows[:0]
+        if k < len(rows):
+            # Rows with the k smallest urgencies, cut at the k-th value and sorted stably after
+            cut = np.partition(self.urgency[rows], k - 1)[k - 1]
+            rows = rows[self.urgency[rows] <= cut]
+        return rows[np.argsort(self.urgency[rows], kind="stable")][:k]
+
+    def group_counts(self, *columns: str, where: Optional[np.ndarray] = None) -> Dict[object, int]:
+        """Bags per value of one column, or per value tuple of several, e.g. group_counts("priority", "risk_level")"""
+        columns = columns or ("risk_level",)
+        codes = [self._column(c) if where is None else self._column(c)[where] for c in columns]
+        if not len(codes[0]):
+            return {}
+        # One mixed-radix key per row, so the counting is a single bincount
+        lows = [int(c.min()) for c in codes]
+        dims = [int(c.max()) - low + 1 for c, low in zip(codes, lows)]
+        flat = np.ravel_multi_index([c.astype(np.int64) - low for c, low in zip(codes, lows)], dims)
+        if int(np.prod(dims)) <= 4 * len(flat) + 1024:
+            counts = np.bincount(flat)
+            present = np.flatnonzero(counts)
+            counts = counts[present]
+        else:
+            # Sparse keys (e.g. a few far-apart priorities): sort instead of a huge bincount
+            present, counts = np.unique(flat, return_counts=True)
+        keys = np.stack(np.unravel_index(present, dims)) + np.array(lows)[:, None]
+        labels = {"priority": None, "bag_type": [t.lower() for t in self.types],
+                  "risk_level": [r.lower() for r in self.risks]}
+        out: Dict[object, int] = {}
+        for key, count in zip(keys.T.tolist(), counts.tolist()):
+            named = tuple(v if labels[c] is None else labels[c][v] for c, v in zip(columns, key))
+            # Spellings that differ only in case share one lowercase label
+            named = named if len(columns) > 1 else named[0]
+            out[named] = out.get(named, 0) + count
+        return out
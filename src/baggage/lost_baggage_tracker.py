@@ -1,5 +1,9 @@
-import pandas as pd
+import csv
+import json
 import os
+import time
+from json.encoder import encode_basestring_ascii
+from operator import itemgetter
 
 # Node for doubly linked list
 class BaggageNode:
@@ -16,6 +20,7 @@ class LostBaggageTracker:
         self.head = None
         self.tail = None
         self.lookup = {}  # Hash table: Bag ID -> Node
+        self.journal = None  # TrackerJournal logging every change, if attached
 
     def insert_baggage(self, bag_id, last_checkpoint, metadata):
         """Insert a baggage into linked list & hash table"""
@@ -31,12 +36,16 @@ class LostBaggageTracker:
             node.prev = self.tail
             self.tail = node
         self.lookup[bag_id] = node
+        if self.journal is not None:
+            self.journal.append(("I", bag_id, last_checkpoint, metadata["owner"], metadata["flight"]))
 
     def update_checkpoint(self, bag_id, new_checkpoint):
         """Update last checkpoint for a given baggage"""
         node = self.lookup.get(bag_id)
         if node:
             node.last_checkpoint = new_checkpoint
+            if self.journal is not None:
+                self.journal.append(("U", bag_id, new_checkpoint))
         else:
             print(f"Bag {bag_id} not found.")
 
@@ -54,6 +63,8 @@ class LostBaggageTracker:
             node.next.prev = node.prev
         else:
             self.tail = node.prev
+        if self.journal is not None:
+            self.journal.append(("R", bag_id))
         return True
 
     def get_baggage_info(self, bag_id):
@@ -86,29 +97,211 @@ def load_baggage_csv(path):
     if not os.path.exists(path):
         print(f"File {path} not found. Starting with empty tracker.")
         return tracker
-    df = pd.read_csv(path)
-    for _, row in df.iterrows():
-        tracker.insert_baggage(
-            bag_id=row["BagID"],
-            last_checkpoint=row["LastCheckpoint"],
-            metadata={"owner": row["Owner"], "flight": row["Flight"]}
-        )
+    # Streamed row by row with the csv module: the tracker never needs pandas
+    with open(path, newline="") as f:
+        _read_rows(tracker, f)
     return tracker
 
+def _read_rows(tracker, f):
+    reader = csv.reader(f)
+    header = next(reader, [])
+    columns = [header.index(name) for name in ("BagID", "LastCheckpoint", "Owner", "Flight")]
+    insert = tracker.insert_baggage
+    for bag_id, checkpoint, owner, flight in map(itemgetter(*columns), reader):
+        insert(bag_id, checkpoint, {"owner": owner, "flight": flight})
+
 # Save baggage to CSV
 def save_baggage_csv(tracker, path):
-    flow = tracker.traverse_order()
-    rows = []
-    for item in flow:
-        rows.append({
-            "BagID": item["bag_id"],
-            "LastCheckpoint": item["checkpoint"],
-            "Owner": item["metadata"]["owner"],
-            "Flight": item["metadata"]["flight"]
-        })
-    pd.DataFrame(rows).to_csv(path, index=False)
+    with open(path, "w", newline="") as f:
+        _write_rows(tracker, f)
     print(f"Data saved to {path}")
 
+def _write_rows(tracker, f):
+    # Walks the list directly instead of building traverse_order's copy of every bag
+    writer = csv.writer(f)
+    writer.writerow(["BagID", "LastCheckpoint", "Owner", "Flight"])
+    node = tracker.head
+    while node:
+        writer.writerow([node.bag_id, node.last_checkpoint, node.metadata["owner"], node.metadata["flight"]])
+        node = node.next
+
+# Write-ahead journal
+DEFAULT_JOURNAL_DIR = "data/lost_baggage_journal"
+# A group commit (flush + fsync) happens after this many records or this many seconds, whichever comes first
+COMMIT_EVERY = 1024
+COMMIT_INTERVAL = 0.05
+# Records kept in the journal before a snapshot compacts it (at least as many as tracked bags)
+SNAPSHOT_MIN = 100_000
+
+def _fsync_dir(directory):
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def _write_snapshot(tracker, directory, generation):
+    """Write tracker as snapshot.<generation>.csv in directory"""
+    path = os.path.join(directory, f"snapshot.{generation}.csv")
+    with open(path + ".tmp", "w", newline="", encoding="utf-8") as f:
+        _write_rows(tracker, f)
+        f.flush()
+        os.fsync(f.fileno())
+    # The rename is the switch: recovery only ever sees a complete snapshot
+    os.replace(path + ".tmp", path)
+    _fsync_dir(directory)
+
+class TrackerJournal:
+    """Append-only log of a tracker's changes, compacted by snapshots.
+
+    Generation g is snapshot.<g>.csv (the tracker in save_baggage_csv's
+    format; none for generation 0) followed by journal.<g>.log, one JSON
+    array of strings per line: ["I", bag, checkpoint, owner, flight],
+    ["U", bag, checkpoint] or ["R", bag]. Records are appended after each change and
+    made durable in groups, so a crash loses at most the last
+    commit_every records or commit_interval seconds; commit() forces it.
+    append() can only check the interval when the next change arrives, so
+    whoever drives the tracker calls commit_due() when a burst of changes
+    ends and again once the returned delay has passed: ScanIngestPipeline
+    does so after each batch and on a loop timer, and run_cli commits after
+    every command.
+    Once the journal holds more records than max(snapshot_min, tracked
+    bags), a snapshot of generation g + 1 is written and renamed into place
+    before the old files are removed, which keeps recovery (open_tracker)
+    proportional to the number of bags, not the history.
+    """
+
+    def __init__(self, tracker, directory, generation=0, records=0, commit_every=COMMIT_EVERY,
+                 commit_interval=COMMIT_INTERVAL, snapshot_min=SNAPSHOT_MIN):
+        self.tracker = tracker
+        self.directory = directory
+        self.generation = generation
+        self.records = records
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.snapshot_min = snapshot_min
+        self.pending = 0
+        self.last_commit = time.monotonic()
+        self._file = open(self.journal_path(generation), "a", encoding="utf-8")
+        tracker.journal = self
+
+    def snapshot_path(self, generation):
+        return os.path.join(self.directory, f"snapshot.{generation}.csv")
+
+    def journal_path(self, generation):
+        return os.path.join(self.directory, f"journal.{generation}.log")
+
+    def append(self, record):
+        # Every field is a string, so the C string encoder builds the line without json.dumps
+        self._file.write("[" + ",".join(map(encode_basestring_ascii, map(str, record))) + "]\n")
+        self.pending += 1
+        self.records += 1
+        if self.pending >= self.commit_every or time.monotonic() - self.last_commit >= self.commit_interval:
+            self.commit()
+        if self.records > max(self.snapshot_min, len(self.tracker.lookup)):
+            self.snapshot()
+
+    def commit(self):
+        """Make every appended record durable (one flush and fsync for the whole group)"""
+        if self.pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.pending = 0
+        self.last_commit = time.monotonic()
+
+    def commit_due(self):
+        """Commit if commit_interval has passed; returns the seconds until the pending records fall due, or None"""
+        if not self.pending:
+            return None
+        wait = self.last_commit + self.commit_interval - time.monotonic()
+        if wait > 0:
+            return wait
+        self.commit()
+        return None
+
+    def snapshot(self):
+        """Write the whole tracker as the next generation and drop the journal it replaces"""
+        self.commit()
+        generation = self.generation + 1
+        _write_snapshot(self.tracker, self.directory, generation)
+        self._file.close()
+        self._file = open(self.journal_path(generation), "a", encoding="utf-8")
+        for stale in (self.journal_path(self.generation), self.snapshot_path(self.generation)):
+            if os.path.exists(stale):
+                os.remove(stale)
+        self.generation = generation
+        self.records = 0
+
+    def close(self):
+        self.commit()
+        self._file.close()
+        self.tracker.journal = None
+
+def _replay(tracker, path):
+    """Apply a journal to tracker; returns the number of records (a torn last line is cut off).
+
+    A complete line that is not a valid record raises ValueError naming the
+    file and byte offset: the records after it were committed, so cutting
+    the journal there would silently lose them.
+    """
+    records = 0
+    if not os.path.exists(path):
+        return records
+    with open(path, "rb+") as f:
+        good = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                # Partly written when the process died: never committed, so drop it
+                f.truncate(good)
+                break
+            try:
+                op, bag_id, *args = json.loads(line)
+                if op == "I":
+                    tracker.insert_baggage(bag_id, args[0], {"owner": args[1], "flight": args[2]})
+                elif op == "U":
+                    tracker.update_checkpoint(bag_id, args[0])
+                elif op == "R":
+                    tracker.remove_baggage(bag_id)
+                else:
+                    raise ValueError(f"unknown operation {op!r}")
+            except (ValueError, TypeError, IndexError) as e:
+                raise ValueError(f"Corrupt journal record at byte {good} of {path}: {e}") from e
+            good += len(line)
+            records += 1
+    return records
+
+def open_tracker(directory=DEFAULT_JOURNAL_DIR, seed_csv=None, **options):
+    """Recover the tracker kept in directory (latest snapshot plus its journal) with a journal attached.
+
+    A directory with nothing recorded yet (no snapshot and no journal
+    records) starts from seed_csv when given (e.g. lost_baggage.csv). The seed
+    is written as snapshot 1 before any journal is opened, so a crash at any
+    point either leaves the seed durable or seeds again on the next open.
+    options go to TrackerJournal.
+    """
+    os.makedirs(directory, exist_ok=True)
+    names = os.listdir(directory)
+    snapshots = sorted(int(n.split(".")[1]) for n in names if n.startswith("snapshot.") and n.endswith(".csv"))
+    generation = snapshots[-1] if snapshots else 0
+    tracker = LostBaggageTracker()
+    if snapshots:
+        with open(os.path.join(directory, f"snapshot.{generation}.csv"), newline="", encoding="utf-8") as f:
+            _read_rows(tracker, f)
+    records = _replay(tracker, os.path.join(directory, f"journal.{generation}.log"))
+    if not snapshots and not records and seed_csv and os.path.exists(seed_csv):
+        with open(seed_csv, newline="") as f:
+            _read_rows(tracker, f)
+        generation = 1
+        _write_snapshot(tracker, directory, generation)
+    TrackerJournal(tracker, directory, generation, records, **options)
+    # Leftovers of a crash during compaction or seeding
+    for name in os.listdir(directory):
+        parts = name.split(".")
+        if name.endswith(".tmp") or (len(parts) == 3 and parts[1].isdigit() and int(parts[1]) < generation):
+            os.remove(os.path.join(directory, name))
+    return tracker
+
 # Simple CLI menu
 def run_cli(tracker, path):
     while True:
@@ -119,6 +312,7 @@ def run_cli(tracker, path):
         print("4. Update checkpoint")
         print("5. Remove baggage")
         print("6. Save & Exit")
+        print("7. Export CSV")
         choice = input("Choose option: ")
 
         if choice == "1":
@@ -142,13 +336,21 @@ def run_cli(tracker, path):
             bag_id = input("Bag ID: ").upper()
             tracker.remove_baggage(bag_id)
         elif choice == "6":
+            # Closing commits the journal's last group; the CSV is still written for other tools
+            if tracker.journal is not None:
+                tracker.journal.close()
             save_baggage_csv(tracker, path)
             break
+        elif choice == "7":
+            save_baggage_csv(tracker, path)
         else:
             print("Invalid choice.")
+        if tracker.journal is not None:
+            tracker.journal.commit()
 
 # === Run Program ===
 if __name__ == "__main__":
     csv_path = "data/raw/lost_baggage.csv"  # Change if needed
-    tracker = load_baggage_csv(csv_path)
+    # Changes are journaled under DEFAULT_JOURNAL_DIR; the CSV only seeds a new journal and takes exports
+    tracker = open_tracker(DEFAULT_JOURNAL_DIR, seed_csv=csv_path)
     run_cli(tracker, csv_path)
@@ -0,0 +1,291 @@
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Dict, Iterator, List, Optional
+from src.baggage.baggage_flow import Baggage, BaggageMinHeap
+from src.baggage.lost_baggage_tracker import LostBaggageTracker
+
+# ---------- EVENTS ----------
+# One JSON object per line, e.g.
+#
+#   {"event": "scan", "bag": "P0042", "checkpoint": "Security", "priority": 2, "bag_type": "fragile", "risk_level": "high"}
+#
+# "scan" moves the bag into the urgency queue of that checkpoint (priority,
+# bag_type and risk_level are only needed on its first scan) and moves its
+# tracker entry along if the bag is reported lost; "priority" re-ranks a
+# queued bag ("priority" and/or "risk_level"); "load" takes it off its queue
+# for good; "lost" starts tracking it ("owner", "flight") at its last
+# checkpoint and "found" stops tracking it.
+EVENT_TYPES = ("scan", "priority", "load", "lost", "found")
+# The decoder behind json.loads, minus its per-call bytes and argument handling
+_decode = json.JSONDecoder().decode
+
+class ScanIngestor:
+    """Per-checkpoint urgency queues and a LostBaggageTracker kept current by scan events.
+
+    queues maps each checkpoint to a BaggageMinHeap of the bags waiting
+    there, so a belt or gate takes its most urgent bag with pop(checkpoint);
+    location remembers which queue holds each bag. A bag taken off a queue
+    some other way is queued afresh by its next scan. Bad events are
+    counted in stats["errors"] and skipped.
+    """
+
+    def __init__(self, tracker: Optional[LostBaggageTracker] = None):
+        self.queues: Dict[str, BaggageMinHeap] = {}
+        self.location: Dict[str, str] = {}
+        self.tracker = tracker if tracker is not None else LostBaggageTracker()
+        self.stats: Dict[str, int] = dict.fromkeys(("events", "batches", "errors") + EVENT_TYPES, 0)
+        self.last_error: Optional[str] = None
+        self._handlers = {"scan": self._scan, "priority": self._priority, "load": self._load,
+                          "lost": self._lost, "found": self._found}
+
+    def queue(self, checkpoint: str) -> BaggageMinHeap:
+        heap = self.queues.get(checkpoint)
+        if heap is None:
+            heap = self.queues[checkpoint] = BaggageMinHeap()
+        return heap
+
+    def pop(self, checkpoint: str) -> Optional[Baggage]:
+        """Take the most urgent bag off the queue of checkpoint, or None if none is waiting there"""
+        heap = self.queues.get(checkpoint)
+        baggage = heap.pop() if heap is not None else None
+        if baggage is not None:
+            self.location.pop(baggage.passenger_id, None)
+        return baggage
+
+    def apply_batch(self, lines: List[str]):
+        """Apply one micro-batch of event lines in order"""
+        stats = self.stats
+        handlers = self._handlers
+        decode = _decode
+        for line in lines:
+            if not line or line.isspace():
+                continue
+            try:
+                event = decode(line)
+                handlers[event["event"]](event)
+                stats[event["event"]] += 1
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                stats["errors"] += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+            stats["events"] += 1
+        stats["batches"] += 1
+
+    def _scan(self, event: Dict):
+        bag_id, checkpoint = event["bag"], event["checkpoint"]
+        previous = self.location.get(bag_id)
+        baggage = self.queues[previous].remove(bag_id) if previous is not None else None
+        if baggage is None:
+            # First scan, or the bag was popped off its queue directly since the last one
+            baggage = Baggage(bag_id, event["priority"], event["bag_type"], event["risk_level"])
+        self.queue(checkpoint).push(baggage)
+        self.location[bag_id] = checkpoint
+        if bag_id in self.tracker.lookup:
+            # Through the tracker, so a journal attached to it sees the move
+            self.tracker.update_checkpoint(bag_id, checkpoint)
+
+    def _priority(self, event: Dict):
+        bag_id = event["bag"]
+        self.queues[self.location[bag_id]].update(bag_id, event.get("priority"), event.get("risk_level"))
+
+    def _load(self, event: Dict):
+        self.queues[self.location.pop(event["bag"])].remove(event["bag"])
+
+    def _lost(self, event: Dict):
+        bag_id = event["bag"]
+        if bag_id not in self.tracker.lookup:
+            checkpoint = self.location.get(bag_id, event.get("checkpoint", "Unknown"))
+            self.tracker.insert_baggage(bag_id, checkpoint, {"owner": event.get("owner", ""),
+                                                             "flight": event.get("flight", "")})
+
+    def _found(self, event: Dict):
+        if event["bag"] in self.tracker.lookup:
+            self.tracker.remove_baggage(event["bag"])
+
+    def queued(self) -> Dict[str, int]:
+        return {checkpoint: len(heap) for checkpoint, heap in self.queues.items()}
+
+# ---------- PIPELINE ----------
+# Bytes taken from a source per read; the complete lines of one read form a micro-batch
+READ_SIZE = 1 << 16
+# Micro-batches buffered for the consumer; while the buffer is full, sources stop reading
+MAX_PENDING = 32
+# Seconds between polls of a followed file at its end
+TAIL_POLL = 0.2
+
+class ScanIngestPipeline:
+    """Feeds scan events from files and sockets through a bounded buffer into a ScanIngestor.
+
+    Sources read READ_SIZE bytes at a time and queue the complete lines as
+    one micro-batch; a single consumer applies the batches in arrival order.
+    The buffer holds at most max_pending batches, so memory stays below about
+    max_pending * read_size bytes of pending events: once it is full a source
+    waits before reading again, and a socket sender is slowed down by TCP
+    flow control. stats["stalls"] counts the waits.
+    """
+
+    def __init__(self, ingestor: Optional[ScanIngestor] = None, max_pending: int = MAX_PENDING,
+                 read_size: int = READ_SIZE):
+        self.ingestor = ingestor if ingestor is not None else ScanIngestor()
+        self.read_size = read_size
+        self.batches: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.stats = {"stalls": 0, "bytes": 0, "seconds": 0.0}
+        self._commit_timer: Optional[asyncio.TimerHandle] = None
+
+    async def _put(self, batch):
+        if self.batches.full():
+            self.stats["stalls"] += 1
+        await self.batches.put(batch)
+
+    async def _feed(self, read):
+        """Queue the lines of one source; read(size) is awaitable and returns b"" at its end"""
+        tail = b""
+        while True:
+            chunk = await read(self.read_size)
+            if not chunk:
+                break
+            self.stats["bytes"] += len(chunk)
+            # Split off the unfinished last line before decoding, so no character is cut in two
+            complete, newline, tail = (tail + chunk).rpartition(b"\n")
+            if newline:
+                await self._put(complete.decode("utf-8", "replace").split("\n"))
+        if tail.strip():
+            await self._put([tail.decode("utf-8", "replace")])
+
+    async def consume(self):
+        """Apply queued batches until a None batch arrives.
+
+        With a journal on the tracker, records left pending after a batch are
+        committed once the journal's commit_interval has passed: right away if
+        it already has, else by a loop timer. Consuming ends with a commit.
+        """
+        ingestor = self.ingestor
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                batch = await self.batches.get()
+                if batch is None:
+                    return
+                start = time.perf_counter()
+                ingestor.apply_batch(batch)
+                self.stats["seconds"] += time.perf_counter() - start
+                journal = ingestor.tracker.journal
+                if journal is not None and self._commit_timer is None:
+                    wait = journal.commit_due()
+                    if wait is not None:
+                        self._commit_timer = loop.call_later(wait, self._commit_journal)
+        finally:
+            if self._commit_timer is not None:
+                self._commit_timer.cancel()
+            self._commit_journal()
+
+    def _commit_journal(self):
+        self._commit_timer = None
+        journal = self.ingestor.tracker.journal
+        if journal is not None:
+            journal.commit()
+
+    async def tail_file(self, path: str, follow: bool = False, poll: float = TAIL_POLL):
+        """Feed the events of path; with follow, keep waiting for appended lines like tail -f"""
+        with open(path, "rb") as f:
+            async def read(size):
+                while True:
+                    chunk = f.read(size)
+                    if chunk or not follow:
+                        return chunk
+                    await asyncio.sleep(poll)
+            await self._feed(read)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await self._feed(reader.read)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def ingest_file(self, path: str, follow: bool = False) -> Dict[str, int]:
+        """Ingest path to its end (or until cancelled when following) and return the ingestor stats"""
+        consumer = asyncio.ensure_future(self.consume())
+        try:
+            await self.tail_file(path, follow)
+        finally:
+            await self.batches.put(None)
+            await consumer
+        return self.ingestor.stats
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8766, unix_path: Optional[str] = None):
+        """Accept event streams until cancelled, on a Unix socket when unix_path is set"""
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        consumer = asyncio.ensure_future(self.consume())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            consumer.cancel()
+
+# ---------- SYNTHETIC EVENTS ----------
+CHECKPOINT_ROUTE = ("Check-in", "Security", "Sorting Facility", None, "Loading")
+# Checkpoints a bag may take at the None step of CHECKPOINT_ROUTE
+SORTED_TO = ("Gate A", "Gate B", "Transfer")
+BAG_TYPES = ("check-in", "carry-on", "oversized", "fragile")
+RISK_LEVELS = ("low", "medium", "high")
+
+def synthetic_scan_events(n: int, seed: int = 0, in_flight: int = 10_000, lost_rate: float = 0.002,
+                          reprioritize_rate: float = 0.01) -> Iterator[str]:
+    """n event lines of bags travelling CHECKPOINT_ROUTE and then loaded; the same seed replays the same stream.
+
+    At most in_flight bags are between check-in and loading at a time, so
+    an ingestor fed this stream holds a bounded number of bags however long
+    it runs.
+    """
+    rng = random.Random(seed)
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+    active: List[list] = []  # [bag_id, next step, sorted-to checkpoint]
+    lost: List[str] = []
+    next_id = 0
+    for _ in range(n):
+        r = rng.random()
+        if not active or (r < 0.25 and len(active) < in_flight):
+            bag_id = f"S{next_id:08d}"
+            next_id += 1
+            active.append([bag_id, 1, rng.choice(SORTED_TO)])
+            yield dumps({"event": "scan", "bag": bag_id, "checkpoint": CHECKPOINT_ROUTE[0],
+                         "priority": rng.randint(1, 5), "bag_type": rng.choice(BAG_TYPES),
+                         "risk_level": rng.choice(RISK_LEVELS)})
+            continue
+        r = rng.random()
+        pick = rng.randrange(len(active))
+        bag = active[pick]
+        if r < lost_rate:
+            lost.append(bag[0])
+            yield dumps({"event": "lost", "bag": bag[0], "owner": f"Owner{bag[0][1:]}",
+                         "flight": f"AI{rng.randint(100, 999)}"})
+        elif r < 2 * lost_rate and lost:
+            at = rng.randrange(len(lost))
+            lost[at], lost[-1] = lost[-1], lost[at]
+            yield dumps({"event": "found", "bag": lost.pop()})
+        elif r < 2 * lost_rate + reprioritize_rate:
+            yield dumps({"event": "priority", "bag": bag[0], "priority": rng.randint(1, 5)})
+        elif bag[1] == len(CHECKPOINT_ROUTE):
+            # Swap-remove: the order of active bags does not matter
+            active[pick] = active[-1]
+            active.pop()
+            yield dumps({"event": "load", "bag": bag[0]})
+        else:
+            checkpoint = CHECKPOINT_ROUTE[bag[1]] or bag[2]
+            bag[1] += 1
+            yield dumps({"event": "scan", "bag": bag[0], "checkpoint": checkpoint})
+
+def write_scan_events(path: str, n: int, seed: int = 0, **options) -> str:
+    """Write n synthetic events to path as JSON lines for replay"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        for line in synthetic_scan_events(n, seed, **options):
+            f.write(line + "\n")
+    return path
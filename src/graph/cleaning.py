@@ -1,7 +1,26 @@
+import numpy as np
 import pandas as pd
 import os
-import math
 import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from src.graph.cleaning_cache import BuildCache, file_digest, stage_key
+from src.graph.flight_graph import FlightGraph
+from src.graph.geo import haversine, haversine_np  # haversine kept importable from here
+from src.graph.graph_snapshot import write_snapshot
+from src.graph.instrumentation import profiler
+from src.graph.spatial import AirportIndex
+
+# Dummy fare model used for the "cost" weight
+BASE_FARE = 100
+FARE_PER_KM = 0.1
+
+# Bump when cleaning logic changes so cached build artifacts are not reused
+CLEANING_VERSION = 4
+DEFAULT_CACHE_DIR = "data/cache"
+UNRESOLVED_LOG_PATH = "data/new/unresolved_routes_log.csv"
+# Rows per block in streaming mode; bounds peak memory of the route pass
+DEFAULT_CHUNK_ROWS = 100_000
 
 # ---------- LOAD FUNCTIONS ----------
 def load_airports_local(path="data/raw/airports.dat") -> pd.DataFrame:
@@ -21,23 +40,36 @@ def load_airports_local(path="data/raw/airports.dat") -> pd.DataFrame:
     )
     return df
 
-def load_routes_local(path="data/raw/routes.dat") -> pd.DataFrame:
-    cols = [
-        "Airline", "Airline ID", "Source airport", "Source airport ID",
-        "Destination airport", "Destination airport ID", "Codeshare",
-        "Stops", "Equipment"
-    ]
+ROUTE_COLUMNS = [
+    "Airline", "Airline ID", "Source airport", "Source airport ID",
+    "Destination airport", "Destination airport ID", "Codeshare",
+    "Stops", "Equipment"
+]
+ROUTE_ID_COLUMNS = ["Airline ID", "Source airport ID", "Destination airport ID"]
+
+def load_routes_local(path="data/raw/routes.dat", chunksize=None):
     df = pd.read_csv(
         path,
         header=None,
-        names=cols,
+        names=ROUTE_COLUMNS,
         na_values="\\N",
         dtype={"Source airport": str, "Destination airport": str},
         keep_default_na=False,
-        low_memory=False
+        low_memory=False,
+        chunksize=chunksize
     )
     return df
 
+def iter_routes_local(path="data/raw/routes.dat", chunksize=DEFAULT_CHUNK_ROWS):
+    """Yield routes in blocks of chunksize rows, with a continuous row index"""
+    with load_routes_local(path, chunksize=chunksize) as reader:
+        for chunk in reader:
+            # A chunk without "\N" would parse its ID columns as int; keep them float like a full read
+            for col in ROUTE_ID_COLUMNS:
+                if pd.api.types.is_integer_dtype(chunk[col]):
+                    chunk[col] = chunk[col].astype(float)
+            yield chunk
+
 # ---------- CLEANING FUNCTIONS ----------
 def clean_airports(df: pd.DataFrame) -> pd.DataFrame:
     df["IATA"] = df["IATA"].str.strip().str.upper().replace({"": None})
@@ -49,164 +81,329 @@ def clean_airports(df: pd.DataFrame) -> pd.DataFrame:
     df = df.set_index("primary_code", drop=False)
     return df
 
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371.0
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-    a = math.sin(dphi / 2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
-
-def resolve_route_codes(row, airports_clean: pd.DataFrame, airports_raw: pd.DataFrame, unresolved_log: list):
-    row["Source airport"] = str(row["Source airport"]).strip().upper()
-    row["Destination airport"] = str(row["Destination airport"]).strip().upper()
-    resolved = {"src": None, "dst": None}
-
-    # Resolve source
-    if row["Source airport"] in airports_clean.index:
-        resolved["src"] = row["Source airport"]
-    else:
-        try:
-            aid = float(row["Source airport ID"])
-        except Exception:
-            aid = None
-        if aid is not None:
-            candidate = airports_raw[airports_raw["Airport ID"] == aid]
-            if not candidate.empty:
-                primary = candidate["IATA"].fillna(candidate["ICAO"]).iloc[0]
-                primary = primary.strip().upper() if isinstance(primary, str) else primary
-                if primary in airports_clean.index:
-                    resolved["src"] = primary
-
-    # Resolve destination
-    if row["Destination airport"] in airports_clean.index:
-        resolved["dst"] = row["Destination airport"]
-    else:
-        try:
-            did = float(row["Destination airport ID"])
-        except Exception:
-            did = None
-        if did is not None:
-            candidate = airports_raw[airports_raw["Airport ID"] == did]
-            if not candidate.empty:
-                primary = candidate["IATA"].fillna(candidate["ICAO"]).iloc[0]
-                primary = primary.strip().upper() if isinstance(primary, str) else primary
-                if primary in airports_clean.index:
-                    resolved["dst"] = primary
-
-    # Log unresolved
-    if resolved["src"] is None or resolved["dst"] is None:
-        reason = []
-        if resolved["src"] is None:
-            reason.append(f"src_unresolved:{row['Source airport']}|ID:{row['Source airport ID']}")
-        if resolved["dst"] is None:
-            reason.append(f"dst_unresolved:{row['Destination airport']}|ID:{row['Destination airport ID']}")
-        unresolved_log.append({
-            "row_index": row.name,
-            "reason": ";".join(reason),
-            "original_src": row["Source airport"],
-            "original_dst": row["Destination airport"]
+def build_airport_id_map(airports_clean: pd.DataFrame, airports_raw: pd.DataFrame) -> pd.Series:
+    """Map raw Airport ID -> primary_code, keeping only codes present in airports_clean"""
+    ids = airports_raw.drop_duplicates("Airport ID")
+    primary = ids["IATA"].fillna(ids["ICAO"])
+    primary = primary.where(primary.isna(), primary.astype(str).str.strip().str.upper())
+    id_map = pd.Series(primary.values, index=ids["Airport ID"].astype(float).values)
+    id_map = id_map[id_map.isin(airports_clean.index)]
+    return id_map[~id_map.index.isna()]
+
+def _normalize_codes(codes: pd.Series) -> pd.Series:
+    return codes.astype(str).fillna("nan").str.strip().str.upper()
+
+def resolve_route_columns(codes: pd.Series, ids: pd.Series, airports_clean: pd.DataFrame, id_map: pd.Series) -> pd.Series:
+    """Resolve a whole column of airport codes, falling back to the Airport ID map"""
+    direct = codes.where(codes.isin(airports_clean.index))
+    fallback = pd.Series(pd.to_numeric(ids, errors="coerce").map(id_map).values, index=codes.index)
+    return direct.fillna(fallback)
+
+def compute_route_metrics(routes_df: pd.DataFrame, airports_clean: pd.DataFrame) -> pd.DataFrame:
+    """Fill distance_km, delay and cost for every route in one pass over the columns"""
+    # Position -1 (unknown code) picks the trailing NaN and yields a NaN distance
+    lat = np.append(airports_clean["Latitude"].to_numpy(dtype=float), np.nan)
+    lon = np.append(airports_clean["Longitude"].to_numpy(dtype=float), np.nan)
+    src_pos = airports_clean.index.get_indexer(routes_df["Source airport"])
+    dst_pos = airports_clean.index.get_indexer(routes_df["Destination airport"])
+    distance = haversine_np(lat[src_pos], lon[src_pos], lat[dst_pos], lon[dst_pos])
+
+    routes_df["distance_km"] = distance
+    # Add dummy delay & cost
+    routes_df["delay"] = 0.0
+    routes_df["cost"] = BASE_FARE + FARE_PER_KM * routes_df["distance_km"]
+    return routes_df
+
+def clean_route_chunk(df: pd.DataFrame, airports_clean: pd.DataFrame, id_map: pd.Series):
+    """Resolve and score one block of routes; returns (resolved_df, unresolved_log, summary)"""
+    with profiler.stage("resolve_routes", len(df)):
+        df["Source airport"] = df["Source airport"].astype(str)
+        df["Destination airport"] = df["Destination airport"].astype(str)
+
+        src_codes = _normalize_codes(df["Source airport"])
+        dst_codes = _normalize_codes(df["Destination airport"])
+        src = resolve_route_columns(src_codes, df["Source airport ID"], airports_clean, id_map)
+        dst = resolve_route_columns(dst_codes, df["Destination airport ID"], airports_clean, id_map)
+
+        # Log unresolved
+        src_missing = src.isna()
+        dst_missing = dst.isna()
+        unresolved = src_missing | dst_missing
+        src_reason = ("src_unresolved:" + src_codes + "|ID:" + df["Source airport ID"].map(str)).where(src_missing)
+        dst_reason = ("dst_unresolved:" + dst_codes + "|ID:" + df["Destination airport ID"].map(str)).where(dst_missing)
+        reason = src_reason.fillna(dst_reason)
+        reason[src_missing & dst_missing] = src_reason + ";" + dst_reason
+        unresolved_log = pd.DataFrame({
+            "row_index": df.index[unresolved],
+            "reason": reason[unresolved].values,
+            "original_src": src_codes[unresolved].values,
+            "original_dst": dst_codes[unresolved].values
         })
-        return None
 
-    # Return resolved row
-    row["Source airport"] = resolved["src"]
-    row["Destination airport"] = resolved["dst"]
-    return row
-
-def clean_routes_with_fallback(df: pd.DataFrame, airports_clean: pd.DataFrame, airports_raw: pd.DataFrame):
-    df["Source airport"] = df["Source airport"].astype(str)
-    df["Destination airport"] = df["Destination airport"].astype(str)
-    unresolved_log = []
-    resolved_rows = []
-
-    for idx, row in df.iterrows():
-        new_row = resolve_route_codes(row.copy(), airports_clean, airports_raw, unresolved_log)
-        if new_row is not None:
-            resolved_rows.append(new_row)
-
-    resolved_df = pd.DataFrame(resolved_rows)
-
-    # Compute distance
-    def compute_distance(row):
-        try:
-            src = airports_clean.loc[row["Source airport"]]
-            dst = airports_clean.loc[row["Destination airport"]]
-            return haversine(src["Latitude"], src["Longitude"], dst["Latitude"], dst["Longitude"])
-        except Exception:
-            return float("nan")
-
-    resolved_df["distance_km"] = resolved_df.apply(compute_distance, axis=1)
+        resolved_df = df[~unresolved].copy()
+        resolved_df["Source airport"] = src[~unresolved]
+        resolved_df["Destination airport"] = dst[~unresolved]
 
     before = len(resolved_df)
-    resolved_df = resolved_df[resolved_df["distance_km"].notna()]
-    dropped_distance = before - len(resolved_df)
-
-    # Add dummy delay & cost
-    resolved_df["delay"] = 0.0
-    resolved_df["cost"] = 100 + 0.1 * resolved_df["distance_km"]
-
-    # Save unresolved log
-    os.makedirs("data/new", exist_ok=True)
-    pd.DataFrame(unresolved_log).to_csv("data/new/unresolved_routes_log.csv", index=False)
+    with profiler.stage("route_distances", before):
+        resolved_df = compute_route_metrics(resolved_df, airports_clean)
+        resolved_df = resolved_df[resolved_df["distance_km"].notna()]
 
     summary = {
         "total_input": len(df),
         "resolved": len(resolved_df),
         "unresolved_logged": len(unresolved_log),
-        "dropped_due_distance": dropped_distance
+        "dropped_due_distance": before - len(resolved_df)
     }
+    return resolved_df, unresolved_log, summary
+
+def merge_summaries(summaries) -> dict:
+    merged = {"total_input": 0, "resolved": 0, "unresolved_logged": 0, "dropped_due_distance": 0}
+    for summary in summaries:
+        for key in merged:
+            merged[key] += summary[key]
+    return merged
+
+def clean_routes_with_fallback(df: pd.DataFrame, airports_clean: pd.DataFrame, airports_raw: pd.DataFrame,
+                               log_path: str = UNRESOLVED_LOG_PATH):
+    id_map = build_airport_id_map(airports_clean, airports_raw)
+    resolved_df, unresolved_log, summary = clean_route_chunk(df, airports_clean, id_map)
+
+    # Save unresolved log
+    os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+    with profiler.stage("persist_unresolved_log", len(unresolved_log)):
+        unresolved_log.to_csv(log_path, index=False)
 
     return resolved_df, summary
 
-def generate_cleaning_report(airports_raw, airports_clean, routes_raw, routes_clean_summary):
+# ---------- PARALLEL CLEANING ----------
+# Airport lookups installed once per worker process by the pool initializer,
+# so tasks only ship their own block of routes
+_worker_airports = None
+_worker_id_map = None
+
+def _init_route_worker(airports_lookup: pd.DataFrame, id_map: pd.Series, profile: bool = False):
+    global _worker_airports, _worker_id_map
+    _worker_airports = airports_lookup
+    _worker_id_map = id_map
+    # Forked workers inherit the parent's stages; start from none so only their own are sent back
+    profiler.enabled = profile
+    profiler.reset()
+
+def _clean_route_block(df: pd.DataFrame):
+    # The block's stage timings travel back with it and are merged by _clean_blocks
+    return clean_route_chunk(df, _worker_airports, _worker_id_map), profiler.drain()
+
+def _route_worker_pool(airports_clean: pd.DataFrame, id_map: pd.Series, workers: int) -> ProcessPoolExecutor:
+    # Route cleaning only reads the index and coordinates of the cleaned airports
+    airports_lookup = airports_clean[["Latitude", "Longitude"]]
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_route_worker,
+                               initargs=(airports_lookup, id_map, profiler.enabled))
+
+def _clean_blocks(blocks, airports_clean: pd.DataFrame, id_map: pd.Series, workers=None):
+    """Clean an iterable of route blocks, yielding results in input order.
+
+    With workers set, blocks are cleaned on a process pool with at most two
+    blocks per worker in flight, so results merge exactly like a serial run.
+    """
+    if not workers or workers <= 1:
+        for block in blocks:
+            yield clean_route_chunk(block, airports_clean, id_map)
+        return
+    with _route_worker_pool(airports_clean, id_map, workers) as pool:
+        pending = deque()
+        for block in blocks:
+            pending.append(pool.submit(_clean_route_block, block))
+            if len(pending) >= 2 * workers:
+                yield _merge_block_stages(pending.popleft().result())
+        while pending:
+            yield _merge_block_stages(pending.popleft().result())
+
+def _merge_block_stages(result):
+    cleaned, stages = result
+    profiler.merge(stages)
+    return cleaned
+
+def clean_routes_parallel(df: pd.DataFrame, airports_clean: pd.DataFrame, airports_raw: pd.DataFrame,
+                          log_path: str = UNRESOLVED_LOG_PATH, workers: int = os.cpu_count(),
+                          partitions=None):
+    """clean_routes_with_fallback split into row partitions cleaned on a process pool"""
+    id_map = build_airport_id_map(airports_clean, airports_raw)
+    partitions = partitions or 4 * workers
+    size = max(1, -(-len(df) // partitions))
+    blocks = (df.iloc[start:start + size] for start in range(0, len(df), size))
+    results = list(_clean_blocks(blocks, airports_clean, id_map, workers))
+
+    resolved_df = pd.concat([r[0] for r in results]) if results else df.iloc[:0]
+    unresolved_log = pd.concat([r[1] for r in results], ignore_index=True) if results else pd.DataFrame()
+
+    # Save unresolved log
+    os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+    with profiler.stage("persist_unresolved_log", len(unresolved_log)):
+        unresolved_log.to_csv(log_path, index=False)
+
+    return resolved_df, merge_summaries(r[2] for r in results)
+
+def clean_routes_streaming(routes_src: str, airports_clean: pd.DataFrame, airports_raw: pd.DataFrame,
+                           routes_path: str, log_path: str = UNRESOLVED_LOG_PATH,
+                           chunksize: int = DEFAULT_CHUNK_ROWS, workers=None) -> dict:
+    """Clean a routes file chunk by chunk, appending to routes_path and log_path.
+
+    Routes are held in memory one chunk at a time (up to two per worker when
+    workers is set), so peak memory is bounded by chunksize rows plus the
+    airport index. Returns the summary.
+    """
+    id_map = build_airport_id_map(airports_clean, airports_raw)
+    summaries = []
+    chunks = profiler.iterate("load_routes", iter_routes_local(routes_src, chunksize))
+    blocks = _clean_blocks(chunks, airports_clean, id_map, workers)
+    for i, (resolved_df, unresolved_log, summary) in enumerate(blocks):
+        mode, header = ("w", True) if i == 0 else ("a", False)
+        with profiler.stage("persist_routes", len(resolved_df)):
+            resolved_df.to_csv(routes_path, mode=mode, header=header, index=False)
+        with profiler.stage("persist_unresolved_log", len(unresolved_log)):
+            unresolved_log.to_csv(log_path, mode=mode, header=header, index=False)
+        summaries.append(summary)
+    return merge_summaries(summaries)
+
+def generate_cleaning_report(airports_raw, airports_clean, routes_raw, routes_clean_summary,
+                             log_path=UNRESOLVED_LOG_PATH):
     report = {
         "airports_raw_count": len(airports_raw),
         "airports_clean_count": len(airports_clean),
         "airport_primary_unique": airports_clean.index.is_unique,
-        "routes_raw_count": len(routes_raw),
+        "routes_raw_count": routes_clean_summary["total_input"],
         "routes_after_resolution": routes_clean_summary["resolved"],
         "routes_unresolved_logged": routes_clean_summary["unresolved_logged"],
         "routes_dropped_distance": routes_clean_summary["dropped_due_distance"]
     }
 
     try:
-        ul = pd.read_csv("data/new/unresolved_routes_log.csv")
+        ul = pd.read_csv(log_path)
         report["top_unresolved_reasons"] = ul["reason"].value_counts().head(10).to_dict()
     except FileNotFoundError:
         report["top_unresolved_reasons"] = {}
 
     return report
 
-# ---------- MAIN RUN FUNCTION ----------
-def run_full_cleaning_pipeline():
-    os.makedirs("data/new", exist_ok=True)
-
-    airports_raw = load_airports_local()
-    routes_raw = load_routes_local()
+def load_routes_clean(path="data/new/routes.csv") -> pd.DataFrame:
+    """Read a cleaned routes.csv back, keeping airport and airline codes as strings"""
+    return pd.read_csv(path, dtype={"Airline": str, "Source airport": str, "Destination airport": str},
+                       keep_default_na=False, float_precision="round_trip")
 
-    airports_clean = clean_airports(airports_raw)
-    routes_clean_df, summary = clean_routes_with_fallback(routes_raw, airports_clean, airports_raw)
-
-    # Persist cleaned data
-    airports_path = "data/new/airports.csv"
-    routes_path = "data/new/routes.csv"
-    report_path = "data/new/cleaning_report.json"
-
-    airports_clean.to_csv(airports_path)
-    routes_clean_df.to_csv(routes_path, index=False)
-
-    report = generate_cleaning_report(airports_raw, airports_clean, routes_raw, summary)
-
-    with open(report_path, "w") as f:
-        json.dump(report, f, indent=2)
+# ---------- MAIN RUN FUNCTION ----------
+def run_full_cleaning_pipeline(airports_src="data/raw/airports.dat", routes_src="data/raw/routes.dat",
+                               out_dir="data/new", cache_dir=DEFAULT_CACHE_DIR, chunksize=None,
+                               workers=None, profile=False):
+    """Clean airports and routes, persist them to out_dir and return (airports, routes, report).
+
+    Each stage is cached under cache_dir, keyed by the content hash of its raw
+    input and the cleaning parameters; pass cache_dir=None to always rebuild.
+    With chunksize set, routes are streamed in blocks of that many rows straight
+    to out_dir, the graph snapshot is built from routes.csv without pandas and
+    the returned routes frame is None. With workers > 1, route
+    blocks are cleaned on a process pool; the output is identical to a serial run.
+    With profile set (or FLIGHT_PROFILE in the environment), the wall time and
+    row count of every stage are added to the report under "timings"; the
+    profiler is switched back afterwards, so other callers are not profiled.
+    """
+    was_enabled = profiler.enabled
+    if profile:
+        profiler.enabled = True
+    try:
+        return _run_pipeline(airports_src, routes_src, out_dir, cache_dir, chunksize, workers)
+    finally:
+        profiler.enabled = was_enabled
+
+def _run_pipeline(airports_src, routes_src, out_dir, cache_dir, chunksize, workers):
+    profiler.reset()
+    os.makedirs(out_dir, exist_ok=True)
+    cache = BuildCache(cache_dir)
+
+    airports_path = os.path.join(out_dir, "airports.csv")
+    airport_index_path = os.path.join(out_dir, "airports_index.npz")
+    routes_path = os.path.join(out_dir, "routes.csv")
+    log_path = os.path.join(out_dir, "unresolved_routes_log.csv")
+    report_path = os.path.join(out_dir, "cleaning_report.json")
+    graph_path = os.path.join(out_dir, "routes.graph")
+
+    # Airports stage
+    airports_key = stage_key("airports", CLEANING_VERSION, pd.__version__, file_digest(airports_src))
+    with profiler.stage("cache_lookup_airports"):
+        cached = cache.load("airports", airports_key)
+    if cached is not None:
+        airports_raw, airports_clean = cached
+        with profiler.stage("cache_restore_airports", len(airports_clean)):
+            cache.restore("airports", airports_key, out_dir)
+    else:
+        with profiler.stage("load_airports") as stage:
+            airports_raw = load_airports_local(airports_src)
+            stage.rows = len(airports_raw)
+        with profiler.stage("clean_airports") as stage:
+            airports_clean = clean_airports(airports_raw)
+            stage.rows = len(airports_clean)
+        with profiler.stage("persist_airports", len(airports_clean)):
+            airports_clean.to_csv(airports_path)
+            # Spatial index for nearest-airport and radius lookups (see spatial.py)
+            AirportIndex.from_airports(airports_clean).save(airport_index_path)
+        cache.store("airports", airports_key, (airports_raw, airports_clean), [airports_path, airport_index_path])
+
+    # Routes stage, reusing the cleaned airports it depends on
+    routes_key = stage_key("routes", airports_key, file_digest(routes_src), BASE_FARE, FARE_PER_KM,
+                           chunksize is not None)
+    with profiler.stage("cache_lookup_routes"):
+        cached = cache.load("routes", routes_key)
+    if cached is not None:
+        routes_clean_df, report = cached
+        with profiler.stage("cache_restore_routes", report["routes_after_resolution"]):
+            cache.restore("routes", routes_key, out_dir)
+    else:
+        if chunksize is not None:
+            routes_raw = routes_clean_df = None
+            summary = clean_routes_streaming(routes_src, airports_clean, airports_raw, routes_path, log_path,
+                                             chunksize, workers)
+        else:
+            with profiler.stage("load_routes") as stage:
+                routes_raw = load_routes_local(routes_src)
+                stage.rows = len(routes_raw)
+            if workers and workers > 1:
+                routes_clean_df, summary = clean_routes_parallel(routes_raw, airports_clean, airports_raw,
+                                                                 log_path, workers)
+            else:
+                routes_clean_df, summary = clean_routes_with_fallback(routes_raw, airports_clean, airports_raw,
+                                                                      log_path)
+            with profiler.stage("persist_routes", len(routes_clean_df)):
+                routes_clean_df.to_csv(routes_path, index=False)
+
+        report = generate_cleaning_report(airports_raw, airports_clean, routes_raw, summary, log_path)
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+        # Binary graph snapshot for query processes (see graph_snapshot.py)
+        with profiler.stage("build_graph") as stage:
+            if routes_clean_df is not None:
+                graph = FlightGraph.from_routes_df(routes_clean_df)
+            else:
+                # Streamed routes never exist as one frame; read the written file back in blocks
+                graph = FlightGraph.from_routes_csv(routes_path)
+            graph.set_coordinates(airports_clean.index, airports_clean["Latitude"], airports_clean["Longitude"])
+            stage.rows = graph.num_edges
+        with profiler.stage("persist_snapshot", graph.num_edges):
+            write_snapshot(graph, graph_path)
+        cache.store("routes", routes_key, (routes_clean_df, report), [routes_path, log_path, report_path, graph_path])
+
+    if profiler.enabled:
+        # Timings describe this run, so they stay out of the cached report
+        report = dict(report, timings=profiler.report())
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
 
     # Print paths
     print(f"[INFO] Airports saved to {os.path.abspath(airports_path)}")
+    print(f"[INFO] Airport spatial index saved to {os.path.abspath(airport_index_path)}")
     print(f"[INFO] Routes saved to {os.path.abspath(routes_path)}")
     print(f"[INFO] Cleaning report saved to {os.path.abspath(report_path)}")
+    print(f"[INFO] Graph snapshot saved to {os.path.abspath(graph_path)}")
 
     return airports_clean, routes_clean_df, report
 
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+
+# ---------- HASHING ----------
+def file_digest(path, block_size=1 << 20) -> str:
+    """SHA-256 of a file's content, read in blocks"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def stage_key(*parts) -> str:
+    """Hash JSON-serializable key parts (input digests, parameters, versions) into a cache key"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# ---------- BUILD CACHE ----------
+# Largest artifact (payload plus files) worth keeping; bigger stage outputs are rebuilt instead
+DEFAULT_MAX_ARTIFACT_BYTES = 1 << 30
+
+class BuildCache:
+    """Content-addressed store of pipeline stage artifacts.
+
+    Each artifact is a directory named <stage>-<key> holding a pickled payload
+    plus copies of the files the stage wrote, so a hit can restore them as-is.
+    A cache created with cache_dir=None is disabled and never hits, and
+    artifacts larger than max_artifact_bytes are not stored.
+    """
+
+    def __init__(self, cache_dir, max_artifact_bytes=DEFAULT_MAX_ARTIFACT_BYTES):
+        self.cache_dir = cache_dir
+        self.max_artifact_bytes = max_artifact_bytes
+
+    @property
+    def enabled(self):
+        return self.cache_dir is not None
+
+    def _artifact_dir(self, stage, key):
+        return os.path.join(self.cache_dir, f"{stage}-{key}")
+
+    def load(self, stage, key):
+        """Return the stored payload for (stage, key), or None on a miss"""
+        if not self.enabled:
+            return None
+        path = os.path.join(self._artifact_dir(stage, key), "payload.pkl")
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def store(self, stage, key, payload, files=()) -> bool:
+        """Write payload and copies of files as the artifact for (stage, key); return whether it was stored.
+
+        The artifact is assembled in a temporary directory and renamed into
+        place, so readers never see a partial one. Only an unusable cache_dir
+        or an artifact over max_artifact_bytes skips caching; any other error
+        is raised after the temporary directory is removed.
+        """
+        if not self.enabled:
+            return False
+        size = sum(os.path.getsize(path) for path in files)
+        if size > self.max_artifact_bytes:
+            return False
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(prefix=f".{stage}-", dir=self.cache_dir)
+        except OSError:
+            return False
+        artifact_dir = self._artifact_dir(stage, key)
+        try:
+            for path in files:
+                shutil.copyfile(path, os.path.join(tmp_dir, os.path.basename(path)))
+            # Payload goes last: its presence marks a complete artifact
+            payload_path = os.path.join(tmp_dir, "payload.pkl")
+            with open(payload_path, "wb") as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            if size + os.path.getsize(payload_path) > self.max_artifact_bytes:
+                return False
+            if os.path.isdir(artifact_dir) and not os.path.exists(os.path.join(artifact_dir, "payload.pkl")):
+                # Left over by an interrupted older version; never loadable, so replace it
+                shutil.rmtree(artifact_dir)
+            try:
+                os.replace(tmp_dir, artifact_dir)
+            except OSError:
+                if not os.path.exists(os.path.join(artifact_dir, "payload.pkl")):
+                    raise
+                # Another run stored the same artifact first; content is identical
+            return True
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def restore(self, stage, key, out_dir):
+        """Copy the files stored with an artifact into out_dir"""
+        artifact_dir = self._artifact_dir(stage, key)
+        for name in os.listdir(artifact_dir):
+            if name != "payload.pkl":
+                # Copy then rename, so readers mapping the old file never see it rewritten in place
+                fd, tmp_path = tempfile.mkstemp(prefix=f".{name}-", dir=out_dir)
+                os.close(fd)
+                shutil.copyfile(os.path.join(artifact_dir, name), tmp_path)
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, os.path.join(out_dir, name))
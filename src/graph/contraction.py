@@ -0,0 +1,383 @@
+import hashlib
+import heapq
+import os
+import random
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.graph.flight_graph import FlightGraph, WEIGHT_KEYS
+
+# ---------- CONTRACTION HIERARCHY ----------
+# Witness searches stop after settling this many nodes; a missed witness only
+# adds a redundant shortcut, never a wrong answer
+WITNESS_SETTLE_LIMIT = 60
+
+def _collapse_edges(graph: FlightGraph, weight_key: str):
+    """Cheapest edge per (source, destination) pair, without self-loops"""
+    w = graph.weights[weight_key]
+    src = np.repeat(np.arange(len(graph.node_codes)), np.diff(graph.offsets))
+    dst = graph.targets.astype(np.int64)
+    keep = src != dst
+    src, dst, w = src[keep], dst[keep], w[keep]
+    order = np.lexsort((w, dst, src))
+    src, dst, w = src[order], dst[order], w[order]
+    first = np.ones(len(src), dtype=bool)
+    first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+    return src[first].tolist(), dst[first].tolist(), w[first].tolist()
+
+def graph_fingerprint(graph: FlightGraph, weight_key: str) -> str:
+    """SHA-256 of what a hierarchy for weight_key is built from: airports, CSR arrays and that metric's weights"""
+    graph._compact()
+    h = hashlib.sha256("\n".join(graph.node_codes).encode("utf-8"))
+    # Fixed dtypes, so a snapshot-mapped graph hashes like the same graph built from the CSV
+    for arr, dtype in ((graph.offsets, np.int64), (graph.targets, np.int64), (graph.weights[weight_key], np.float64)):
+        h.update(np.ascontiguousarray(arr, dtype=dtype).tobytes())
+    return h.hexdigest()
+
+def _witness_search(out, source, skip, max_dist, targets):
+    """Distances from source to targets in the remaining graph, avoiding skip"""
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    remaining = len(targets)
+    settled = 0
+    while heap and remaining and settled < WITNESS_SETTLE_LIMIT:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        settled += 1
+        if u in targets:
+            remaining -= 1
+        for v, w in out[u].items():
+            alt = d + w
+            # Paths longer than the longest candidate shortcut can never be witnesses
+            if alt <= max_dist and v != skip and alt < dist.get(v, float("inf")):
+                dist[v] = alt
+                heapq.heappush(heap, (alt, v))
+    return dist
+
+def _shortcuts_for(out, inn, x):
+    """Shortcuts (u, v, weight) needed to preserve shortest paths when x is removed"""
+    shortcuts = []
+    for u, w_in in inn[x].items():
+        candidates = {v: w_in + w_out for v, w_out in out[x].items() if v != u}
+        if not candidates:
+            continue
+        dist = _witness_search(out, u, x, max(candidates.values()), set(candidates))
+        for v, via in candidates.items():
+            if dist.get(v, float("inf")) > via:
+                shortcuts.append((u, v, via))
+    return shortcuts
+
+class ContractionHierarchy:
+    """Contraction hierarchy for one weight metric of a FlightGraph.
+
+    Every edge of the hierarchy (original or shortcut) is stored once: edges
+    towards a higher-ranked node in the "up" lists of their source, the others
+    in the "down" lists of their destination. middle is the contracted node a
+    shortcut bypasses, or -1 for an original edge.
+
+    Queries are answered from hub labels computed once from the hierarchy:
+    the pruned upward search space of every node, in both directions.
+    graph_edges and fingerprint (graph_fingerprint) identify the graph it was
+    built from, so load can refuse a hierarchy of an older graph.
+    """
+
+    def __init__(self, weight_key: str, node_codes: List[str], rank: np.ndarray,
+                 up_offsets: np.ndarray, up_targets: np.ndarray, up_weights: np.ndarray, up_middle: np.ndarray,
+                 down_offsets: np.ndarray, down_sources: np.ndarray, down_weights: np.ndarray,
+                 down_middle: np.ndarray, labels=None, graph_edges: int = -1, fingerprint: str = ""):
+        self.weight_key = weight_key
+        self.graph_edges = graph_edges
+        self.fingerprint = fingerprint
+        self.node_codes = list(node_codes)
+        self.node_index = {code: i for i, code in enumerate(self.node_codes)}
+        self.rank = rank
+        self.up_offsets, self.up_targets, self.up_weights, self.up_middle = up_offsets, up_targets, up_weights, up_middle
+        self.down_offsets, self.down_sources, self.down_weights, self.down_middle = (
+            down_offsets, down_sources, down_weights, down_middle)
+        self.last_stats: Dict[str, int] = {}
+        # Per-node (neighbor, weight) lists: plain Python lists keep the query loop fast
+        self._up = self._adjacency(up_offsets, up_targets, up_weights)
+        self._down = self._adjacency(down_offsets, down_sources, down_weights)
+        # Forward and backward hub labels, each (offsets, hubs, distances, parents) sorted by hub
+        self.labels = labels if labels is not None else self._build_labels()
+
+    @staticmethod
+    def _adjacency(offsets, nodes, weights):
+        nodes, weights, bounds = nodes.tolist(), weights.tolist(), offsets.tolist()
+        return [list(zip(nodes[bounds[i]:bounds[i + 1]], weights[bounds[i]:bounds[i + 1]]))
+                for i in range(len(bounds) - 1)]
+
+    @property
+    def num_shortcuts(self) -> int:
+        return int((self.up_middle >= 0).sum() + (self.down_middle >= 0).sum())
+
+    @classmethod
+    def build(cls, graph: FlightGraph, weight_key: str = "distance") -> "ContractionHierarchy":
+        graph._compact()
+        if weight_key not in graph.weights:
+            raise KeyError(f"Unknown weight metric '{weight_key}'")
+        if (graph.weights[weight_key] < 0).any():
+            raise ValueError(f"Contraction hierarchies need non-negative weights; '{weight_key}' has negative edges")
+        n = len(graph.node_codes)
+        out: List[Dict[int, float]] = [{} for _ in range(n)]
+        inn: List[Dict[int, float]] = [{} for _ in range(n)]
+        for u, v, w in zip(*_collapse_edges(graph, weight_key)):
+            out[u][v] = w
+            inn[v][u] = w
+        middle: Dict[Tuple[int, int], int] = {}
+        final: List[Tuple[int, int, float]] = []
+
+        # Order by edge difference plus contracted neighbours, with lazy updates
+        deleted = [0] * n
+
+        def simulate(x):
+            shortcuts = _shortcuts_for(out, inn, x)
+            return len(shortcuts) - len(out[x]) - len(inn[x]) + deleted[x], shortcuts
+
+        # Seed with the shortcut-free estimate; exact values are simulated when a node is popped
+        heap = [(len(out[x]) * len(inn[x]) - len(out[x]) - len(inn[x]), x) for x in range(n)]
+        heapq.heapify(heap)
+        rank = np.zeros(n, dtype=np.int32)
+        level = 0
+        while heap:
+            _, x = heapq.heappop(heap)
+            current, shortcuts = simulate(x)
+            if heap and current > heap[0][0]:
+                heapq.heappush(heap, (current, x))
+                continue
+            for u, v, w in shortcuts:
+                if w < out[u].get(v, float("inf")):
+                    out[u][v] = w
+                    inn[v][u] = w
+                    middle[(u, v)] = x
+            for v, w in out[x].items():
+                final.append((x, v, w))
+                del inn[v][x]
+                deleted[v] += 1
+            for u, w in inn[x].items():
+                final.append((u, x, w))
+                del out[u][x]
+                deleted[u] += 1
+            out[x] = {}
+            inn[x] = {}
+            rank[x] = level
+            level += 1
+
+        src = np.array([e[0] for e in final], dtype=np.int64)
+        dst = np.array([e[1] for e in final], dtype=np.int64)
+        wts = np.array([e[2] for e in final], dtype=np.float64)
+        mid = np.array([middle.get((e[0], e[1]), -1) for e in final], dtype=np.int32)
+        upward = rank[dst] > rank[src]
+        up_order = np.lexsort((dst[upward], src[upward]))
+        down_order = np.lexsort((src[~upward], dst[~upward]))
+
+        def offsets_of(keys):
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(keys, minlength=n), out=offsets[1:])
+            return offsets
+
+        return cls(weight_key, graph.node_codes, rank,
+                   offsets_of(src[upward]), dst[upward][up_order].astype(np.int32),
+                   wts[upward][up_order], mid[upward][up_order],
+                   offsets_of(dst[~upward]), src[~upward][down_order].astype(np.int32),
+                   wts[~upward][down_order], mid[~upward][down_order],
+                   graph_edges=graph.num_edges, fingerprint=graph_fingerprint(graph, weight_key))
+
+    # ---------- Query ----------
+    def _edge(self, u: int, v: int) -> Tuple[float, int]:
+        """(weight, middle) of hierarchy edge u -> v"""
+        if self.rank[v] > self.rank[u]:
+            start, end = int(self.up_offsets[u]), int(self.up_offsets[u + 1])
+            i = start + int(np.searchsorted(self.up_targets[start:end], v))
+            return float(self.up_weights[i]), int(self.up_middle[i])
+        start, end = int(self.down_offsets[v]), int(self.down_offsets[v + 1])
+        i = start + int(np.searchsorted(self.down_sources[start:end], u))
+        return float(self.down_weights[i]), int(self.down_middle[i])
+
+    def _unpack(self, path_ids: List[int]) -> List[int]:
+        """Expand shortcuts until every leg is an original edge"""
+        result = [path_ids[0]]
+        stack = [(u, v) for u, v in reversed(list(zip(path_ids, path_ids[1:])))]
+        while stack:
+            u, v = stack.pop()
+            _, x = self._edge(u, v)
+            if x < 0:
+                result.append(v)
+            else:
+                stack.append((x, v))
+                stack.append((u, x))
+        return result
+
+    def _upward_search(self, node: int, side: int):
+        """Full search from node over upward edges (side 0) or reversed downward edges (side 1).
+
+        Returns {reached node: (distance, parent)}, leaving out nodes stalled
+        on demand: a higher node reaches them more cheaply, so they cannot be
+        the top of a shortest path.
+        """
+        inf = float("inf")
+        search = (self._up, self._down)
+        dist = {node: 0.0}
+        link = {node: -1}
+        label = {}
+        heap = [(0.0, node)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            if any(dist.get(x, inf) + w < d for x, w in search[1 - side][u]):
+                continue
+            label[u] = (d, link[u])
+            for v, w in search[side][u]:
+                alt = d + w
+                if alt < dist.get(v, inf):
+                    dist[v] = alt
+                    link[v] = u
+                    heapq.heappush(heap, (alt, v))
+        return label
+
+    def _build_labels(self):
+        """Hub labels: each node's pruned upward search space, in both directions"""
+        labels = []
+        for side in (0, 1):
+            offsets = np.zeros(len(self.node_codes) + 1, dtype=np.int64)
+            hubs, dists, parents = [], [], []
+            for node in range(len(self.node_codes)):
+                label = self._upward_search(node, side)
+                for hub in sorted(label):
+                    d, parent = label[hub]
+                    hubs.append(hub)
+                    dists.append(d)
+                    parents.append(parent)
+                offsets[node + 1] = len(hubs)
+            labels.append((offsets, np.array(hubs, dtype=np.int32), np.array(dists, dtype=np.float64),
+                           np.array(parents, dtype=np.int32)))
+        return labels
+
+    def _label_path(self, side: int, node: int, hub: int) -> List[int]:
+        """Hierarchy nodes from node up to hub (side 0) or from hub down to node (side 1)"""
+        offsets, hubs, _, parents = self.labels[side]
+        start, end = int(offsets[node]), int(offsets[node + 1])
+        entries = hubs[start:end]
+        path = [hub]
+        cur = hub
+        while cur != node:
+            cur = int(parents[start + int(np.searchsorted(entries, cur))])
+            path.append(cur)
+        if side == 0:
+            path.reverse()
+        return path
+
+    def query(self, source: str, target: str) -> Tuple[Optional[float], List[str]]:
+        """Shortest (distance, path) from source to target, like FlightGraph.dijkstra.
+
+        The best meeting hub is the common entry of the source's forward label
+        and the target's backward label with the smallest summed distance.
+        """
+        s = self.node_index.get(source)
+        t = self.node_index.get(target)
+        if s is None or t is None:
+            return (0.0, [source]) if source == target else (None, [])
+
+        (f_offsets, f_hubs, f_dist, _), (b_offsets, b_hubs, b_dist, _) = self.labels
+        fs, fe = f_offsets[s], f_offsets[s + 1]
+        bs, be = b_offsets[t], b_offsets[t + 1]
+        common, fi, bi = np.intersect1d(f_hubs[fs:fe], b_hubs[bs:be], assume_unique=True, return_indices=True)
+        self.last_stats = {"algorithm": "hub_labels", "label_entries": int(fe - fs + be - bs)}
+        if not len(common):
+            return None, []
+        best = int(np.argmin(f_dist[fs:fe][fi] + b_dist[bs:be][bi]))
+        hub = int(common[best])
+
+        up_path = self._label_path(0, s, hub) + self._label_path(1, t, hub)[1:]
+        path_ids = self._unpack(up_path)
+        # Sum the original legs left to right, exactly as dijkstra accumulates them
+        total = 0.0
+        for u, v in zip(path_ids, path_ids[1:]):
+            total += self._edge(u, v)[0]
+        return total, [self.node_codes[i] for i in path_ids]
+
+    # ---------- Persistence ----------
+    def save(self, path: str):
+        arrays = {}
+        for side, name in ((0, "forward"), (1, "backward")):
+            for part, arr in zip(("offsets", "hubs", "dist", "parent"), self.labels[side]):
+                arrays[f"{name}_{part}"] = arr
+        np.savez(path, weight_key=np.array(self.weight_key), node_codes=np.array(self.node_codes, dtype=str),
+                 rank=self.rank,
+                 up_offsets=self.up_offsets, up_targets=self.up_targets,
+                 up_weights=self.up_weights, up_middle=self.up_middle,
+                 down_offsets=self.down_offsets, down_sources=self.down_sources,
+                 down_weights=self.down_weights, down_middle=self.down_middle,
+                 graph_edges=np.array(self.graph_edges), fingerprint=np.array(self.fingerprint), **arrays)
+
+    @classmethod
+    def load(cls, path: str, *, graph: FlightGraph) -> "ContractionHierarchy":
+        """Read a hierarchy saved by save, checking it was built from graph.
+
+        Raises ValueError when graph has changed since (or the file predates
+        fingerprints): its answers would be for the old routes. Rebuild it
+        then, e.g. with examples/build_shortest_path_index.py.
+        """
+        with np.load(path) as data:
+            weight_key = str(data["weight_key"])
+            graph_edges = int(data["graph_edges"]) if "graph_edges" in data else -1
+            fingerprint = str(data["fingerprint"]) if "fingerprint" in data else ""
+            if not fingerprint:
+                raise ValueError(f"{path} has no graph fingerprint; rebuild it")
+            if graph_edges != graph.num_edges or fingerprint != graph_fingerprint(graph, weight_key):
+                raise ValueError(f"{path} was built from a different graph ({graph_edges} edges, this one has "
+                                 f"{graph.num_edges}, or other routes or weights); rebuild it")
+            labels = [tuple(data[f"{name}_{part}"] for part in ("offsets", "hubs", "dist", "parent"))
+                      for name in ("forward", "backward")]
+            return cls(weight_key, data["node_codes"].tolist(), data["rank"],
+                       data["up_offsets"], data["up_targets"], data["up_weights"], data["up_middle"],
+                       data["down_offsets"], data["down_sources"], data["down_weights"], data["down_middle"],
+                       labels, graph_edges, fingerprint)
+
+# ---------- MULTI-METRIC INDEX ----------
+class ShortestPathIndex:
+    """One ContractionHierarchy per weight metric, answering (source, target, weight_key) queries"""
+
+    def __init__(self, hierarchies: Dict[str, ContractionHierarchy]):
+        self.hierarchies = hierarchies
+
+    @classmethod
+    def build(cls, graph: FlightGraph, weight_keys=WEIGHT_KEYS) -> "ShortestPathIndex":
+        return cls({key: ContractionHierarchy.build(graph, key) for key in weight_keys})
+
+    def query(self, source: str, target: str, weight_key: str = "distance") -> Tuple[Optional[float], List[str]]:
+        return self.hierarchies[weight_key].query(source, target)
+
+    def save(self, directory: str = "data/new"):
+        os.makedirs(directory, exist_ok=True)
+        for key, ch in self.hierarchies.items():
+            ch.save(os.path.join(directory, f"ch_{key}.npz"))
+
+    @classmethod
+    def load(cls, directory: str = "data/new", weight_keys=WEIGHT_KEYS, *, graph: FlightGraph) -> "ShortestPathIndex":
+        """The saved hierarchies of directory; raises ValueError if any was built from another graph than graph"""
+        return cls({key: ContractionHierarchy.load(os.path.join(directory, f"ch_{key}.npz"), graph=graph)
+                    for key in weight_keys if os.path.exists(os.path.join(directory, f"ch_{key}.npz"))})
+
+def verify_index(graph: FlightGraph, index: ShortestPathIndex, pairs: int = 200, seed: int = 0):
+    """Compare index answers with dijkstra on random pairs; returns the mismatches.
+
+    Distances must match exactly. Paths may differ only between routes of the
+    same total weight, so a differing path is checked by re-summing its legs.
+    """
+    rng = random.Random(seed)
+    codes = graph.node_codes
+    mismatches = []
+    for weight_key in index.hierarchies:
+        for _ in range(pairs):
+            source, target = rng.choice(codes), rng.choice(codes)
+            expected = graph.dijkstra(source, target, weight_key)
+            got = index.query(source, target, weight_key)
+            same_cost = got[0] == expected[0]
+            if same_cost and got[1] != expected[1]:
+                path_ids = [graph.node_index[c] for c in got[1]]
+                same_cost = graph._path_weight(path_ids, graph.weights[weight_key]) == expected[0]
+            if not same_cost:
+                mismatches.append((source, target, weight_key, expected, got))
+    return mismatches
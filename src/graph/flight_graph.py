@@ -1,7 +1,17 @@
+import csv
 import heapq
-from collections import defaultdict
-from typing import Dict, List, Tuple, Optional
-import pandas as pd
+from collections import OrderedDict, deque
+from itertools import islice
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple, Optional, TYPE_CHECKING
+import numpy as np
+from src.graph.geo import haversine_np
+from src.graph.instrumentation import profiler
+from src.graph.reachability import ReachabilityIndex
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # ---------- FlightEdge ----------
 class FlightEdge:
@@ -13,117 +23,1415 @@ class FlightEdge:
     def __repr__(self):
         return f"FlightEdge(dest={self.dest}, airline={self.airline}, weights={self.weights})"
 
+class _ReadOnlyEdge(FlightEdge):
+    """FlightEdge of FlightGraph.adj, whose fields (weights included) cannot be changed"""
+
+    def __init__(self, dest_code: str, airline: str, weights: Dict[str, float]):
+        object.__setattr__(self, "dest", dest_code)
+        object.__setattr__(self, "airline", airline)
+        object.__setattr__(self, "weights", MappingProxyType(weights))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FlightGraph.adj is read-only; change routes with add_edge, set_weights or update_route")
+
+    def __repr__(self):
+        return f"FlightEdge(dest={self.dest}, airline={self.airline}, weights={dict(self.weights)})"
+
+# ---------- Shortest-path tree cache ----------
+# Default budget for cached trees; one tree over the OpenFlights graph is about 40 KB
+DEFAULT_TREE_CACHE_BYTES = 32 << 20
+
+class TreeCache:
+    """Bounded LRU store of shortest-path trees keyed by (source id, weight_key).
+
+    Each entry is a read-only (dist, pred) pair of arrays plus the radius up
+    to which it is final: inf for a full tree, or the target distance of an
+    early-exit search, whose tree is only final for the nodes it reached
+    no farther than that (see covers). Least recently used trees are evicted
+    once their total size exceeds max_bytes; max_bytes=0 disables caching.
+    Entries are not pickled, so worker processes start empty.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_TREE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[np.ndarray, np.ndarray, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self):
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_bytes"])
+
+    @staticmethod
+    def covers(dist: np.ndarray, radius: float, node: Optional[int]) -> bool:
+        """Whether a tree of that radius is final at node (node=None asks for a full tree).
+
+        Nodes skipped by a targeted search are left at -inf and never final.
+        """
+        if radius == np.inf:
+            return True
+        return node is not None and -np.inf < dist[node] <= radius
+
+    def get(self, source: int, weight_key: str, node: Optional[int] = None) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """The (dist, pred) tree from source if it is final at node, or a full tree when node is None"""
+        entry = self._entries.get((source, weight_key))
+        if entry is None or not self.covers(entry[0], entry[2], node):
+            self.misses += 1
+            return None
+        self._entries.move_to_end((source, weight_key))
+        self.hits += 1
+        return entry[0], entry[1]
+
+    def put(self, source: int, weight_key: str, dist: np.ndarray, pred: np.ndarray, radius: float = np.inf):
+        """Store a tree, replacing the one kept for (source, weight_key); radius as in covers"""
+        size = dist.nbytes + pred.nbytes
+        if size > self.max_bytes:
+            return
+        dist.flags.writeable = False
+        pred.flags.writeable = False
+        old = self._entries.pop((source, weight_key), None)
+        if old is not None:
+            self.nbytes -= old[0].nbytes + old[1].nbytes
+        self._entries[(source, weight_key)] = (dist, pred, float(radius))
+        self.nbytes += size
+        self._shrink()
+
+    def resize(self, max_bytes: int):
+        """Change the memory budget, evicting trees as needed"""
+        self.max_bytes = max_bytes
+        self._shrink()
+
+    def _shrink(self):
+        while self._entries and self.nbytes > self.max_bytes:
+            _, (dist, pred, _) = self._entries.popitem(last=False)
+            self.nbytes -= dist.nbytes + pred.nbytes
+            self.evictions += 1
+
+    def invalidate(self, weight_key: Optional[str] = None):
+        """Drop the trees of one metric, or all of them"""
+        for key in [k for k in self._entries if weight_key is None or k[1] == weight_key]:
+            dist, pred, _ = self._entries.pop(key)
+            self.nbytes -= dist.nbytes + pred.nbytes
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self._entries), "bytes": self.nbytes, "max_bytes": self.max_bytes}
+
+def _csv_column(col: str, values) -> np.ndarray:
+    """One routes.csv column as an array: codes as fixed-width strings, which sort in C, and weights as float64"""
+    if col in ("Source airport", "Destination airport", "Airline"):
+        return np.array(values, dtype=str)
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        # Empty cells are missing values, as pandas would read them
+        return np.array([float(v) if v else np.nan for v in values], dtype=np.float64)
+
 # ---------- FlightGraph ----------
+WEIGHT_KEYS = ("distance", "delay", "cost")
+# routes.csv rows converted to arrays at a time by from_routes_csv; bounds the Python rows alive while loading
+CSV_BLOCK_ROWS = 100_000
+
 class FlightGraph:
+    """Directed multigraph of routes stored in compressed-sparse-row form.
+
+    Airports are numbered in sorted code order (node_codes / node_index). The
+    out-edges of node i are the slots offsets[i]:offsets[i+1] of targets, of one
+    float64 array per weight metric and of edge_airline (an index into
+    airline_codes). Edges keep their insertion order within each source.
+    Edges added with add_edge are buffered and merged into the arrays on the
+    next read, so bulk loads should go through from_routes_df.
+
+    one_to_all keeps full shortest-path trees in tree_cache and dijkstra the
+    part of the tree its targeted search settled, so repeated queries from
+    one origin to airports within that part are answered by walking
+    predecessors. Any change to the edges or weights (add_edge, set_weights)
+    drops them.
+
+    Every query leaves its counters (settled nodes, heap pushes and pops,
+    stale pops, relaxations) in last_stats; while instrumentation.profiler
+    is enabled, query_stats() also sums them per algorithm.
+    """
+
     def __init__(self):
-        self.adj: Dict[str, List[FlightEdge]] = defaultdict(list)
+        self.node_codes: List[str] = []
+        self.node_index: Dict[str, int] = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.targets = np.zeros(0, dtype=np.int32)
+        self.weights: Dict[str, np.ndarray] = {}
+        self.airline_codes: List[str] = []
+        self.edge_airline = np.zeros(0, dtype=np.int32)
+        # Source nodes in order of their first edge; bellman_ford relaxes in this order
+        self.source_order = np.zeros(0, dtype=np.int32)
+        # Per-node coordinates in degrees (NaN when unknown), set by set_coordinates
+        self.latitude: Optional[np.ndarray] = None
+        self.longitude: Optional[np.ndarray] = None
+        # Counters from the most recent query, e.g. {"algorithm": "astar", "settled": 412, "pushes": 530, ...}
+        self.last_stats: Dict[str, object] = {}
+        # Heap counters of the searches run for the current query, moved into last_stats by _record
+        self._search_counters: Dict[str, int] = {}
+        # Per-algorithm sums of last_stats, kept while the profiler is enabled (see query_stats)
+        self.query_totals: Dict[str, Dict[str, float]] = {}
+        self._pending: List[Tuple[str, FlightEdge]] = []
+        # Structures derived from the arrays (reverse adjacency, heuristic scales); reset by _build
+        self._derived: Dict[str, object] = {}
+        self.tree_cache = TreeCache()
+        # Trees kept up to date under weight updates, keyed by (source code, weight_key);
+        # None marks a tree to regrow on next use
+        self._watched: Dict[Tuple[str, str], Optional[Tuple[np.ndarray, np.ndarray]]] = {}
+
+    @classmethod
+    def from_routes_df(cls, routes_df: "pd.DataFrame"):
+        graph = cls()
+        n = len(routes_df)
+        airlines = routes_df["Airline"].tolist() if "Airline" in routes_df else [""] * n
+        weights = {}
+        for key, col in (("distance", "distance_km"), ("delay", "delay"), ("cost", "cost")):
+            weights[key] = routes_df[col].to_numpy(dtype=np.float64) if col in routes_df else np.zeros(n)
+        graph._build(routes_df["Source airport"].to_numpy(dtype=object),
+                     routes_df["Destination airport"].to_numpy(dtype=object),
+                     airlines, weights)
+        return graph
 
     @classmethod
-    def from_routes_df(cls, routes_df: pd.DataFrame):
+    def from_routes_csv(cls, path: str, block: int = CSV_BLOCK_ROWS) -> "FlightGraph":
+        """Build from a cleaned routes.csv with the csv module, so query processes never import pandas.
+
+        Rows are streamed block rows at a time and only the code, airline and
+        weight columns kept as arrays, so memory stays near the size of the
+        finished graph; the graph equals from_routes_df(load_routes_clean(path)).
+        """
+        wanted = ["Source airport", "Destination airport", "Airline", "distance_km", "delay", "cost"]
+        parts = []
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            present = [col for col in wanted if col in header]
+            pick = itemgetter(*[header.index(col) for col in present])
+            while True:
+                rows = list(map(pick, islice(reader, block)))
+                if not rows:
+                    break
+                parts.append({col: _csv_column(col, values) for col, values in zip(present, zip(*rows))})
+        columns = {col: np.concatenate([part[col] for part in parts]) if parts else _csv_column(col, ())
+                   for col in present}
+        n = len(columns["Source airport"])
+        weights = {key: columns[col] if col in columns else np.zeros(n)
+                   for key, col in (("distance", "distance_km"), ("delay", "delay"), ("cost", "cost"))}
         graph = cls()
-        for _, row in routes_df.iterrows():
-            src = row["Source airport"]
-            dst = row["Destination airport"]
-            airline = row.get("Airline", "")
-            weights = {
-                "distance": float(row.get("distance_km", 0.0)),
-                "delay": float(row.get("delay", 0.0)),
-                "cost": float(row.get("cost", 0.0))
-            }
-            edge = FlightEdge(dest_code=dst, airline=airline, weights=weights)
-            graph.add_edge(src, edge)
+        graph._build(columns["Source airport"], columns["Destination airport"],
+                     columns["Airline"] if "Airline" in columns else np.full(n, ""), weights)
         return graph
 
+    def _build(self, src_codes: np.ndarray, dst_codes: np.ndarray, airlines,
+               weights: Dict[str, np.ndarray]):
+        m = len(src_codes)
+        codes, inverse = np.unique(np.concatenate([src_codes, dst_codes]), return_inverse=True)
+        src_ids = inverse[:m]
+        dst_ids = inverse[m:]
+        n = len(codes)
+
+        order = np.argsort(src_ids, kind="stable")
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src_ids, minlength=n), out=offsets[1:])
+
+        # Airlines are numbered in order of first appearance
+        airline_codes, first, airline_inverse = np.unique(np.asarray(airlines, dtype=str), return_index=True,
+                                                          return_inverse=True)
+        by_first = np.argsort(first)
+        rank = np.empty(len(by_first), dtype=np.int32)
+        rank[by_first] = np.arange(len(by_first), dtype=np.int32)
+        airline_ids = rank[airline_inverse.reshape(-1)]
+
+        sources, first_seen = np.unique(src_ids, return_index=True)
+
+        old_nodes = (self.node_codes, self.latitude, self.longitude)
+        self.node_codes = codes.tolist()
+        self.node_index = {code: i for i, code in enumerate(self.node_codes)}
+        self.offsets = offsets
+        self.targets = dst_ids[order].astype(np.int32)
+        self.weights = {key: np.asarray(w, dtype=np.float64)[order] for key, w in weights.items()}
+        self.airline_codes = airline_codes[by_first].tolist()
+        self.edge_airline = airline_ids[order]
+        self.source_order = sources[np.argsort(first_seen)].astype(np.int32)
+        self._derived = {}
+        self.tree_cache.invalidate()
+        self._watched = dict.fromkeys(self._watched)
+        if old_nodes[1] is not None:
+            # Node ids may have shifted; carry coordinates over by code
+            self.set_coordinates(*old_nodes)
+
+    def set_coordinates(self, codes, latitudes, longitudes):
+        """Attach airport coordinates (degrees) to the graph nodes.
+
+        Takes parallel sequences of codes, latitudes and longitudes, e.g. the
+        index and columns of the cleaned airports frame. Nodes without an entry
+        get NaN, which disables the A* heuristic.
+        """
+        self._compact()
+        lat = np.full(len(self.node_codes), np.nan)
+        lon = np.full(len(self.node_codes), np.nan)
+        for code, la, lo in zip(codes, latitudes, longitudes):
+            i = self.node_index.get(code)
+            if i is not None:
+                lat[i] = la
+                lon[i] = lo
+        self.latitude = lat
+        self.longitude = lon
+        self._derived.pop("heuristic", None)
+
+    def _compact(self):
+        """Merge edges buffered by add_edge into the CSR arrays"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        # Lay existing edges out in source_order so _build keeps the original first-seen order
+        edge_order = np.concatenate([np.arange(self.offsets[u], self.offsets[u + 1]) for u in self.source_order]
+                                    + [np.zeros(0, dtype=np.int64)])
+        src_ids = np.repeat(np.arange(len(self.node_codes)), np.diff(self.offsets))[edge_order]
+        codes = np.array(self.node_codes, dtype=object)
+        src_codes = np.concatenate([codes[src_ids], np.array([s for s, _ in pending], dtype=object)])
+        dst_codes = np.concatenate([codes[self.targets[edge_order]], np.array([e.dest for _, e in pending], dtype=object)])
+        airlines = ([self.airline_codes[a] for a in self.edge_airline[edge_order].tolist()]
+                    + [e.airline for _, e in pending])
+
+        # Metrics missing on either side weigh inf, as weights.get(key, inf) would
+        keys = list(self.weights)
+        for _, edge in pending:
+            keys.extend(k for k in edge.weights if k not in keys)
+        weights = {}
+        for key in keys:
+            old = self.weights.get(key, np.full(len(self.targets), np.inf))[edge_order]
+            new = np.array([float(e.weights.get(key, float("inf"))) for _, e in pending])
+            weights[key] = np.concatenate([old, new])
+        self._build(src_codes, dst_codes, airlines, weights)
+
     def add_edge(self, src_code: str, edge: FlightEdge):
-        self.adj[src_code].append(edge)
+        self._pending.append((src_code, edge))
+        self.tree_cache.invalidate()
+
+    def set_weights(self, weight_key: str, values):
+        """Replace (or add) one weight metric with an array indexed like targets"""
+        self._compact()
+        values = np.array(values, dtype=np.float64)
+        if values.shape != self.targets.shape:
+            raise ValueError(f"Expected {len(self.targets)} weights for '{weight_key}', got {values.shape}")
+        self.weights[weight_key] = values
+        self.invalidate_weight(weight_key)
+
+    def invalidate_weight(self, weight_key: str):
+        """Drop cached trees and derived structures of one metric; call after editing its array in place"""
+        for name in ("heuristic", "reverse_weights"):
+            self._derived.get(name, {}).pop(weight_key, None)
+        self._derived.pop("adj", None)
+        self.tree_cache.invalidate(weight_key)
+        for key in self._watched:
+            if key[1] == weight_key:
+                self._watched[key] = None
 
     def neighbors(self, code: str) -> List[FlightEdge]:
-        return self.adj.get(code, [])
+        self._compact()
+        u = self.node_index.get(code)
+        if u is None:
+            return []
+        start, end = int(self.offsets[u]), int(self.offsets[u + 1])
+        columns = {key: w[start:end].tolist() for key, w in self.weights.items()}
+        return [
+            FlightEdge(dest_code=self.node_codes[v],
+                       airline=self.airline_codes[a],
+                       weights={key: col[i] for key, col in columns.items() if col[i] != float("inf")})
+            for i, (v, a) in enumerate(zip(self.targets[start:end].tolist(), self.edge_airline[start:end].tolist()))
+        ]
+
+    @property
+    def adj(self) -> Mapping[str, Tuple[FlightEdge, ...]]:
+        """Read-only view {source code: its routes as FlightEdges}, sources in order of their first route.
+
+        Built once and kept until the edges or weights change. Nothing in it
+        can be assigned to: routes live in the CSR arrays, so change them with
+        add_edge, set_weights or update_route. Prefer neighbors() or the arrays.
+        """
+        self._compact()
+        view = self._derived.get("adj")
+        if view is None:
+            view = MappingProxyType({
+                self.node_codes[u]: tuple(_ReadOnlyEdge(e.dest, e.airline, e.weights)
+                                          for e in self.neighbors(self.node_codes[u]))
+                for u in self.source_order.tolist()})
+            self._derived["adj"] = view
+        return view
+
+    def __contains__(self, code: str) -> bool:
+        self._compact()
+        return code in self.node_index
+
+    @property
+    def num_nodes(self) -> int:
+        self._compact()
+        return len(self.node_codes)
+
+    @property
+    def num_edges(self) -> int:
+        self._compact()
+        return len(self.targets)
+
+    def _path(self, prev: List[int], s: int, t: int) -> List[str]:
+        path = []
+        cur = t
+        for _ in range(len(prev) + 1):
+            if cur == s:
+                break
+            path.append(self.node_codes[cur])
+            cur = prev[cur]
+            if cur < 0:
+                break
+        path.append(self.node_codes[s])
+        path.reverse()
+        return path
+
+    def _shortest_path_tree(self, s: int, w: np.ndarray, stop=(), skip: Optional[np.ndarray] = None,
+                            reverse: bool = False) -> Tuple[List[float], List[int], int]:
+        """Dijkstra from node s over weights w; returns (dist, prev, settled).
+
+        The search ends early once every node id in stop has been settled;
+        with stop empty it grows the full shortest-path tree. Nodes set in the
+        boolean mask skip are never entered (their dist is left at -inf).
+        With reverse set it runs over the reverse adjacency (w must then be
+        _reverse_weights), giving distances to s and next hops towards it.
+        """
+        if reverse:
+            rev_offsets, rev_sources, _ = self._reverse()
+            offsets, targets = memoryview(rev_offsets), memoryview(rev_sources)
+        else:
+            offsets, targets = memoryview(self.offsets), memoryview(self.targets)
+        weights = memoryview(w)
+        inf = float("inf")
+        # A -inf entry can never be improved on, so skipped nodes cost nothing in the loop
+        dist = [inf] * len(self.node_codes) if skip is None else np.where(skip, -inf, inf).tolist()
+        prev = [-1] * len(self.node_codes)
+        dist[s] = 0.0
+        heap = [(0.0, s)]
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        remaining = set(stop)
+        settled = stale = relaxations = 0
+        while heap:
+            d, u = heappop(heap)
+            if d > dist[u]:
+                stale += 1
+                continue
+            settled += 1
+            if u in remaining:
+                remaining.discard(u)
+                if not remaining:
+                    break
+            start, end = offsets[u], offsets[u + 1]
+            relaxations += end - start
+            for v, wt in zip(targets[start:end], weights[start:end]):
+                alt = d + wt
+                if alt < dist[v]:
+                    dist[v] = alt
+                    prev[v] = u
+                    heappush(heap, (alt, v))
+        self._count_heap(settled, stale, relaxations, len(heap))
+        return dist, prev, settled
+
+    def _targeted_tree(self, s: int, w: np.ndarray, targets: List[int]) -> Tuple[List[float], List[int], int]:
+        """_shortest_path_tree that stops at the reachable targets and skips nodes that reach none of them.
+
+        Unreachable targets get inf without being searched for.
+        """
+        reach = self._reachability()
+        live = [t for t in targets if reach.reachable(s, t)]
+        if not live:
+            return [float("inf")] * len(self.node_codes), [-1] * len(self.node_codes), 0
+        dist, prev, settled = self._shortest_path_tree(s, w, live, ~reach.reaching(live))
+        for t in targets:
+            if dist[t] == -float("inf"):
+                dist[t] = float("inf")
+        return dist, prev, settled
+
+    # ---------- Query statistics ----------
+    def _count_heap(self, settled: int, stale: int, relaxations: int, left: int):
+        """Add one heap search to the current query's counters.
+
+        Every pop either settles a node or is stale, and every push not left
+        on the heap was popped, so the loops only count stale pops and the
+        out-edges of settled nodes (relaxations).
+        """
+        counters = self._search_counters
+        pops = settled + stale
+        for key, value in (("pushes", pops + left), ("pops", pops), ("stale_pops", stale),
+                           ("relaxations", relaxations)):
+            counters[key] = counters.get(key, 0) + value
+
+    def _record(self, stats: Dict[str, object]):
+        """Publish a query's stats as last_stats, with the heap counters gathered since the last one"""
+        stats.update(self._search_counters)
+        self._search_counters = {}
+        self.last_stats = stats
+        if profiler.enabled:
+            totals = self.query_totals.setdefault(stats["algorithm"], {"queries": 0})
+            totals["queries"] += 1
+            for key, value in stats.items():
+                if isinstance(value, str) and key != "algorithm":
+                    # e.g. cache outcomes, counted as cache_hit / cache_miss
+                    totals[f"{key}_{value}"] = totals.get(f"{key}_{value}", 0) + 1
+                elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                    totals[key] = totals.get(key, 0) + value
+
+    def query_stats(self) -> Dict[str, object]:
+        """Counters of the last query and, while the profiler is enabled, their sums per algorithm"""
+        return {"last": dict(self.last_stats), "totals": {k: dict(v) for k, v in self.query_totals.items()}}
+
+    def reset_query_stats(self):
+        self.last_stats = {}
+        self._search_counters = {}
+        self.query_totals = {}
 
     def dijkstra(self, source: str, target: str, weight_key: str = "distance") -> Tuple[Optional[float], List[str]]:
-        dist = {source: 0.0}
-        prev = {}
-        heap = [(0.0, source)]
+        self._compact()
+        s = self.node_index.get(source)
+        t = self.node_index.get(target)
+        w = self.weights.get(weight_key)
+        if s is None or t is None or w is None:
+            # Nothing is reachable: only the trivial path exists
+            self._record({"algorithm": "dijkstra", "settled": 0})
+            return (0.0, [source]) if source == target else (None, [])
+        if not self._reachability().reachable(s, t):
+            self._record({"algorithm": "dijkstra", "settled": 0, "rejected": True})
+            return None, []
+
+        watched = (source, weight_key) in self._watched
+        caching = self.tree_cache.max_bytes > 0
+        tree = self.tree_cache.get(s, weight_key, t) if caching and not watched else None
+        if watched:
+            dist, prev = self._cached_tree(s, weight_key, "dijkstra")
+        elif tree is not None:
+            dist, prev = tree
+            self._record({"algorithm": "dijkstra", "settled": 0, "cache": "hit"})
+        else:
+            dist, prev, settled = self._targeted_tree(s, w, [t])
+            if caching:
+                # Keep the settled part of the tree: it answers later queries to any node it made final
+                self.tree_cache.put(s, weight_key, np.array(dist), np.array(prev, dtype=np.int32), dist[t])
+                self._record({"algorithm": "dijkstra", "settled": settled, "cache": "miss"})
+            else:
+                self._record({"algorithm": "dijkstra", "settled": settled})
+        if dist[t] == float("inf"):
+            return None, []
+        return float(dist[t]), self._path(prev, s, t)
+
+    def _cached_tree(self, s: int, weight_key: str, algorithm: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Full (dist, pred) tree from node s, from the watched trees, tree_cache or grown and stored"""
+        if (self.node_codes[s], weight_key) in self._watched:
+            self._record({"algorithm": algorithm, "settled": 0, "cache": "watched"})
+            return self.watched_tree(self.node_codes[s], weight_key)
+        tree = self.tree_cache.get(s, weight_key)
+        if tree is not None:
+            self._record({"algorithm": algorithm, "settled": 0, "cache": "hit"})
+            return tree
+        dist, prev, settled = self._shortest_path_tree(s, self.weights[weight_key])
+        tree = (np.array(dist), np.array(prev, dtype=np.int32))
+        self.tree_cache.put(s, weight_key, *tree)
+        self._record({"algorithm": algorithm, "settled": settled, "cache": "miss"})
+        return tree
+
+    # ---------- Batch queries ----------
+    def _node_ids(self, codes) -> List[int]:
+        missing = [c for c in codes if c not in self.node_index]
+        if missing:
+            raise KeyError(f"Unknown airport code(s): {', '.join(map(str, missing[:10]))}")
+        return [self.node_index[c] for c in codes]
+
+    def _metric(self, weight_key: str) -> np.ndarray:
+        if weight_key not in self.weights:
+            raise KeyError(f"Unknown weight metric '{weight_key}'")
+        return self.weights[weight_key]
+
+    def one_to_all(self, source: str, weight_key: str = "distance") -> Tuple[np.ndarray, np.ndarray]:
+        """Full shortest-path tree from source as (dist, pred) arrays indexed by node id.
+
+        dist is inf and pred is -1 for unreachable nodes; pass pred to path_to
+        to rebuild the route to any airport. The arrays are shared with
+        tree_cache and read-only.
+        """
+        self._compact()
+        s = self._node_ids([source])[0]
+        self._metric(weight_key)
+        return self._cached_tree(s, weight_key, "one_to_all")
+
+    def one_to_many(self, source: str, targets: List[str], weight_key: str = "distance",
+                    predecessors: bool = False):
+        """Distances from source to each of targets, in targets order.
+
+        The search stops as soon as every reachable target is settled and never
+        enters airports that lead to none of them. With predecessors set, also
+        returns the (partial) pred array for path_to.
+        """
+        self._compact()
+        s = self._node_ids([source])[0]
+        t = self._node_ids(targets)
+        dist, prev, settled = self._targeted_tree(s, self._metric(weight_key), t)
+        self._record({"algorithm": "one_to_many", "settled": settled})
+        row = np.array([dist[i] for i in t])
+        return (row, np.array(prev, dtype=np.int32)) if predecessors else row
+
+    def distance_matrix(self, sources: List[str], targets: Optional[List[str]] = None,
+                        weight_key: str = "distance", workers=None, predecessors: bool = False):
+        """Many-to-many matrix: entry [i, j] is the shortest distance sources[i] -> targets[j].
+
+        targets defaults to sources. Each row is one early-exit search; with
+        workers set, rows are computed on a process pool. With predecessors
+        set, also returns a (len(sources), num_nodes) int32 array whose row i
+        is the pred array of sources[i] for path_to.
+        """
+        self._compact()
+        targets = sources if targets is None else targets
+        s = self._node_ids(sources)
+        t = self._node_ids(targets)
+        w = self._metric(weight_key)
+        # Built before the pool starts so workers receive it with the graph
+        self._reachability()
+        if not workers or workers <= 1:
+            matrix, preds = _tree_rows(self, s, t, w, predecessors)
+        else:
+            matrix = np.full((len(s), len(t)), np.inf)
+            preds = np.full((len(s), len(self.node_codes)), -1, dtype=np.int32) if predecessors else None
+            size = max(1, -(-len(s) // (4 * workers)))
+            # Imported here: query-only processes never start a pool
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_tree_worker, initargs=(self,)) as pool:
+                futures = [(i, pool.submit(_tree_batch, s[i:i + size], t, weight_key, predecessors))
+                           for i in range(0, len(s), size)]
+                for i, future in futures:
+                    dist, prev = future.result()
+                    matrix[i:i + len(dist)] = dist
+                    if predecessors:
+                        preds[i:i + len(dist)] = prev
+        self._record({"algorithm": "distance_matrix", "rows": len(s)})
+        return (matrix, preds) if predecessors else matrix
+
+    def path_to(self, pred: np.ndarray, source: str, target: str) -> List[str]:
+        """Rebuild the source -> target route from a pred array of source's tree; [] if unreachable"""
+        self._compact()
+        s, t = self._node_ids([source, target])
+        if s != t and pred[t] < 0:
+            return []
+        return self._path(pred.tolist(), s, t)
+
+    # ---------- Reachability ----------
+    def _reachability(self) -> ReachabilityIndex:
+        """Strongly connected components and condensation reachability, built once per graph"""
+        reach = self._derived.get("reachability")
+        if reach is None:
+            reach = ReachabilityIndex.build(self.offsets, self.targets)
+            self._derived["reachability"] = reach
+        return reach
+
+    def reachable(self, source: str, target: str) -> bool:
+        """Whether any route leads from source to target, answered from the component index"""
+        self._compact()
+        s = self.node_index.get(source)
+        t = self.node_index.get(target)
+        if s is None or t is None:
+            return source == target
+        return self._reachability().reachable(s, t)
+
+    def component_of(self, code: str) -> int:
+        """Strongly connected component id of an airport"""
+        self._compact()
+        return int(self._reachability().comp[self._node_ids([code])[0]])
+
+    # ---------- Live weight updates ----------
+    def watch(self, source: str, weight_key: str = "delay"):
+        """Keep the shortest-path tree of source up to date across update_weights calls"""
+        self._compact()
+        self._node_ids([source])
+        self._metric(weight_key)
+        self._watched.setdefault((source, weight_key), None)
+
+    def unwatch(self, source: str, weight_key: str = "delay"):
+        self._watched.pop((source, weight_key), None)
+
+    def watched_tree(self, source: str, weight_key: str = "delay") -> Tuple[np.ndarray, np.ndarray]:
+        """Current read-only (dist, pred) arrays of a watched tree, indexed by node id"""
+        self._compact()
+        tree = self._watched[(source, weight_key)]
+        if tree is None:
+            dist, prev, _ = self._shortest_path_tree(self.node_index[source], self.weights[weight_key])
+            tree = (np.array(dist), np.array(prev, dtype=np.int32))
+            self._watched[(source, weight_key)] = tree
+        views = (tree[0].view(), tree[1].view())
+        for view in views:
+            view.flags.writeable = False
+        return views
+
+    def edge_slots(self, source: str, target: str, airline: Optional[str] = None) -> np.ndarray:
+        """Slots of the source -> target routes (optionally of one airline) in the edge arrays"""
+        self._compact()
+        u, v = self._node_ids([source, target])
+        start, end = int(self.offsets[u]), int(self.offsets[u + 1])
+        match = self.targets[start:end] == v
+        if airline is not None:
+            match &= np.array([self.airline_codes[a] == airline for a in self.edge_airline[start:end].tolist()],
+                              dtype=bool)
+        return start + np.flatnonzero(match)
+
+    def update_route(self, source: str, target: str, weight_key: str, value: float,
+                     airline: Optional[str] = None) -> int:
+        """Set weight_key on every source -> target route (of airline, if given); returns routes updated"""
+        slots = self.edge_slots(source, target, airline)
+        self.update_weights(weight_key, slots, np.full(len(slots), value, dtype=np.float64))
+        return len(slots)
+
+    def update_weights(self, weight_key: str, slots, values):
+        """Overwrite weight_key on the given edge slots and repair the watched trees.
+
+        Other cached trees and derived structures of the metric are dropped.
+        Each watched tree is repaired in place: subtrees hanging off a route
+        that got dearer are regrown from their cheapest way back in, cheaper
+        routes seed improvements, and one Dijkstra over those seeds settles
+        only the affected nodes.
+        """
+        self._compact()
+        w = self._metric(weight_key)
+        slots = np.asarray(slots, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if not w.flags.writeable:
+            # Snapshot arrays are read-only mappings; the first update takes a private copy
+            w = w.copy()
+            self.weights[weight_key] = w
+        old = w[slots].copy()
+        w[slots] = values
+
+        trees = {key: tree for key, tree in self._watched.items() if key[1] == weight_key and tree is not None}
+        self.invalidate_weight(weight_key)
+        sources = np.repeat(np.arange(len(self.node_codes), dtype=np.int32), np.diff(self.offsets))[slots]
+        settled = 0
+        for key, tree in trees.items():
+            settled += self._repair_tree(tree[0], tree[1], w, sources, self.targets[slots], old, values)
+            self._watched[key] = tree
+        self._record({"algorithm": "repair", "trees": len(trees), "settled": settled})
+
+    def _repair_tree(self, dist: np.ndarray, pred: np.ndarray, w: np.ndarray,
+                     us: np.ndarray, vs: np.ndarray, old: np.ndarray, new: np.ndarray) -> int:
+        """Bring (dist, pred) back to a shortest-path tree after edges us -> vs changed from old to new"""
+        n = len(self.node_codes)
+        # Tree edges that got dearer: everything below their head may now be reached more cheaply elsewhere
+        worse = (new > old) & (pred[vs] == us) & (dist[us] + old == dist[vs])
+        heads = np.unique(vs[worse])
+        seeds: Dict[int, Tuple[float, int]] = {}
+        if heads.size:
+            order = np.argsort(pred, kind="stable")
+            child_offsets = np.searchsorted(pred[order], np.arange(n + 2) - 1)
+            affected = np.zeros(n, dtype=bool)
+            stack = heads.tolist()
+            while stack:
+                x = stack.pop()
+                if not affected[x]:
+                    affected[x] = True
+                    stack.extend(order[child_offsets[x + 1]:child_offsets[x + 2]].tolist())
+            region = np.flatnonzero(affected)
+            dist[region] = np.inf
+            pred[region] = -1
+            # Cheapest way into the region from the part of the tree that still stands
+            rev_offsets, rev_sources, rev_edges = self._reverse()
+            starts = rev_offsets[region]
+            counts = rev_offsets[region + 1] - starts
+            idx = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(int(counts.sum()))
+            heads_in, tails = np.repeat(region, counts), rev_sources[idx]
+            cand = dist[tails] + w[rev_edges[idx]]
+            for x, y, c in zip(heads_in.tolist(), tails.tolist(), cand.tolist()):
+                if c < dist[x]:
+                    dist[x] = c
+                    pred[x] = y
+                    seeds[x] = (c, y)
+        # Routes that got cheaper can improve their head and everything downstream
+        better = (new < old) & (dist[us] + new < dist[vs])
+        for u, v, c in zip(us[better].tolist(), vs[better].tolist(), (dist[us] + new)[better].tolist()):
+            if c < dist[v]:
+                dist[v] = c
+                pred[v] = u
+                seeds[v] = (c, u)
+
+        offsets = memoryview(self.offsets)
+        targets = memoryview(self.targets)
+        weights = memoryview(w)
+        heap = [(c, x) for x, (c, _) in seeds.items()]
+        heapq.heapify(heap)
+        settled = stale = relaxations = 0
         while heap:
-            d, node = heapq.heappop(heap)
-            if d > dist.get(node, float("inf")):
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                stale += 1
                 continue
-            if node == target:
+            settled += 1
+            start, end = offsets[u], offsets[u + 1]
+            relaxations += end - start
+            for v, wt in zip(targets[start:end], weights[start:end]):
+                alt = d + wt
+                if alt < dist[v]:
+                    dist[v] = alt
+                    pred[v] = u
+                    heapq.heappush(heap, (alt, v))
+        self._count_heap(settled, stale, relaxations, 0)
+        return settled
+
+    # ---------- Goal-directed search ----------
+    def _reverse(self):
+        """Reverse adjacency: in-edges of node v are rev_edges[rev_offsets[v]:rev_offsets[v+1]]"""
+        rev = self._derived.get("reverse")
+        if rev is None:
+            edge_sources = np.repeat(np.arange(len(self.node_codes), dtype=np.int32), np.diff(self.offsets))
+            rev_edges = np.argsort(self.targets, kind="stable")
+            rev_offsets = np.zeros(len(self.node_codes) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.targets, minlength=len(self.node_codes)), out=rev_offsets[1:])
+            rev = (rev_offsets, edge_sources[rev_edges], rev_edges)
+            self._derived["reverse"] = rev
+        return rev
+
+    def _reverse_weights(self, weight_key: str) -> np.ndarray:
+        cache = self._derived.setdefault("reverse_weights", {})
+        if weight_key not in cache:
+            cache[weight_key] = self.weights[weight_key][self._reverse()[2]]
+        return cache[weight_key]
+
+    def _heuristic_scale(self, weight_key: str) -> Optional[float]:
+        """Largest c with c * haversine(u, v) <= w(u, v) on every edge, or None if unusable.
+
+        Summed along any path and combined with the triangle inequality, this
+        makes c * haversine(node, target) an admissible and consistent A* bound:
+        1.0 for "distance", roughly FARE_PER_KM for "cost", 0 for "delay".
+        """
+        cache = self._derived.setdefault("heuristic", {})
+        if weight_key not in cache:
+            scale = None
+            w = self.weights[weight_key]
+            if self.latitude is not None and not np.isnan(self.latitude).any() and (w >= 0).all():
+                src = np.repeat(np.arange(len(self.node_codes)), np.diff(self.offsets))
+                # The bound is shaved below anyway, so the faster NumPy rounding is fine
+                span = haversine_np(self.latitude[src], self.longitude[src],
+                                    self.latitude[self.targets], self.longitude[self.targets], exact=False)
+                ratio = w[span > 0] / span[span > 0]
+                # Shave a little off to absorb rounding in the haversine sums
+                scale = float(ratio.min()) * (1 - 1e-9) if ratio.size else 0.0
+            cache[weight_key] = scale
+        return cache[weight_key]
+
+    def _path_weight(self, path_ids: List[int], weights: np.ndarray) -> float:
+        # Sum the cheapest parallel edge of each leg left to right, as dijkstra accumulates it
+        total = 0.0
+        for u, v in zip(path_ids, path_ids[1:]):
+            start, end = int(self.offsets[u]), int(self.offsets[u + 1])
+            legs = weights[start:end][self.targets[start:end] == v]
+            total += float(legs.min())
+        return total
+
+    def astar(self, source: str, target: str, weight_key: str = "distance") -> Tuple[Optional[float], List[str]]:
+        """A* search guided by great-circle distance to the target.
+
+        Returns the same (distance, path) as dijkstra while settling fewer nodes.
+        Needs coordinates for every node (set_coordinates) and non-negative
+        weights with a positive bound; otherwise it runs dijkstra.
+        """
+        self._compact()
+        s = self.node_index.get(source)
+        t = self.node_index.get(target)
+        if s is None or t is None or weight_key not in self.weights or not self._reachability().reachable(s, t):
+            return self.dijkstra(source, target, weight_key)
+        scale = self._heuristic_scale(weight_key)
+        if not scale:
+            # No usable bound (or a zero one, e.g. "delay"): A* would just be dijkstra
+            return self.dijkstra(source, target, weight_key)
+
+        h = (scale * haversine_np(self.latitude, self.longitude, self.latitude[t], self.longitude[t],
+                                  exact=False)).tolist()
+        offsets = memoryview(self.offsets)
+        targets = memoryview(self.targets)
+        weights = memoryview(self.weights[weight_key])
+        inf = float("inf")
+        dist = [inf] * len(self.node_codes)
+        prev = [-1] * len(self.node_codes)
+        dist[s] = 0.0
+        # Equal bounds pop by (dist, node id) as in dijkstra, so every node on
+        # a tied shortest path is settled before t
+        heap = [(h[s], 0.0, s)]
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        settled = stale = relaxations = 0
+        while heap:
+            _, d, u = heappop(heap)
+            if d > dist[u]:
+                stale += 1
+                continue
+            settled += 1
+            if u == t:
                 break
-            for edge in self.neighbors(node):
-                alt = d + edge.weights.get(weight_key, float("inf"))
-                if alt < dist.get(edge.dest, float("inf")):
-                    dist[edge.dest] = alt
-                    prev[edge.dest] = node
-                    heapq.heappush(heap, (alt, edge.dest))
-
-        if target not in dist:
+            start, end = offsets[u], offsets[u + 1]
+            relaxations += end - start
+            for v, wt in zip(targets[start:end], weights[start:end]):
+                alt = d + wt
+                if alt < dist[v]:
+                    dist[v] = alt
+                    prev[v] = u
+                    heappush(heap, (alt + h[v], alt, v))
+                elif alt == dist[v] and v != s and (d, u) < (dist[prev[v]], prev[v]):
+                    # A tie: keep the predecessor dijkstra settles first, not the one A* reached first
+                    prev[v] = u
+
+        self._count_heap(settled, stale, relaxations, len(heap))
+        self._record({"algorithm": "astar", "settled": settled})
+        if dist[t] == inf:
             return None, []
+        return dist[t], self._path(prev, s, t)
 
-        path = []
-        cur = target
-        while cur != source:
-            path.append(cur)
-            cur = prev.get(cur)
-            if cur is None:
+    def bidirectional_dijkstra(self, source: str, target: str,
+                               weight_key: str = "distance") -> Tuple[Optional[float], List[str]]:
+        """Dijkstra grown from both ends, backwards over the reverse adjacency.
+
+        Stops once the two frontiers can no longer improve the best meeting
+        point, then finishes the forward search towards target over the nodes
+        that can still lie on a shortest path, so ties resolve to the same
+        path dijkstra returns. Needs non-negative weights; otherwise it runs
+        dijkstra.
+        """
+        self._compact()
+        s = self.node_index.get(source)
+        t = self.node_index.get(target)
+        w = self.weights.get(weight_key)
+        if (s is None or t is None or w is None or s == t or (w < 0).any()
+                or not self._reachability().reachable(s, t)):
+            return self.dijkstra(source, target, weight_key)
+
+        rev_offsets, rev_sources, _ = self._reverse()
+        sides = (
+            (memoryview(self.offsets), memoryview(self.targets), memoryview(w)),
+            (memoryview(rev_offsets), memoryview(rev_sources), memoryview(self._reverse_weights(weight_key))),
+        )
+        inf = float("inf")
+        n = len(self.node_codes)
+        dist = ([inf] * n, [inf] * n)
+        prev = [-1] * n
+        dist[0][s] = 0.0
+        dist[1][t] = 0.0
+        heaps = ([(0.0, s)], [(0.0, t)])
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        best = inf
+        settled = stale = relaxations = 0
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
                 break
-        path.append(source)
-        path.reverse()
-        return dist[target], path
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            d, u = heappop(heaps[side])
+            mine, other = dist[side], dist[1 - side]
+            if d > mine[u]:
+                stale += 1
+                continue
+            settled += 1
+            offsets, targets, weights = sides[side]
+            start, end = offsets[u], offsets[u + 1]
+            relaxations += end - start
+            for v, wt in zip(targets[start:end], weights[start:end]):
+                alt = d + wt
+                if alt < mine[v]:
+                    mine[v] = alt
+                    if not side:
+                        prev[v] = u
+                    heappush(heaps[side], (alt, v))
+                    if alt + other[v] < best:
+                        best = alt + other[v]
+
+        # Every node still unsettled backwards is at least radius from t, and
+        # settled ones know their exact distance; a node whose bound exceeds
+        # best (with slack for summation order) lies on no shortest path. The
+        # forward heap keeps popping by (dist, node id), so prev ends up as
+        # dijkstra's.
+        radius = heaps[1][0][0] if heaps[1] else inf
+        limit = best + best * 1e-9
+        forward, backward = dist
+        offsets, targets, weights = sides[0]
+        heap = heaps[0]
+        while heap:
+            d, u = heappop(heap)
+            if d > forward[u]:
+                stale += 1
+                continue
+            settled += 1
+            if u == t:
+                break
+            start, end = offsets[u], offsets[u + 1]
+            relaxations += end - start
+            for v, wt in zip(targets[start:end], weights[start:end]):
+                alt = d + wt
+                if alt < forward[v] and alt + min(backward[v], radius) <= limit:
+                    forward[v] = alt
+                    prev[v] = u
+                    heappush(heap, (alt, v))
+
+        self._count_heap(settled, stale, relaxations, len(heaps[0]) + len(heaps[1]))
+        self._record({"algorithm": "bidirectional", "settled": settled})
+        if forward[t] == inf:
+            return None, []
+        return forward[t], self._path(prev, s, t)
+
+    # ---------- Route alternatives ----------
+    def _tree_to(self, t: int, weight_key: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(dist to t, next hop towards t) over every node, kept in tree_cache under the id ~t"""
+        tree = self.tree_cache.get(~t, weight_key)
+        if tree is None:
+            dist, nxt, _ = self._shortest_path_tree(t, self._reverse_weights(weight_key), reverse=True)
+            tree = (np.array(dist), np.array(nxt, dtype=np.int32))
+            self.tree_cache.put(~t, weight_key, *tree)
+        return tree
+
+    def _cheapest_legs(self, path_ids: List[int], weights: np.ndarray) -> List[int]:
+        """Edge slot of the cheapest route for each leg of path_ids (first slot on ties)"""
+        slots = []
+        for u, v in zip(path_ids, path_ids[1:]):
+            start, end = int(self.offsets[u]), int(self.offsets[u + 1])
+            legs = np.flatnonzero(self.targets[start:end] == v)
+            slots.append(start + int(legs[np.argmin(weights[start:end][legs])]))
+        return slots
+
+    def leg_airlines(self, path: List[str], weight_key: str = "distance") -> List[str]:
+        """Airline flying each leg of path on its cheapest route by weight_key"""
+        self._compact()
+        slots = self._cheapest_legs(self._node_ids(path), self._metric(weight_key))
+        return [self.airline_codes[self.edge_airline[i]] for i in slots]
+
+    def _spur_path(self, spur: int, t: int, w: np.ndarray, h: List[float], nxt: List[int],
+                   banned_nodes: set, banned_first: set, limit: float) -> Optional[List[int]]:
+        """Cheapest spur -> t path avoiding banned_nodes, whose first leg avoids banned_first.
+
+        If the shortest-path tree towards t already avoids them, that is the
+        answer. Otherwise A* runs with the tree distances as heuristic: they
+        are exact lower bounds, since banning nodes only lengthens routes.
+        Paths that cannot cost less than limit are not followed.
+        """
+        path = [spur]
+        cur = nxt[spur]
+        if cur not in banned_first:
+            while cur >= 0 and cur not in banned_nodes:
+                path.append(cur)
+                if cur == t:
+                    return path
+                cur = nxt[cur]
+
+        offsets = memoryview(self.offsets)
+        targets = memoryview(self.targets)
+        weights = memoryview(w)
+        inf = float("inf")
+        dist = {spur: 0.0}
+        prev = {spur: -1}
+        heap = [(h[spur], 0.0, spur)]
+        settled = stale = relaxations = 0
+        while heap:
+            _, d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                stale += 1
+                continue
+            settled += 1
+            if u == t:
+                self._count_heap(settled, stale, relaxations, len(heap))
+                path = [t]
+                while prev[path[-1]] >= 0:
+                    path.append(prev[path[-1]])
+                return path[::-1]
+            start, end = offsets[u], offsets[u + 1]
+            relaxations += end - start
+            for v, wt in zip(targets[start:end], weights[start:end]):
+                if h[v] == inf or v in banned_nodes or (u == spur and v in banned_first):
+                    continue
+                alt = d + wt
+                if alt < dist.get(v, inf) and alt + h[v] < limit:
+                    dist[v] = alt
+                    prev[v] = u
+                    heapq.heappush(heap, (alt + h[v], alt, v))
+        self._count_heap(settled, stale, relaxations, 0)
+        return None
+
+    def k_shortest_paths(self, source: str, target: str, k: int = 10,
+                         weight_key: str = "distance") -> List[Tuple[float, List[str], List[str]]]:
+        """Up to k cheapest loopless routes as (cost, path, airline of each leg), cheapest first.
+
+        Yen's algorithm over the airport graph, each leg flown on its cheapest
+        route. Spur searches reuse the shortest-path tree towards the target
+        and are skipped when they cannot beat the candidates already queued.
+        """
+        self._compact()
+        s, t = self._node_ids([source, target])
+        w = self._metric(weight_key)
+        if (w < 0).any():
+            raise ValueError(f"k-shortest paths need non-negative weights; '{weight_key}' has negative edges")
+        if k <= 0 or not self._reachability().reachable(s, t):
+            self._record({"algorithm": "yen", "spur_searches": 0})
+            return []
+        inf = float("inf")
+        dist_to, nxt = self._tree_to(t, weight_key)
+        # Shave a little off, as for the A* bound, so right-to-left sums stay admissible
+        h = (dist_to * (1 - 1e-9)).tolist()
+        nxt = nxt.tolist()
+
+        first = [s]
+        while first[-1] != t:
+            first.append(nxt[first[-1]])
+        found = [first]
+        candidates: List[Tuple[float, List[int]]] = []
+        queued = {tuple(first)}
+        spurs = 0
+        while len(found) < k:
+            last = found[-1]
+            legs = w[self._cheapest_legs(last, w)].tolist()
+            root_cost = 0.0
+            for j in range(len(last) - 1):
+                spur, root = last[j], last[:j + 1]
+                if j:
+                    root_cost += legs[j - 1]
+                # Only the best k - len(found) candidates can still be used
+                needed = k - len(found)
+                limit = heapq.nsmallest(needed, candidates)[-1][0] - root_cost if len(candidates) >= needed else inf
+                if h[spur] >= limit:
+                    continue
+                banned_first = {p[j + 1] for p in found if p[:j + 1] == root}
+                spurs += 1
+                tail = self._spur_path(spur, t, w, h, nxt, set(root[:-1]), banned_first, limit)
+                if tail is None:
+                    continue
+                path = root[:-1] + tail
+                if tuple(path) not in queued:
+                    queued.add(tuple(path))
+                    heapq.heappush(candidates, (self._path_weight(path, w), path))
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates)[1])
+
+        self._record({"algorithm": "yen", "spur_searches": spurs})
+        routes = []
+        for path in found:
+            slots = self._cheapest_legs(path, w)
+            routes.append((self._path_weight(path, w), [self.node_codes[i] for i in path],
+                           [self.airline_codes[self.edge_airline[i]] for i in slots]))
+        return routes
+
+    def hop_limited_path(self, source: str, target: str, max_legs: int,
+                         weight_key: str = "distance") -> Tuple[Optional[float], List[str]]:
+        """Cheapest route from source to target with at most max_legs legs, like dijkstra.
+
+        The unconstrained optimum is reused when it is short enough; otherwise
+        one NumPy relaxation per allowed leg over the edge arrays (Bellman-Ford
+        by hop count) finds the best route within the cap.
+        """
+        self._compact()
+        s, t = self._node_ids([source, target])
+        w = self._metric(weight_key)
+        if s == t or max_legs <= 0 or not self._reachability().reachable(s, t):
+            self._record({"algorithm": "hop_limited", "passes": 0})
+            return (0.0, [source]) if s == t else (None, [])
+        if (w >= 0).all():
+            dist, path = self.dijkstra(source, target, weight_key)
+            if len(path) - 1 <= max_legs:
+                return dist, path
+
+        n = len(self.node_codes)
+        dist = np.full(n, np.inf)
+        dist[s] = 0.0
+        layers = []
+        active = np.array([s], dtype=np.int64)
+        for _ in range(max_legs):
+            edges, u = self._out_edges(active)
+            v = self.targets[edges]
+            cand = dist[u] + w[edges]
+            better = cand < dist[v]
+            edges, u, v, cand = edges[better], u[better], v[better], cand[better]
+            order = np.lexsort((edges, cand, v))
+            first = order[np.r_[True, v[order][1:] != v[order][:-1]]] if order.size else order
+            # Layer i holds the nodes reached more cheaply with i + 1 legs, and from where
+            dist[v[first]] = cand[first]
+            layers.append(dict(zip(v[first].tolist(), u[first].tolist())))
+            active = v[first].astype(np.int64)
+            if not active.size:
+                break
+
+        self._record({"algorithm": "hop_limited", "passes": len(layers)})
+        if dist[t] == np.inf:
+            return None, []
+        path_ids = [t]
+        for layer in reversed(layers):
+            if path_ids[-1] in layer:
+                path_ids.append(layer[path_ids[-1]])
+        path_ids.reverse()
+        return float(dist[t]), [self.node_codes[i] for i in path_ids]
 
     def bellman_ford(self, source: str, target: str, weight_key: str = "distance") -> Tuple[Optional[float], List[str], bool]:
-        nodes = set(self.adj.keys())
-        for edges in self.adj.values():
-            for e in edges:
-                nodes.add(e.dest)
+        self._compact()
+        s = self.node_index.get(source)
+        t = self.node_index.get(target)
+        w = self.weights.get(weight_key)
+        if s is None or w is None:
+            return (0.0, [source], False) if source == target else (None, [], False)
 
-        dist = {node: float("inf") for node in nodes}
-        prev = {}
-        dist[source] = 0.0
+        offsets = self.offsets.tolist()
+        targets = self.targets.tolist()
+        weights = w.tolist()
+        sources = self.source_order.tolist()
+        inf = float("inf")
+        n = len(self.node_codes)
+        dist = [inf] * n
+        prev = [-1] * n
+        dist[s] = 0.0
 
-        for _ in range(len(nodes) - 1):
+        for _ in range(n - 1):
             updated = False
-            for u in self.adj:
-                for edge in self.adj[u]:
-                    if dist[u] + edge.weights.get(weight_key, float("inf")) < dist[edge.dest]:
-                        dist[edge.dest] = dist[u] + edge.weights.get(weight_key, float("inf"))
-                        prev[edge.dest] = u
+            for u in sources:
+                for i in range(offsets[u], offsets[u + 1]):
+                    v = targets[i]
+                    # dist[u] is read per edge: a negative self-loop lowers it for u's later edges in the same pass
+                    alt = dist[u] + weights[i]
+                    if alt < dist[v]:
+                        dist[v] = alt
+                        prev[v] = u
                         updated = True
             if not updated:
                 break
 
         neg_cycle = False
-        for u in self.adj:
-            for edge in self.adj[u]:
-                if dist[u] + edge.weights.get(weight_key, float("inf")) < dist[edge.dest]:
+        for u in sources:
+            for i in range(offsets[u], offsets[u + 1]):
+                if dist[u] + weights[i] < dist[targets[i]]:
                     neg_cycle = True
                     break
             if neg_cycle:
                 break
 
-        if dist.get(target, float("inf")) == float("inf"):
+        if t is None or dist[t] == inf:
             return None, [], neg_cycle
+        return dist[t], self._path(prev, s, t), neg_cycle
 
-        path = []
-        cur = target
-        while cur != source:
-            path.append(cur)
-            cur = prev.get(cur)
-            if cur is None:
-                break
-        path.append(source)
-        path.reverse()
-        return dist[target], path, neg_cycle
+    # ---------- Fast Bellman-Ford engines ----------
+    def _out_edges(self, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Edge slots leaving nodes, with the source node of each slot"""
+        starts = self.offsets[nodes]
+        counts = self.offsets[nodes + 1] - starts
+        shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return shift + np.arange(int(counts.sum())), np.repeat(nodes, counts)
+
+    def _sweep(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(rank of every edge slot, rank of every node's first edge, source of every slot) in bellman_ford's sweep.
+
+        bellman_ford scans sources in source_order and their edges in slot
+        order; nodes without out-edges get the rank len(targets).
+        """
+        sweep = self._derived.get("sweep")
+        if sweep is None:
+            n, m = len(self.node_codes), len(self.targets)
+            edges, _ = self._out_edges(self.source_order.astype(np.int64))
+            rank = np.empty(m, dtype=np.int64)
+            rank[edges] = np.arange(m)
+            first = np.full(n, m, dtype=np.int64)
+            first[self.source_order] = rank[self.offsets[self.source_order]]
+            sweep = self._derived["sweep"] = (rank, first, np.repeat(np.arange(n), np.diff(self.offsets)))
+        return sweep
+
+    def _bf_predecessors(self, s: int, w: np.ndarray, dist: np.ndarray) -> np.ndarray:
+        """The pred array bellman_ford ends with, given the final distances from s (no negative cycle).
+
+        bellman_ford keeps the first edge that brings a node to its final
+        distance. That edge is tight (dist[u] + w == dist[v]); it is relaxed
+        with u's final distance in the first pass that scans u after u got
+        it, i.e. at sweep time pass * len(targets) + slot rank. Each node's
+        earliest tight edge, and with it its own settling time, is found by
+        relaxing those times over the tight edges until nothing changes.
+        """
+        n, m = len(self.node_codes), len(self.targets)
+        rank, first, edge_sources = self._sweep()
+        tight = np.isfinite(dist[edge_sources]) & (dist[edge_sources] + w == dist[self.targets])
+        tight &= self.targets != s
+        settle = np.full(n, np.iinfo(np.int64).max)
+        scan_pass = np.zeros(n, dtype=np.int64)  # first pass whose scan of a node sees its final distance
+        prev = np.full(n, -1, dtype=np.int32)
+        active = np.array([s], dtype=np.int64)
+        while active.size:
+            edges, u = self._out_edges(active)
+            keep = tight[edges]
+            edges, u = edges[keep], u[keep]
+            v = self.targets[edges]
+            when = scan_pass[u] * m + rank[edges]
+            better = when < settle[v]
+            edges, u, v, when = edges[better], u[better], v[better], when[better]
+            order = np.lexsort((when, v))
+            first_of = order[np.r_[True, v[order][1:] != v[order][:-1]]] if order.size else order
+            v, when = v[first_of], when[first_of]
+            settle[v] = when
+            prev[v] = u[first_of]
+            scan_pass[v] = when // m + (first[v] <= when % m)
+            active = v.astype(np.int64)
+        return prev
+
+    def _relax_passes(self, s: int, w: np.ndarray):
+        """Bellman-Ford distances with every pass relaxed as one NumPy operation.
+
+        Each pass only touches the out-edges of nodes whose distance changed in
+        the previous one. Returns (dist, scanned, passes, neg_cycle), where
+        neg_cycle tells that distances still dropped after n - 1 passes.
+        """
+        n = len(self.node_codes)
+        dist = np.full(n, np.inf)
+        dist[s] = 0.0
+        active = np.array([s], dtype=np.int64)
+        scanned = passes = 0
+        while active.size and passes < n - 1:
+            scanned += active.size
+            passes += 1
+            edges, u = self._out_edges(active)
+            v = self.targets[edges]
+            cand = dist[u] + w[edges]
+            better = cand < dist[v]
+            v = v[better]
+            np.minimum.at(dist, v, cand[better])
+            active = np.unique(v).astype(np.int64)
+
+        neg_cycle = False
+        if active.size:
+            edges, u = self._out_edges(active)
+            neg_cycle = bool((dist[u] + w[edges] < dist[self.targets[edges]]).any())
+        return dist, scanned, passes, neg_cycle
+
+    def _bf_result(self, s: int, t: Optional[int], w: np.ndarray, dist):
+        """(distance, path, False) for t from negative-cycle-free distances, with bellman_ford's path"""
+        if t is None or dist[t] == float("inf"):
+            return None, [], False
+        prev = self._bf_predecessors(s, w, np.asarray(dist, dtype=np.float64))
+        return float(dist[t]), self._path(prev.tolist(), s, t), False
+
+    def bellman_ford_vectorized(self, source: str, target: str,
+                                weight_key: str = "distance") -> Tuple[Optional[float], List[str], bool]:
+        """bellman_ford with each pass relaxed over the edge arrays at once.
+
+        Returns exactly what bellman_ford returns: among routes of equal
+        weight the path is the one bellman_ford's sweep keeps (see
+        _bf_predecessors), and when a negative cycle is reachable the query
+        is handed to bellman_ford, whose distance and path are then only
+        those of its n - 1 passes.
+        """
+        self._compact()
+        s = self.node_index.get(source)
+        t = self.node_index.get(target)
+        w = self.weights.get(weight_key)
+        if s is None or w is None:
+            self._record({"algorithm": "bellman_ford_vectorized", "settled": 0})
+            return (0.0, [source], False) if source == target else (None, [], False)
+        dist, scanned, passes, neg_cycle = self._relax_passes(s, w)
+        if neg_cycle:
+            result = self.bellman_ford(source, target, weight_key)
+        else:
+            result = self._bf_result(s, t, w, dist)
+        self._record({"algorithm": "bellman_ford_vectorized", "settled": scanned, "passes": passes,
+                      "negative_cycle": neg_cycle})
+        return result
+
+    def spfa(self, source: str, target: str, weight_key: str = "distance") -> Tuple[Optional[float], List[str], bool]:
+        """Queue-based Bellman-Ford (SPFA): only nodes whose distance dropped are rescanned.
+
+        Returns exactly what bellman_ford returns, like bellman_ford_vectorized.
+        A node whose tentative path reaches |V| edges proves a negative cycle;
+        the query is then handed to bellman_ford.
+        """
+        self._compact()
+        s = self.node_index.get(source)
+        t = self.node_index.get(target)
+        w = self.weights.get(weight_key)
+        if s is None or w is None:
+            self._record({"algorithm": "spfa", "settled": 0})
+            return (0.0, [source], False) if source == target else (None, [], False)
+
+        offsets = memoryview(self.offsets)
+        targets = memoryview(self.targets)
+        weights = memoryview(w)
+        inf = float("inf")
+        n = len(self.node_codes)
+        dist = [inf] * n
+        hops = [0] * n
+        queued = bytearray(n)
+        dist[s] = 0.0
+        queue = deque([s])
+        queued[s] = 1
+        popleft = queue.popleft
+        append = queue.append
+        scanned = relaxations = 0
+        neg_cycle = False
+        while queue and not neg_cycle:
+            u = popleft()
+            queued[u] = 0
+            scanned += 1
+            d = dist[u]
+            start, end = offsets[u], offsets[u + 1]
+            relaxations += end - start
+            for v, wt in zip(targets[start:end], weights[start:end]):
+                alt = d + wt
+                if alt < dist[v]:
+                    dist[v] = alt
+                    hops[v] = hops[u] + 1
+                    if hops[v] >= n:
+                        neg_cycle = True
+                        break
+                    if not queued[v]:
+                        queued[v] = 1
+                        append(v)
+
+        if neg_cycle:
+            result = self.bellman_ford(source, target, weight_key)
+        else:
+            result = self._bf_result(s, t, w, dist)
+        self._record({"algorithm": "spfa", "settled": scanned, "relaxations": relaxations,
+                      "negative_cycle": neg_cycle})
+        return result
+
+# ---------- Batch workers ----------
+# The graph is installed once per worker process by the pool initializer,
+# so tasks only ship their batch of source ids
+_worker_graph: Optional[FlightGraph] = None
+
+def _init_tree_worker(graph: FlightGraph):
+    global _worker_graph
+    _worker_graph = graph
+
+def _tree_rows(graph: FlightGraph, sources: List[int], targets: List[int], w: np.ndarray, predecessors: bool):
+    dist_rows, pred_rows = [], []
+    for s in sources:
+        dist, prev, _ = graph._targeted_tree(s, w, targets)
+        dist_rows.append([dist[i] for i in targets])
+        if predecessors:
+            pred_rows.append(prev)
+    return (np.array(dist_rows, dtype=np.float64).reshape(len(sources), len(targets)),
+            np.array(pred_rows, dtype=np.int32) if predecessors else None)
+
+def _tree_batch(sources: List[int], targets: List[int], weight_key: str, predecessors: bool):
+    return _tree_rows(_worker_graph, sources, targets, _worker_graph.weights[weight_key], predecessors)
 
 # ---------- MAIN TEST ----------
 if __name__ == "__main__":
-    # Load the cleaned routes.csv
-    routes_df = pd.read_csv("data/new/routes.csv")
-    print(f"[INFO] Loaded {len(routes_df)} routes from data/new/routes.csv")
+    import os
+    from src.graph.graph_snapshot import read_snapshot
 
-    # Build the graph
-    graph = FlightGraph.from_routes_df(routes_df)
-    print(f"[INFO] Graph constructed with {len(graph.adj)} nodes.")
+    # Open the snapshot written by the cleaning pipeline, or rebuild from routes.csv
+    if os.path.exists("data/new/routes.graph"):
+        graph = read_snapshot("data/new/routes.graph")
+        print("[INFO] Loaded graph snapshot from data/new/routes.graph")
+    else:
+        from src.graph.cleaning import load_routes_clean
+        routes_df = load_routes_clean("data/new/routes.csv")
+        print(f"[INFO] Loaded {len(routes_df)} routes from data/new/routes.csv")
+        graph = FlightGraph.from_routes_df(routes_df)
+    print(f"[INFO] Graph constructed with {graph.num_nodes} nodes and {graph.num_edges} edges.")
 
     # Take user input
     source = input("Enter Source Airport Code (e.g. MAA): ").strip().upper()
@@ -131,10 +1439,12 @@ if __name__ == "__main__":
     weight = input("Enter Weight Metric (distance / cost / delay): ").strip().lower()
 
     # Validate source/destination
-    if source not in graph.adj:
+    if source not in graph:
         print(f"[ERROR] Source airport code '{source}' not found in the graph.")
-    elif target not in graph.adj and all(target != edge.dest for edges in graph.adj.values() for edge in edges):
+    elif target not in graph:
         print(f"[ERROR] Destination airport code '{target}' not found in the graph.")
+    elif not graph.reachable(source, target):
+        print(f"[INFO] No route leads from {source} to {target}.")
     else:
         print(f"\n[Dijkstra] Finding shortest path from {source} to {target} by {weight}...")
         dist, path = graph.dijkstra(source, target, weight_key=weight)
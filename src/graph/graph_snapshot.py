@@ -0,0 +1,140 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import numpy as np
+from src.graph.flight_graph import FlightGraph
+
+# ---------- FORMAT ----------
+# A snapshot is a fixed preamble, a JSON header and a sequence of raw arrays:
+#
+#   magic (8 bytes) | version (uint32) | header length (uint32) | header JSON
+#   | arrays, each starting on an ALIGN-byte boundary
+#
+# The header lists every array as {"offset", "dtype", "count"}, with offsets
+# counted from the first ALIGN boundary after the header, plus the
+# metric names. Optional arrays (node latitude/longitude) are simply absent.
+# Node and airline codes are stored as UTF-8 blobs with an int64 offsets
+# array, so the whole file can be mapped without parsing.
+SNAPSHOT_MAGIC = b"FGRAPH\x00\x01"
+SNAPSHOT_VERSION = 1
+ALIGN = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+def _align(position):
+    return -(-position // ALIGN) * ALIGN
+
+def _encode_strings(values):
+    data = [str(v).encode("utf-8") for v in values]
+    offsets = np.zeros(len(data) + 1, dtype=np.int64)
+    np.cumsum([len(d) for d in data], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(data), dtype=np.uint8)
+
+def _decode_strings(offsets, blob):
+    raw = blob.tobytes()
+    bounds = offsets.tolist()
+    return [raw[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)]
+
+# ---------- WRITE ----------
+def write_snapshot(graph: FlightGraph, path: str):
+    """Write graph to path as a binary snapshot.
+
+    The file is written next to path and renamed into place, so processes
+    that still map an older snapshot keep reading consistent pages.
+    """
+    graph._compact()
+    node_offsets, node_blob = _encode_strings(graph.node_codes)
+    airline_offsets, airline_blob = _encode_strings(graph.airline_codes)
+    arrays = {
+        "offsets": graph.offsets.astype(np.int64),
+        "targets": graph.targets.astype(np.int32),
+        "edge_airline": graph.edge_airline.astype(np.int32),
+        "source_order": graph.source_order.astype(np.int32),
+        "node_offsets": node_offsets,
+        "node_blob": node_blob,
+        "airline_offsets": airline_offsets,
+        "airline_blob": airline_blob,
+    }
+    metrics = list(graph.weights)
+    for key in metrics:
+        arrays[f"weight:{key}"] = graph.weights[key].astype(np.float64)
+    if graph.latitude is not None:
+        arrays["latitude"] = graph.latitude.astype(np.float64)
+        arrays["longitude"] = graph.longitude.astype(np.float64)
+
+    # Array offsets are relative to the first ALIGN boundary after the header
+    sections = {}
+    position = 0
+    for name, arr in arrays.items():
+        sections[name] = {"offset": position, "dtype": arr.dtype.str, "count": int(arr.size)}
+        position = _align(position + arr.nbytes)
+    header = {"num_nodes": len(graph.node_codes), "num_edges": int(graph.targets.size),
+              "metrics": metrics, "sections": sections}
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(header_bytes))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            for name, arr in arrays.items():
+                f.seek(data_start + sections[name]["offset"])
+                f.write(arr.tobytes())
+            f.truncate(data_start + position)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+# ---------- READ ----------
+DEFAULT_SNAPSHOT = "data/new/routes.graph"
+DEFAULT_ROUTES = "data/new/routes.csv"
+
+def load_graph(snapshot_path: str = DEFAULT_SNAPSHOT, routes_path: str = DEFAULT_ROUTES) -> FlightGraph:
+    """The cleaned route graph for query processes, loaded without pandas.
+
+    The snapshot is written by the cleaning pipeline; without one the cleaned
+    routes CSV is streamed with FlightGraph.from_routes_csv.
+    """
+    if os.path.exists(snapshot_path):
+        return read_snapshot(snapshot_path)
+    return FlightGraph.from_routes_csv(routes_path)
+
+def read_snapshot(path: str) -> FlightGraph:
+    """Open a snapshot with mmap and return a FlightGraph over the mapped arrays.
+
+    Only the node and airline tables are decoded; adjacency and weight arrays
+    are read-only views into the shared page cache.
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, header_len = _PREAMBLE.unpack_from(mm, 0)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a flight graph snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {version} in {path} (expected {SNAPSHOT_VERSION})")
+    header = json.loads(bytes(mm[_PREAMBLE.size:_PREAMBLE.size + header_len]))
+    data_start = _align(_PREAMBLE.size + header_len)
+
+    def section(name):
+        spec = header["sections"][name]
+        return np.frombuffer(mm, dtype=np.dtype(spec["dtype"]), count=spec["count"],
+                             offset=data_start + spec["offset"])
+
+    graph = FlightGraph()
+    graph.node_codes = _decode_strings(section("node_offsets"), section("node_blob"))
+    graph.node_index = {code: i for i, code in enumerate(graph.node_codes)}
+    graph.offsets = section("offsets")
+    graph.targets = section("targets")
+    graph.weights = {key: section(f"weight:{key}") for key in header["metrics"]}
+    graph.airline_codes = _decode_strings(section("airline_offsets"), section("airline_blob"))
+    graph.edge_airline = section("edge_airline")
+    graph.source_order = section("source_order")
+    if "latitude" in header["sections"]:
+        graph.latitude = section("latitude")
+        graph.longitude = section("longitude")
+    return graph
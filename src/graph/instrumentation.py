@@ -0,0 +1,99 @@
+import os
+import time
+from typing import Dict, Iterable, List
+
+# ---------- PROFILER ----------
+# Set FLIGHT_PROFILE=1 to record from the start (worker processes inherit it)
+PROFILE_ENV = "FLIGHT_PROFILE"
+
+class _Stage:
+    """Context for one timed stage; set rows inside the block to record how much it handled"""
+    __slots__ = ("profiler", "name", "rows", "start")
+
+    def __init__(self, profiler: "Profiler", name: str, rows):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.start, self.rows)
+        return False
+
+class _NullStage:
+    # Shared by every stage while disabled; rows written to it are dropped
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class Profiler:
+    """Opt-in wall time and row counts per named stage.
+
+    While disabled, stage() returns a shared no-op context and iterate()
+    returns its argument, so instrumented code costs one attribute check.
+    Stages with the same name add up, e.g. the blocks of a streaming run;
+    with worker processes their seconds are summed over workers.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def reset(self):
+        self.stages = {}
+
+    def stage(self, name: str, rows=None):
+        return _Stage(self, name, rows) if self.enabled else _NULL_STAGE
+
+    def add(self, name: str, seconds: float, rows=None):
+        entry = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "rows": 0})
+        entry["calls"] += 1
+        entry["seconds"] += seconds
+        entry["rows"] += rows or 0
+
+    def iterate(self, name: str, blocks: Iterable) -> Iterable:
+        """Time producing each block of blocks (e.g. chunks read from disk) as stage name"""
+        if not self.enabled:
+            return blocks
+        return self._timed(name, iter(blocks))
+
+    def _timed(self, name: str, blocks):
+        while True:
+            start = time.perf_counter()
+            try:
+                block = next(blocks)
+            except StopIteration:
+                return
+            self.add(name, time.perf_counter() - start, len(block))
+            yield block
+
+    def drain(self) -> Dict[str, Dict[str, float]]:
+        """Return the recorded stages and start over (used to ship them back from workers)"""
+        stages, self.stages = self.stages, {}
+        return stages
+
+    def merge(self, stages: Dict[str, Dict[str, float]]):
+        for name, entry in stages.items():
+            mine = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "rows": 0})
+            for key in mine:
+                mine[key] += entry[key]
+
+    def report(self) -> List[Dict[str, object]]:
+        """Stages in order of first use as {"stage", "calls", "seconds", "rows"}"""
+        return [{"stage": name, "calls": e["calls"], "seconds": round(e["seconds"], 6), "rows": e["rows"]}
+                for name, e in self.stages.items()]
+
+def profile_from_env(value) -> bool:
+    """Whether a FLIGHT_PROFILE value turns profiling on; unset, "", "0", "false", "no" and "off" do not"""
+    return (value or "").strip().lower() not in ("", "0", "false", "no", "off")
+
+profiler = Profiler(enabled=profile_from_env(os.environ.get(PROFILE_ENV)))
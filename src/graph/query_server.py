@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+import socket
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from src.graph.flight_graph import FlightGraph
+from src.graph.graph_snapshot import DEFAULT_ROUTES, DEFAULT_SNAPSHOT, load_graph
+
+# ---------- PROTOCOL ----------
+# One JSON object per line in each direction. Queries look like
+#
+#   {"id": 1, "from": "JFK", "to": "DXB", "weight": "distance", "algorithm": "dijkstra"}
+#
+# and are answered with {"id", "distance", "path", "stats"} (plus
+# "negative_cycle" for spfa / bellman_ford) or {"id", "error"}; "stats" is
+# the graph's last_stats plus the search time in seconds. Responses carry
+# the request id and may arrive out of order. Control messages use "op":
+# {"op": "reload"} reopens the dataset (optionally {"snapshot": path}),
+# {"op": "status"} describes the loaded graph (and, with workers=0 and the
+# profiler enabled, the per-algorithm query totals).
+DEFAULT_PORT = 8765
+# Requests of one connection being answered at a time; past this the
+# connection is not read again until one finishes, so TCP flow control
+# slows a client that pipelines faster than the pool answers
+MAX_IN_FLIGHT = 64
+ALGORITHMS = ("dijkstra", "astar", "bidirectional", "spfa", "bellman_ford")
+
+def answer_query(graph: FlightGraph, request: Dict) -> Dict:
+    """Run one query message against graph and build its response"""
+    algorithm = request.get("algorithm", "dijkstra")
+    weight = request.get("weight", "distance")
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm '{algorithm}'")
+    if weight not in graph.weights:
+        raise KeyError(f"Unknown weight metric '{weight}'")
+    source, target = request["from"], request["to"]
+    response = {"id": request.get("id")}
+    start = time.perf_counter()
+    if algorithm in ("spfa", "bellman_ford"):
+        search = graph.spfa if algorithm == "spfa" else graph.bellman_ford_vectorized
+        response["distance"], response["path"], response["negative_cycle"] = search(source, target, weight)
+    else:
+        search = {"dijkstra": graph.dijkstra, "astar": graph.astar,
+                  "bidirectional": graph.bidirectional_dijkstra}[algorithm]
+        response["distance"], response["path"] = search(source, target, weight)
+    response["stats"] = dict(graph.last_stats, seconds=time.perf_counter() - start)
+    return response
+
+# ---------- Query workers ----------
+# Each worker process opens the dataset once in the pool initializer; a
+# snapshot is mapped, so all workers share its pages
+_worker_graph: Optional[FlightGraph] = None
+
+def _init_query_worker(snapshot_path: str, routes_path: str):
+    global _worker_graph
+    _worker_graph = load_graph(snapshot_path, routes_path)
+
+def _worker_query(request: Dict) -> Dict:
+    return answer_query(_worker_graph, request)
+
+class _Dataset:
+    """One loaded generation of the graph together with the pool that queries it"""
+
+    def __init__(self, snapshot_path: str, routes_path: str, workers: int):
+        self.snapshot_path = snapshot_path
+        self.routes_path = routes_path
+        self.graph = load_graph(snapshot_path, routes_path)
+        self.loaded_at = time.time()
+        if workers > 0:
+            self.pool: Executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_query_worker,
+                                                      initargs=(snapshot_path, routes_path))
+            self.run = _worker_query
+        else:
+            # Queries share the server's graph (and its tree cache) on one thread
+            self.pool = ThreadPoolExecutor(max_workers=1)
+            self.run = lambda request: answer_query(self.graph, request)
+
+    def describe(self) -> Dict:
+        return {"snapshot": self.snapshot_path, "nodes": self.graph.num_nodes,
+                "edges": self.graph.num_edges, "metrics": list(self.graph.weights),
+                "loaded_at": self.loaded_at}
+
+# ---------- SERVER ----------
+class RouteQueryServer:
+    """Resident shortest-path service over a FlightGraph, speaking JSON lines.
+
+    The graph is loaded once and queries run on a process pool of workers
+    (workers=0 answers them on a single thread of the server process). A
+    reload opens the new dataset with a fresh pool before swapping it in;
+    queries already submitted finish on the old pool, which is then shut down.
+    Each connection has at most max_in_flight requests pending; stats["stalls"]
+    counts the times a connection waited for one of them before reading on.
+    """
+
+    def __init__(self, snapshot_path: str = DEFAULT_SNAPSHOT, routes_path: str = DEFAULT_ROUTES,
+                 workers: Optional[int] = None, max_in_flight: int = MAX_IN_FLIGHT):
+        self.snapshot_path = snapshot_path
+        self.routes_path = routes_path
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_in_flight = max_in_flight
+        self.stats = {"stalls": 0}
+        self.dataset = _Dataset(snapshot_path, routes_path, self.workers)
+        self.served = 0
+        self._reload_lock = asyncio.Lock()
+
+    async def reload(self, snapshot_path: Optional[str] = None) -> Dict:
+        async with self._reload_lock:
+            loop = asyncio.get_running_loop()
+            path = snapshot_path or self.snapshot_path
+            dataset = await loop.run_in_executor(None, _Dataset, path, self.routes_path, self.workers)
+            old, self.dataset = self.dataset, dataset
+            self.snapshot_path = path
+            # Lets already-submitted queries complete on the old pool
+            old.pool.shutdown(wait=False)
+            return dataset.describe()
+
+    async def _dispatch(self, message: Dict) -> Dict:
+        op = message.get("op", "query")
+        if op == "reload":
+            return {"id": message.get("id"), "reloaded": await self.reload(message.get("snapshot"))}
+        if op == "status":
+            status = {"id": message.get("id"), "graph": self.dataset.describe(), "served": self.served,
+                      "workers": self.workers, "stalls": self.stats["stalls"]}
+            if not self.workers:
+                # Worker processes keep their own counters; only the in-process graph can report them
+                status["query_totals"] = self.dataset.graph.query_stats()["totals"]
+            return status
+        if op != "query":
+            raise ValueError(f"Unknown op '{op}'")
+        dataset = self.dataset
+        response = await asyncio.get_running_loop().run_in_executor(dataset.pool, dataset.run, message)
+        self.served += 1
+        return response
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter, write_lock: asyncio.Lock):
+        message_id = None
+        try:
+            message = json.loads(line)
+            message_id = message.get("id")
+            response = await self._dispatch(message)
+        except Exception as e:
+            response = {"id": message_id, "error": f"{type(e).__name__}: {e}"}
+        async with write_lock:
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        tasks = set()
+
+        def finished(task):
+            tasks.discard(task)
+            slots.release()
+        try:
+            while True:
+                if slots.locked():
+                    self.stats["stalls"] += 1
+                await slots.acquire()
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(self._respond(line, writer, write_lock))
+                    tasks.add(task)
+                    task.add_done_callback(finished)
+                else:
+                    slots.release()
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, unix_path: Optional[str] = None):
+        """Accept connections until cancelled, on a Unix socket when unix_path is set"""
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.dataset.pool.shutdown(wait=True)
+
+# ---------- CLIENT ----------
+def parse_address(address: str):
+    """"unix:/path/to/socket" or "host:port" (a bare port means localhost)"""
+    if address.startswith("unix:"):
+        return address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+def send_requests(address: str, messages: List[Dict], timeout: Optional[float] = 30.0) -> List[Dict]:
+    """Send messages over one connection and return their responses in request order"""
+    target = parse_address(address)
+    family = socket.AF_UNIX if isinstance(target, str) else socket.AF_INET
+    messages = [dict(m, id=m.get("id", i)) for i, m in enumerate(messages)]
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(target)
+        sock.sendall(b"".join(json.dumps(m).encode("utf-8") + b"\n" for m in messages))
+        responses = {}
+        with sock.makefile("rb") as stream:
+            while len(responses) < len(messages):
+                line = stream.readline()
+                if not line:
+                    raise ConnectionError("Query server closed the connection")
+                response = json.loads(line)
+                responses[response.get("id")] = response
+    return [responses[m["id"]] for m in messages]
@@ -0,0 +1,96 @@
+from typing import List
+import numpy as np
+
+# ---------- REACHABILITY INDEX ----------
+class ReachabilityIndex:
+    """Strongly connected components of a CSR graph and reachability between them.
+
+    comp[v] is the component of node v. Components are numbered in reverse
+    topological order of the condensation DAG (every edge goes from a higher
+    to a lower or the same component), and reach[c] is a bitset (a Python
+    int) of the components reachable from c, c included. A pair query is
+    then two lookups and a bit test.
+    """
+
+    def __init__(self, comp: np.ndarray, reach: List[int]):
+        self.comp = comp
+        self.reach = reach
+
+    @property
+    def num_components(self) -> int:
+        return len(self.reach)
+
+    @classmethod
+    def build(cls, offsets: np.ndarray, targets: np.ndarray) -> "ReachabilityIndex":
+        n = len(offsets) - 1
+        bounds = offsets.tolist()
+        succ = targets.tolist()
+        # Iterative Tarjan; components come out sinks first, i.e. in reverse topological order
+        index = [-1] * n
+        low = [0] * n
+        comp = [-1] * n
+        on_stack = [False] * n
+        stack: List[int] = []
+        counter = 0
+        num_comps = 0
+        for root in range(n):
+            if index[root] >= 0:
+                continue
+            work = [(root, bounds[root])]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                u, i = work[-1]
+                if i < bounds[u + 1]:
+                    work[-1] = (u, i + 1)
+                    v = succ[i]
+                    if index[v] < 0:
+                        index[v] = low[v] = counter
+                        counter += 1
+                        stack.append(v)
+                        on_stack[v] = True
+                        work.append((v, bounds[v]))
+                    elif on_stack[v] and index[v] < low[u]:
+                        low[u] = index[v]
+                    continue
+                work.pop()
+                if work and low[u] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[u]
+                if low[u] == index[u]:
+                    while True:
+                        v = stack.pop()
+                        on_stack[v] = False
+                        comp[v] = num_comps
+                        if v == u:
+                            break
+                    num_comps += 1
+
+        # Successor components are numbered lower, so one ascending pass closes the bitsets
+        comp_arr = np.array(comp, dtype=np.int32)
+        src_comp = np.repeat(comp_arr, np.diff(offsets))
+        dst_comp = comp_arr[targets]
+        cross = src_comp != dst_comp
+        pairs = np.unique(np.stack([src_comp[cross], dst_comp[cross]]), axis=1)
+        succ_comps: List[List[int]] = [[] for _ in range(num_comps)]
+        for c, d in zip(pairs[0].tolist(), pairs[1].tolist()):
+            succ_comps[c].append(d)
+        reach = [0] * num_comps
+        for c in range(num_comps):
+            bits = 1 << c
+            for d in succ_comps[c]:
+                bits |= reach[d]
+            reach[c] = bits
+        return cls(comp_arr, reach)
+
+    def reachable(self, u: int, v: int) -> bool:
+        return bool(self.reach[self.comp[u]] >> int(self.comp[v]) & 1)
+
+    def reaching(self, nodes) -> np.ndarray:
+        """Boolean mask of the nodes from which at least one of nodes can be reached"""
+        wanted = 0
+        for c in set(self.comp[np.asarray(nodes, dtype=np.int64)].tolist()):
+            wanted |= 1 << c
+        comp_mask = np.array([bits & wanted != 0 for bits in self.reach], dtype=bool)
+        return comp_mask[self.comp]
@@ -0,0 +1,181 @@
+from typing import List, Tuple
+import numpy as np
+from src.graph.geo import EARTH_RADIUS_KM
+
+# ---------- SPATIAL INDEX ----------
+# Airports per leaf bucket; each bucket is scanned with one vectorized distance computation
+DEFAULT_LEAF_SIZE = 32
+# Queries handled together; bounds the (queries x buckets) scratch arrays
+QUERY_BLOCK = 1024
+# Padding coordinate for short buckets: farther from any unit vector than the whole sphere
+_FAR = 10.0
+
+def _unit_vectors(lat, lon) -> np.ndarray:
+    phi = np.radians(np.atleast_1d(np.asarray(lat, dtype=float)))
+    lam = np.radians(np.atleast_1d(np.asarray(lon, dtype=float)))
+    return np.stack([np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)], axis=-1).reshape(-1, 3)
+
+def _chord_to_km(sq_chord: np.ndarray) -> np.ndarray:
+    # Great-circle distance from a squared chord length on the unit sphere
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.sqrt(sq_chord) / 2, 1.0))
+
+def _km_to_sq_chord(km: float) -> float:
+    return (2 * np.sin(min(km / (2 * EARTH_RADIUS_KM), np.pi / 2))) ** 2
+
+class AirportIndex:
+    """k-d partition of airport positions as unit vectors on the sphere.
+
+    Straight-line (chord) distance between unit vectors grows with great-circle
+    distance, so searches run on plain 3-D boxes and only convert to km at the
+    end. Airports are split at the median of the widest axis down to buckets of
+    at most leaf_size; bucket b holds positions[b] (padded with -1) at points[b]
+    inside the box lo[b]..hi[b]. A batch of queries visits buckets in order of
+    box distance, all queries at once, until no bucket can still improve any
+    of them. Airports without coordinates are left out.
+    """
+
+    def __init__(self, codes: List[str], latitude, longitude, leaf_size: int = DEFAULT_LEAF_SIZE):
+        latitude = np.asarray(latitude, dtype=float)
+        longitude = np.asarray(longitude, dtype=float)
+        known = ~(np.isnan(latitude) | np.isnan(longitude))
+        self.codes = [code for code, ok in zip(codes, known.tolist()) if ok]
+        self.latitude = latitude[known]
+        self.longitude = longitude[known]
+        points = _unit_vectors(self.latitude, self.longitude)
+
+        buckets = []
+        pending = [np.arange(len(points))] if len(points) else []
+        while pending:
+            idx = pending.pop()
+            if len(idx) <= leaf_size:
+                buckets.append(idx)
+                continue
+            box = points[idx]
+            axis = int(np.argmax(box.max(axis=0) - box.min(axis=0)))
+            mid = len(idx) // 2
+            idx = idx[np.argpartition(box[:, axis], mid)]
+            pending.extend((idx[mid:], idx[:mid]))
+
+        self.positions = np.full((len(buckets), leaf_size), -1, dtype=np.int64)
+        self.points = np.full((len(buckets), leaf_size, 3), _FAR)
+        for b, idx in enumerate(buckets):
+            self.positions[b, :len(idx)] = idx
+            self.points[b, :len(idx)] = points[idx]
+        self.lo = np.array([points[idx].min(axis=0) for idx in buckets]).reshape(-1, 3)
+        self.hi = np.array([points[idx].max(axis=0) for idx in buckets]).reshape(-1, 3)
+
+    @classmethod
+    def from_airports(cls, airports_clean, leaf_size: int = DEFAULT_LEAF_SIZE) -> "AirportIndex":
+        """Index the cleaned airports frame (primary_code index, Latitude/Longitude columns)"""
+        return cls(airports_clean.index.tolist(), airports_clean["Latitude"], airports_clean["Longitude"], leaf_size)
+
+    @classmethod
+    def from_graph(cls, graph, leaf_size: int = DEFAULT_LEAF_SIZE) -> "AirportIndex":
+        """Index only the airports of a FlightGraph, so every hit is a valid graph node"""
+        if graph.latitude is None:
+            raise ValueError("Graph has no airport coordinates; call set_coordinates first")
+        return cls(graph.node_codes, graph.latitude, graph.longitude, leaf_size)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _scan_order(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Squared box distance from every query to every bucket, and buckets by that distance per query"""
+        gap = np.maximum(np.maximum(self.lo[None] - queries[:, None], queries[:, None] - self.hi[None]), 0.0)
+        box = np.einsum("qbi,qbi->qb", gap, gap)
+        return box, np.argsort(box, axis=1, kind="stable")
+
+    def _bucket_dists(self, queries: np.ndarray, buckets: np.ndarray) -> np.ndarray:
+        diff = self.points[buckets] - queries[:, None]
+        return np.einsum("qsi,qsi->qs", diff, diff)
+
+    def query(self, lats, lons, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """k nearest airports to each point, as (positions, km) arrays of shape (len(lats), k).
+
+        Positions index codes, latitude and longitude; rows are sorted by
+        distance, padded with -1 / inf when the index holds fewer than k airports.
+        """
+        queries = _unit_vectors(lats, lons)
+        blocks = [self._knn(queries[i:i + QUERY_BLOCK], k) for i in range(0, len(queries), QUERY_BLOCK)]
+        if not blocks:
+            return np.zeros((0, max(k, 0)), dtype=np.int64), np.zeros((0, max(k, 0)))
+        return np.concatenate([b[0] for b in blocks]), np.concatenate([b[1] for b in blocks])
+
+    def _knn(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        best_d = np.full((len(queries), max(k, 0)), np.inf)
+        best_i = np.full((len(queries), max(k, 0)), -1, dtype=np.int64)
+        if not len(self.codes) or k <= 0:
+            return best_i, best_d
+        box, order = self._scan_order(queries)
+        rows = np.arange(len(queries))
+        for j in range(order.shape[1]):
+            bucket = order[:, j]
+            # Buckets come nearest first, so a query is done once its next box is beyond its k-th hit
+            active = np.flatnonzero(box[rows, bucket] <= best_d[:, -1])
+            if not active.size:
+                break
+            d = np.concatenate([best_d[active], self._bucket_dists(queries[active], bucket[active])], axis=1)
+            i = np.concatenate([best_i[active], self.positions[bucket[active]]], axis=1)
+            keep = np.argsort(d, axis=1, kind="stable")[:, :k]
+            best_d[active] = np.take_along_axis(d, keep, axis=1)
+            best_i[active] = np.take_along_axis(i, keep, axis=1)
+        found = best_i >= 0
+        best_d[found] = _chord_to_km(best_d[found])
+        best_d[~found] = np.inf
+        return best_i, best_d
+
+    def query_radius(self, lats, lons, radius_km: float) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Airports within radius_km of each point, as one (positions, km) pair per point, nearest first"""
+        queries = _unit_vectors(lats, lons)
+        results = []
+        for i in range(0, len(queries), QUERY_BLOCK):
+            results.extend(self._radius(queries[i:i + QUERY_BLOCK], radius_km))
+        return results
+
+    def _radius(self, queries: np.ndarray, radius_km: float) -> List[Tuple[np.ndarray, np.ndarray]]:
+        limit = _km_to_sq_chord(radius_km)
+        hit_q, hit_i, hit_d = [], [], []
+        if len(self.codes):
+            box, order = self._scan_order(queries)
+            rows = np.arange(len(queries))
+            for j in range(order.shape[1]):
+                bucket = order[:, j]
+                active = np.flatnonzero(box[rows, bucket] <= limit)
+                if not active.size:
+                    break
+                d = self._bucket_dists(queries[active], bucket[active])
+                q, s = np.nonzero(d <= limit)
+                hit_q.append(active[q])
+                hit_i.append(self.positions[bucket[active[q]], s])
+                hit_d.append(d[q, s])
+        q = np.concatenate(hit_q) if hit_q else np.zeros(0, dtype=np.int64)
+        i = np.concatenate(hit_i) if hit_i else np.zeros(0, dtype=np.int64)
+        d = np.concatenate(hit_d) if hit_d else np.zeros(0)
+        order = np.lexsort((i, d, q))
+        q, i, d = q[order], i[order], _chord_to_km(d[order])
+        bounds = np.searchsorted(q, np.arange(len(queries) + 1))
+        return [(i[bounds[r]:bounds[r + 1]], d[bounds[r]:bounds[r + 1]]) for r in range(len(queries))]
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Tuple[str, float]]:
+        """The k airports closest to one point as (code, km), nearest first"""
+        positions, dists = self.query(lat, lon, k)
+        return [(self.codes[p], float(d)) for p, d in zip(positions[0].tolist(), dists[0].tolist()) if p >= 0]
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[str, float]]:
+        """All airports within radius_km of one point as (code, km), nearest first"""
+        positions, dists = self.query_radius(lat, lon, radius_km)[0]
+        return [(self.codes[p], float(d)) for p, d in zip(positions.tolist(), dists.tolist())]
+
+    # ---------- Persistence ----------
+    def save(self, path: str):
+        np.savez(path, codes=np.array(self.codes, dtype=str), latitude=self.latitude, longitude=self.longitude,
+                 positions=self.positions, points=self.points, lo=self.lo, hi=self.hi)
+
+    @classmethod
+    def load(cls, path: str) -> "AirportIndex":
+        index = cls.__new__(cls)
+        with np.load(path) as data:
+            index.codes = data["codes"].tolist()
+            for name in ("latitude", "longitude", "positions", "points", "lo", "hi"):
+                setattr(index, name, data[name])
+        return index
@@ -0,0 +1,65 @@
+import os
+import shutil
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# src is a plain directory of modules, imported from the repository root like the examples do
+sys.path.insert(0, ROOT)
+
+RAW_DIR = os.path.join(ROOT, "data", "raw")
+# Routes kept in the test dataset: enough for unresolved codes, multi-airline edges and several components
+TEST_ROUTES = 6000
+
+@pytest.fixture(scope="session")
+def raw_data(tmp_path_factory):
+    """(airports.dat, routes.dat) paths of a small copy of the raw OpenFlights data"""
+    raw = tmp_path_factory.mktemp("raw")
+    airports = str(raw / "airports.dat")
+    routes = str(raw / "routes.dat")
+    shutil.copyfile(os.path.join(RAW_DIR, "airports.dat"), airports)
+    with open(os.path.join(RAW_DIR, "routes.dat"), "rb") as src, open(routes, "wb") as dst:
+        for i, line in enumerate(src):
+            if i >= TEST_ROUTES:
+                break
+            dst.write(line)
+    return airports, routes
+
+@pytest.fixture(scope="session")
+def cleaned_dir(raw_data, tmp_path_factory):
+    """Output directory of one uncached cleaning run over raw_data"""
+    from src.graph.cleaning import run_full_cleaning_pipeline
+    out_dir = str(tmp_path_factory.mktemp("cleaned"))
+    run_full_cleaning_pipeline(*raw_data, out_dir, cache_dir=None)
+    return out_dir
+
+@pytest.fixture(scope="session")
+def snapshot_graph(cleaned_dir):
+    """FlightGraph mapped from the snapshot of cleaned_dir, with coordinates"""
+    from src.graph.graph_snapshot import read_snapshot
+    return read_snapshot(os.path.join(cleaned_dir, "routes.graph"))
+
+@pytest.fixture
+def make_graph():
+    """Builder of small random FlightGraphs with many equal-weight routes.
+
+    make_graph(seed, nodes, edges, negative=False): integer "distance" and
+    "delay" weights (delay mostly 0); with negative, "distance" gets negative
+    edges from a node potential, so there is still no negative cycle.
+    """
+    import random
+    from src.graph.flight_graph import FlightEdge, FlightGraph
+
+    def build(seed, nodes=30, edges=120, negative=False):
+        rng = random.Random(seed)
+        codes = [f"N{i:02d}" for i in rng.sample(range(nodes), nodes)]
+        potential = {code: rng.randint(0, 6) if negative else 0 for code in codes}
+        graph = FlightGraph()
+        for _ in range(edges):
+            u, v = rng.choice(codes), rng.choice(codes)
+            weights = {"distance": float(rng.randint(0, 4) + potential[u] - potential[v]),
+                       "delay": float(rng.choice((0, 0, 0, 1, 2)))}
+            graph.add_edge(u, FlightEdge(v, rng.choice(("AA", "BA", "LH")), weights))
+        graph._compact()
+        return graph
+    return build
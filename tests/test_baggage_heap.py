@@ -0,0 +1,82 @@
+import random
+from src.baggage.baggage_flow import Baggage, BaggageIndex, BaggageMinHeap
+
+RISKS = ("low", "medium", "high", "High")
+
+class Model:
+    """Brute-force queue: (urgency, arrival, bag) rows, popped by min"""
+
+    def __init__(self):
+        self.rows = []
+        self.arrivals = 0
+
+    def push(self, bag):
+        self.rows.append([bag.urgency_score(), self.arrivals, bag])
+        self.arrivals += 1
+
+    def first(self, pid):
+        return min((r for r in self.rows if r[2].passenger_id == pid), key=lambda r: r[1], default=None)
+
+    def pop(self):
+        if not self.rows:
+            return None
+        row = min(self.rows, key=lambda r: (r[0], r[1]))
+        self.rows.remove(row)
+        return row[2]
+
+def test_heap_against_model():
+    for seed in range(10):
+        rng = random.Random(seed)
+        heap, model = BaggageMinHeap(), Model()
+        initial = [Baggage(f"P{rng.randrange(40)}", rng.randint(1, 5), "fragile", rng.choice(RISKS))
+                   for _ in range(50)]
+        heap.heapify(initial)
+        for bag in initial:
+            model.push(bag)
+        for _ in range(1500):
+            op = rng.random()
+            pid = f"P{rng.randrange(40)}"
+            row = model.first(pid)
+            if op < 0.3:
+                bag = Baggage(pid, rng.randint(1, 5), "check-in", rng.choice(RISKS))
+                heap.push(bag)
+                model.push(bag)
+            elif op < 0.5:
+                removed = heap.remove(pid)
+                assert removed is (row[2] if row else None)
+                if row:
+                    model.rows.remove(row)
+            elif op < 0.75 and row:
+                priority, risk = rng.randint(1, 5), rng.choice(RISKS)
+                updated = heap.update(pid, priority=priority, risk_level=risk)
+                assert (updated.priority, updated.risk_level) == (priority, risk)
+                row[0], row[2] = updated.urgency_score(), updated
+            else:
+                assert heap.pop() is model.pop()
+            assert len(heap) == len(model.rows)
+            assert (pid in heap) == (model.first(pid) is not None)
+        order = list(iter(heap.pop, None))
+        assert order == list(iter(model.pop, None))
+
+def test_duplicate_passengers_queue_every_bag():
+    heap = BaggageMinHeap()
+    first, second = Baggage("P1", 3, "fragile", "low"), Baggage("P1", 1, "check-in", "high")
+    heap.push(first)
+    heap.push(second)
+    assert len(heap) == 2 and heap.peek() is second
+    # remove and update take the first queued bag, or the bag given
+    assert heap.remove("P1", second) is second
+    assert heap.pop() is first and heap.pop() is None and "P1" not in heap
+
+def test_update_leaves_indexed_bag_untouched():
+    bag = Baggage("P1", 3, "fragile", "low")
+    index, heap = BaggageIndex(), BaggageMinHeap()
+    index.insert(bag)
+    heap.push(bag)
+    updated = heap.update("P1", priority=1, risk_level="high")
+    assert updated is not bag and (bag.priority, bag.risk_level) == (3, "low")
+    assert index.filter(priority=3, risk_level="low") == [bag]
+    assert index.remove("P1") is bag and not index.by_attribute["priority"]
+    index.insert(updated)
+    assert index.filter(priority=1, risk_level="high") == [updated]
+    assert heap.pop() is updated
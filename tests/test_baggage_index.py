@@ -0,0 +1,75 @@
+import random
+import pytest
+from src.baggage import baggage_flow
+from src.baggage.baggage_flow import Baggage, BaggageIndex, SortedIndex
+
+TYPES = ("check-in", "Carry-On", "fragile", "FRAGILE")
+RISKS = ("low", "Medium", "HIGH", "high")
+
+def random_bags(rng, n):
+    # Few distinct IDs, so passengers have several bags
+    return [Baggage(f"P{rng.randrange(n // 3 + 1):04d}", rng.randint(1, 5), rng.choice(TYPES), rng.choice(RISKS))
+            for _ in range(n)]
+
+def expected_filter(bags, priority=None, bag_type=None, risk_level=None):
+    keep = [b for b in bags
+            if (priority is None or b.priority == priority)
+            and (bag_type is None or b.bag_type.lower() == bag_type.lower())
+            and (risk_level is None or b.risk_level.lower() == risk_level.lower())]
+    return sorted(keep, key=lambda b: b.passenger_id)
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    # Tiny blocks, so a few hundred keys already split and empty blocks
+    monkeypatch.setattr(baggage_flow, "INDEX_BLOCK_SIZE", 4)
+
+def test_sorted_index_against_sorted_list():
+    rng = random.Random(1)
+    index, model = SortedIndex(), []
+    for step in range(3000):
+        key = rng.randrange(200)
+        if model and rng.random() < 0.4:
+            key = rng.choice(model)[0]
+            index.remove(key)
+            model.remove(next(e for e in model if e[0] == key))
+        else:
+            item = object()
+            index.insert(key, item)
+            model.append((key, item))
+            model.sort(key=lambda e: e[0])
+        assert len(index) == len(model)
+    assert [item for _, item in model] == list(index)
+    assert list(index.irange(50, 120)) == [item for k, item in model if 50 <= k <= 120]
+    assert index.find(-1) is None and not index.remove(-1)
+
+def test_index_matches_brute_force():
+    rng = random.Random(2)
+    bags = random_bags(rng, 600)
+    index = BaggageIndex()
+    index.insert_many(bags[:400])
+    for bag in bags[400:]:
+        index.insert(bag)
+    live = list(bags)
+    for _ in range(150):
+        pid = rng.choice(live).passenger_id
+        removed = index.remove(pid)
+        # The first bag of that passenger, in insertion order
+        assert removed is next(b for b in live if b.passenger_id == pid)
+        live.remove(removed)
+    ordered = sorted(live, key=lambda b: b.passenger_id)
+    assert index.inorder() == ordered
+    assert index.range("P0050", "P0120") == [b for b in ordered if "P0050" <= b.passenger_id <= "P0120"]
+    assert index.search("missing") is None and index.remove("missing") is None
+    for priority in (None, 3):
+        for bag_type in (None, "fragile", "CARRY-ON"):
+            for risk_level in (None, "high", "medium"):
+                assert (index.filter(priority, bag_type, risk_level)
+                        == expected_filter(live, priority, bag_type, risk_level))
+
+def test_filter_cache_follows_changes():
+    index = BaggageIndex()
+    index.insert_many([Baggage("B", 1, "fragile", "high"), Baggage("A", 2, "fragile", "low")])
+    assert [b.passenger_id for b in index.filter(bag_type="fragile")] == ["A", "B"]
+    index.insert(Baggage("0", 3, "Fragile", "low"))
+    index.remove("B")
+    assert [b.passenger_id for b in index.filter(bag_type="fragile")] == ["0", "A"]
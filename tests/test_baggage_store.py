@@ -0,0 +1,70 @@
+import csv
+import random
+from collections import Counter
+import numpy as np
+import pytest
+from src.baggage.baggage_flow import Baggage, BaggageIndex, BaggageMinHeap
+from src.baggage.baggage_store import BaggageStore
+
+TYPES = ("check-in", "Carry-On", "carry-on", "fragile", "FRAGILE")
+RISKS = ("low", "Medium", "medium", "HIGH", "high", "unknown")
+
+@pytest.fixture
+def records():
+    rng = random.Random(3)
+    return [(f"P{rng.randrange(400):04d}", rng.randint(1, 5), rng.choice(TYPES), rng.choice(RISKS))
+            for _ in range(1000)]
+
+def test_loading_paths_agree(records, tmp_path):
+    path = tmp_path / "baggage.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["PassengerID", "Priority", "BaggageType", "RiskLevel"])
+        writer.writerows(records)
+    stores = [BaggageStore(*zip(*records)), BaggageStore.from_records(records, block=7),
+              BaggageStore.from_csv(str(path), block=64),
+              BaggageStore.from_baggage(Baggage(*r) for r in records)]
+    for store in stores:
+        assert [(b.passenger_id, b.priority, b.bag_type, b.risk_level) for b in store.bags()] == \
+            [(pid, int(p), t, r) for pid, p, t, r in records]
+    assert len(BaggageStore.from_records([])) == 0
+
+def test_queries_match_index_and_heap(records):
+    store = BaggageStore.from_records(records)
+    bags = store.bags()
+    index = BaggageIndex()
+    index.insert_many(bags)
+    for priority in (None, 2, (1, 4)):
+        for bag_type in (None, "fragile", "CARRY-ON", ("Check-In", "fragile"), "missing"):
+            for risk_level in (None, "high", "Medium"):
+                rows = store.filter(priority, bag_type, risk_level)
+                expected = []
+                for p in (priority if isinstance(priority, tuple) else (priority,)):
+                    for t in (bag_type if isinstance(bag_type, tuple) else (bag_type,)):
+                        expected += index.filter(p, t, risk_level)
+                assert sorted(store.passenger_id[rows].tolist()) == sorted(b.passenger_id for b in expected)
+    heap = BaggageMinHeap()
+    heap.heapify(bags)
+    order = [b.passenger_id for b in iter(heap.pop, None)]
+    for k in (0, 1, 37, 1000, 5000):
+        assert store.passenger_id[store.top_k(k)].tolist() == order[:k]
+    where = store.mask(risk_level="HIGH")
+    assert store.passenger_id[store.top_k(10, where)].tolist() == \
+        [b.passenger_id for b in sorted((b for b in bags if b.risk_level.lower() == "high"),
+                                        key=lambda b: b.urgency_score())][:10]
+
+def test_group_counts_fold_case(records):
+    store = BaggageStore.from_records(records)
+    assert store.group_counts("bag_type") == Counter(t.lower() for _, _, t, _ in records)
+    assert store.group_counts("priority", "risk_level") == Counter((p, r.lower()) for _, p, _, r in records)
+    rows = store.filter(priority=3)
+    assert store.group_counts("bag_type", where=rows) == Counter(t.lower() for _, p, t, _ in records if p == 3)
+    assert store.group_counts(where=np.array([], dtype=np.int64)) == {}
+    with pytest.raises(ValueError):
+        store.group_counts("owner")
+
+def test_find(records):
+    store = BaggageStore.from_records(records)
+    pid = records[10][0]
+    assert store.find(pid) == next(i for i, r in enumerate(records) if r[0] == pid)
+    assert store.search("missing") is None and store.find("missing") == -1
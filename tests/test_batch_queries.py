@@ -0,0 +1,51 @@
+import random
+import numpy as np
+import pytest
+
+@pytest.fixture(scope="module")
+def sample(snapshot_graph):
+    rng = random.Random(21)
+    return rng.sample(snapshot_graph.node_codes, 6), rng.sample(snapshot_graph.node_codes, 40)
+
+def _dijkstra_row(graph, source, targets, weight_key):
+    dists = [graph.dijkstra(source, t, weight_key)[0] for t in targets]
+    return np.array([np.inf if d is None else d for d in dists])
+
+def test_one_to_all_matches_dijkstra(snapshot_graph, sample):
+    graph = snapshot_graph
+    sources, targets = sample
+    for weight_key in ("distance", "cost"):
+        dist, pred = graph.one_to_all(sources[0], weight_key)
+        idx = [graph.node_index[t] for t in targets]
+        np.testing.assert_array_equal(dist[idx], _dijkstra_row(graph, sources[0], targets, weight_key))
+        for t in targets:
+            if np.isfinite(dist[graph.node_index[t]]):
+                path = graph.path_to(pred, sources[0], t)
+                assert graph._path_weight([graph.node_index[c] for c in path], graph.weights[weight_key]) \
+                    == dist[graph.node_index[t]]
+            else:
+                assert graph.path_to(pred, sources[0], t) == []
+
+def test_one_to_many_matches_dijkstra(snapshot_graph, sample):
+    graph = snapshot_graph
+    sources, targets = sample
+    dist = graph.one_to_many(sources[1], targets, "delay")
+    np.testing.assert_array_equal(dist, _dijkstra_row(graph, sources[1], targets, "delay"))
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_distance_matrix(snapshot_graph, sample, workers):
+    graph = snapshot_graph
+    sources, targets = sample
+    matrix, pred = graph.distance_matrix(sources, targets, "distance", workers=workers, predecessors=True)
+    assert matrix.shape == (len(sources), len(targets)) and pred.shape == (len(sources), len(graph.node_codes))
+    for i, source in enumerate(sources):
+        np.testing.assert_array_equal(matrix[i], _dijkstra_row(graph, source, targets, "distance"))
+        for j, target in enumerate(targets):
+            path = graph.path_to(pred[i], source, target)
+            assert (path == []) == (matrix[i, j] == np.inf)
+
+def test_unknown_codes_raise(snapshot_graph):
+    with pytest.raises(KeyError):
+        snapshot_graph.one_to_all("ZZZ")
+    with pytest.raises(KeyError):
+        snapshot_graph.distance_matrix(["ZZZ"])
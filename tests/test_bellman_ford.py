@@ -0,0 +1,79 @@
+import random
+import pytest
+from src.graph.flight_graph import FlightEdge, FlightGraph
+
+ENGINES = ("spfa", "bellman_ford_vectorized")
+
+def _all_pairs(graph):
+    graph._compact()
+    return [(a, b) for a in graph.node_codes for b in graph.node_codes]
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("weight_key", ["distance", "delay"])
+@pytest.mark.parametrize("negative", [False, True])
+def test_engines_match_bellman_ford_exactly(make_graph, seed, weight_key, negative):
+    graph = make_graph(seed, nodes=25, edges=110, negative=negative)
+    for a, b in _all_pairs(graph):
+        expected = graph.bellman_ford(a, b, weight_key)
+        for engine in ENGINES:
+            assert getattr(graph, engine)(a, b, weight_key) == expected, (engine, a, b)
+
+def test_negative_cycle_contract():
+    graph = FlightGraph()
+    for u, v, w in [("A", "B", 1.0), ("B", "C", -3.0), ("C", "B", 1.0), ("C", "D", 2.0), ("E", "A", 1.0)]:
+        graph.add_edge(u, FlightEdge(v, "XX", {"distance": w}))
+    for a, b in _all_pairs(graph) + [("A", "ZZZ"), ("ZZZ", "ZZZ")]:
+        expected = graph.bellman_ford(a, b)
+        for engine in ENGINES:
+            assert getattr(graph, engine)(a, b) == expected, (engine, a, b)
+    distance, path, neg_cycle = graph.spfa("A", "D")
+    assert neg_cycle and distance is not None and path[0] == "A" and path[-1] == "D"
+    assert graph.last_stats["negative_cycle"] is True
+
+def test_engines_match_on_routes(snapshot_graph):
+    rng = random.Random(7)
+    codes = snapshot_graph.node_codes
+    for weight_key in ("distance", "delay", "cost"):
+        for _ in range(12):
+            a, b = rng.choice(codes), rng.choice(codes)
+            expected = snapshot_graph.bellman_ford(a, b, weight_key)
+            for engine in ENGINES:
+                assert getattr(snapshot_graph, engine)(a, b, weight_key) == expected, (engine, a, b, weight_key)
+
+def _reference_bellman_ford(graph, source, weight_key):
+    """The original dict-based bellman_ford's (dist, neg_cycle), which reads dist[u] afresh for every edge"""
+    inf = float("inf")
+    adj = {graph.node_codes[u]: graph.neighbors(graph.node_codes[u]) for u in graph.source_order.tolist()}
+    dist = {code: inf for code in graph.node_codes}
+    dist[source] = 0.0
+    for _ in range(len(dist) - 1):
+        updated = False
+        for u, edges in adj.items():
+            for edge in edges:
+                if dist[u] + edge.weights.get(weight_key, inf) < dist[edge.dest]:
+                    dist[edge.dest] = dist[u] + edge.weights.get(weight_key, inf)
+                    updated = True
+        if not updated:
+            break
+    neg_cycle = any(dist[u] + edge.weights.get(weight_key, inf) < dist[edge.dest]
+                    for u, edges in adj.items() for edge in edges)
+    return dist, neg_cycle
+
+@pytest.mark.parametrize("seed", range(8))
+def test_negative_self_loops(seed):
+    rng = random.Random(seed)
+    codes = [f"N{i}" for i in range(8)]
+    graph = FlightGraph()
+    for _ in range(20):
+        u, v = rng.choice(codes), rng.choice(codes)
+        graph.add_edge(u, FlightEdge(v, "XX", {"distance": float(rng.randint(0, 5))}))
+    # Negative self-loops among the edges, so a node's later edges see its distance drop mid-pass
+    for u in rng.sample(codes, 2):
+        graph.add_edge(u, FlightEdge(u, "XX", {"distance": -1.0}))
+        graph.add_edge(u, FlightEdge(rng.choice(codes), "XX", {"distance": 1.0}))
+    for a, b in _all_pairs(graph):
+        expected = graph.bellman_ford(a, b)
+        dist, neg_cycle = _reference_bellman_ford(graph, a, "distance")
+        assert expected[0] == (None if dist[b] == float("inf") else dist[b]) and expected[2] == neg_cycle, (a, b)
+        for engine in ENGINES:
+            assert getattr(graph, engine)(a, b) == expected, (engine, a, b)
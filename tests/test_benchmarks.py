@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+from benchmarks.run_benchmarks import Recorder, compare
+from benchmarks.synthetic import baggage_records, lost_baggage_records, scale_openflights
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_suites(out, *args):
+    cmd = [sys.executable, "-m", "benchmarks.run_benchmarks", "--repeat", "1", "--out", str(out), *args]
+    return subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+
+def test_rerun_reproduces_every_digest(raw_data, tmp_path):
+    """A second run with the same seed must give the same answers, or --baseline would flag them"""
+    args = ["--suites", "queries", "baggage", "--airports", raw_data[0], "--routes", raw_data[1],
+            "--queries", "5", "--bf-queries", "2", "--baggage-sizes", "300"]
+    first = run_suites(tmp_path / "first.json", *args)
+    assert first.returncode == 0, first.stderr
+    with open(tmp_path / "first.json") as f:
+        results = json.load(f)["results"]
+    assert {r["suite"] for r in results} == {"queries", "baggage"}
+    assert any(r["digest"] is not None for r in results)
+    second = run_suites(tmp_path / "second.json", *args, "--baseline", str(tmp_path / "first.json"),
+                        "--tolerance", "1000")
+    assert second.returncode == 0, second.stdout + second.stderr
+    assert "RESULTS DIFFER" not in second.stdout
+
+def test_compare_flags_slow_and_wrong_results(tmp_path, capsys):
+    base = [{"suite": "s", "name": n, "params": {"k": 1}, "min": 1.0, "digest": d}
+            for n, d in (("same", "a"), ("slow", "b"), ("wrong", "c"), ("gone", None))]
+    path = tmp_path / "base.json"
+    with open(path, "w") as f:
+        json.dump({"meta": {}, "results": base}, f)
+    now = [dict(base[0], min=1.1), dict(base[1], min=2.0), dict(base[2], digest="x"),
+           dict(base[0], name="new")]
+    assert compare(now, str(path), 0.25) == 2
+    out = capsys.readouterr().out
+    assert "SLOWER" in out and "RESULTS DIFFER" in out
+
+def test_recorder_times_without_setup():
+    rec = Recorder(repeat=3)
+    calls = []
+    result, record = rec.measure("s", "n", lambda x: x + 1, setup=lambda: (calls.append(1) or 41,), k=2)
+    assert result == 42 and len(record["times"]) == 3 and len(calls) == 3
+    assert record["params"] == {"k": 2} and record["min"] <= record["median"]
+
+def test_synthetic_data(raw_data):
+    assert baggage_records(50, seed=3) == baggage_records(50, seed=3)
+    assert len({r[0] for r in baggage_records(1000)}) == 1000
+    assert len({r[0] for r in lost_baggage_records(1000)}) == 1000
+    airports, routes = scale_openflights(3, 0, *raw_data)
+    single, single_routes = scale_openflights(1, 0, *raw_data)
+    assert len(airports) == 3 * len(single) and len(routes) == 3 * len(single_routes)
+    assert airports["Airport ID"].is_unique
+    # Copy 0 keeps the real codes, copy i appends i
+    codes = set(airports["IATA"].dropna())
+    assert {c + s for c in single["IATA"].dropna() for s in ("", "1", "2")} == codes
+    # Some routes bridge into another copy, so the scaled network stays connected
+    src_copy = routes["Source airport ID"] // (single["Airport ID"].max() + 1)
+    dst_copy = routes["Destination airport ID"] // (single["Airport ID"].max() + 1)
+    assert 0 < np.mean(src_copy != dst_copy) < 0.1
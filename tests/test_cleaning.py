@@ -0,0 +1,50 @@
+import gzip
+import os
+import pytest
+from src.graph.cleaning import run_full_cleaning_pipeline
+
+# Written by the original row-at-a-time cleaning (the first commit's cleaning.py) over the raw_data sample
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+OUTPUTS = ("airports.csv", "routes.csv", "unresolved_routes_log.csv", "cleaning_report.json", "routes.graph")
+
+def _read(out_dir, name):
+    with open(os.path.join(out_dir, name), "rb") as f:
+        return f.read()
+
+@pytest.fixture(scope="module")
+def serial_run(raw_data, tmp_path_factory):
+    out_dir = str(tmp_path_factory.mktemp("serial"))
+    airports_clean, routes_clean, report = run_full_cleaning_pipeline(*raw_data, out_dir, cache_dir=None)
+    return out_dir, routes_clean, report
+
+@pytest.mark.parametrize("chunksize", [250, 997, 100_000])
+def test_streaming_matches_in_memory(raw_data, serial_run, tmp_path, chunksize):
+    serial_dir, routes_clean, report = serial_run
+    assert report["routes_unresolved_logged"] > 0
+    out_dir = str(tmp_path)
+    _, streamed, _ = run_full_cleaning_pipeline(*raw_data, out_dir, cache_dir=None, chunksize=chunksize)
+    assert streamed is None
+    for name in OUTPUTS:
+        assert _read(out_dir, name) == _read(serial_dir, name), name
+
+@pytest.mark.parametrize("chunksize", [None, 997])
+def test_parallel_matches_serial(raw_data, serial_run, tmp_path, chunksize):
+    serial_dir, routes_clean, _ = serial_run
+    out_dir = str(tmp_path)
+    _, parallel, _ = run_full_cleaning_pipeline(*raw_data, out_dir, cache_dir=None, chunksize=chunksize, workers=3)
+    if chunksize is None:
+        assert parallel.equals(routes_clean)
+    for name in OUTPUTS:
+        assert _read(out_dir, name) == _read(serial_dir, name), name
+
+@pytest.mark.parametrize("name", ["routes.csv", "unresolved_routes_log.csv"])
+def test_outputs_match_baseline(serial_run, name):
+    serial_dir, _, _ = serial_run
+    with gzip.open(os.path.join(BASELINE_DIR, f"baseline_{name}.gz"), "rb") as f:
+        expected = f.read().splitlines()
+    got = _read(serial_dir, name).splitlines()
+    # Line by line, so a failure names the first differing row
+    assert len(got) == len(expected)
+    for i, (line, want) in enumerate(zip(got, expected)):
+        assert line == want, f"{name} line {i + 1}"
@@ -0,0 +1,114 @@
+import os
+from src.graph.cleaning import run_full_cleaning_pipeline
+from src.graph.cleaning_cache import BuildCache, file_digest, stage_key
+
+def _write(path, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+def test_store_and_load_round_trip(tmp_path):
+    cache = BuildCache(str(tmp_path / "cache"))
+    src = _write(tmp_path / "out.csv", b"a,b\n1,2\n")
+    assert cache.store("stage", "k1", {"rows": 1}, [src])
+    assert cache.load("stage", "k1") == {"rows": 1}
+    assert cache.load("stage", "k2") is None
+    restored = tmp_path / "restored"
+    restored.mkdir()
+    cache.restore("stage", "k1", str(restored))
+    assert (restored / "out.csv").read_bytes() == b"a,b\n1,2\n"
+    # Only the finished artifact is left behind, no temporary directories
+    assert os.listdir(cache.cache_dir) == ["stage-k1"]
+
+def test_store_twice_keeps_first_artifact(tmp_path):
+    cache = BuildCache(str(tmp_path / "cache"))
+    assert cache.store("stage", "k", 1)
+    assert cache.store("stage", "k", 1)
+    assert cache.load("stage", "k") == 1
+    assert os.listdir(cache.cache_dir) == ["stage-k"]
+
+def test_store_replaces_incomplete_artifact(tmp_path):
+    cache = BuildCache(str(tmp_path / "cache"))
+    os.makedirs(os.path.join(cache.cache_dir, "stage-k"))
+    assert cache.load("stage", "k") is None
+    assert cache.store("stage", "k", "payload")
+    assert cache.load("stage", "k") == "payload"
+
+def test_store_failure_raises_and_cleans_up(tmp_path):
+    cache = BuildCache(str(tmp_path / "cache"))
+    try:
+        cache.store("stage", "k", 1, [str(tmp_path / "missing.csv")])
+    except OSError:
+        pass
+    else:
+        raise AssertionError("a missing stage output must not be cached silently")
+    assert cache.load("stage", "k") is None
+    assert not os.path.isdir(cache.cache_dir) or os.listdir(cache.cache_dir) == []
+
+def test_store_failure_mid_copy_cleans_up(tmp_path):
+    cache = BuildCache(str(tmp_path / "cache"))
+    src = _write(tmp_path / "out.csv", b"1")
+    try:
+        # A directory passes the size check but cannot be copied
+        cache.store("stage", "k", 1, [src, str(tmp_path)])
+    except OSError:
+        pass
+    else:
+        raise AssertionError("a failed copy must be raised")
+    assert os.listdir(cache.cache_dir) == []
+
+def test_unusable_cache_dir_skips_caching(tmp_path):
+    blocker = _write(tmp_path / "not_a_dir", b"")
+    cache = BuildCache(os.path.join(blocker, "cache"))
+    assert not cache.store("stage", "k", 1)
+    assert cache.load("stage", "k") is None
+
+def test_size_guard(tmp_path):
+    src = _write(tmp_path / "big.bin", b"x" * 4096)
+    cache = BuildCache(str(tmp_path / "cache"), max_artifact_bytes=1024)
+    assert not cache.store("stage", "k", 1, [src])
+    # The payload counts towards the limit too
+    assert not cache.store("stage", "k", b"y" * 4096)
+    assert cache.store("stage", "k", 1)
+    assert os.listdir(cache.cache_dir) == ["stage-k"]
+
+def test_stage_key_tracks_content(tmp_path):
+    path = _write(tmp_path / "in.dat", b"one")
+    before = stage_key("routes", file_digest(path), 1.0)
+    assert stage_key("routes", file_digest(path), 1.0) == before
+    assert stage_key("routes", file_digest(path), 2.0) != before
+    _write(path, b"two")
+    assert stage_key("routes", file_digest(path), 1.0) != before
+
+def _artifacts(cache_dir, stage):
+    return sorted(name for name in os.listdir(cache_dir) if name.startswith(stage + "-"))
+
+def test_pipeline_cache_hit_and_invalidation(raw_data, tmp_path):
+    airports_src, routes_src = raw_data
+    cache_dir = str(tmp_path / "cache")
+    cold = str(tmp_path / "cold")
+    run_full_cleaning_pipeline(airports_src, routes_src, cold, cache_dir)
+    routes_artifacts = _artifacts(cache_dir, "routes")
+    assert len(_artifacts(cache_dir, "airports")) == 1 and len(routes_artifacts) == 1
+
+    # A warm run restores identical outputs without adding artifacts
+    warm = str(tmp_path / "warm")
+    _, _, report = run_full_cleaning_pipeline(airports_src, routes_src, warm, cache_dir)
+    for name in ("airports.csv", "routes.csv", "unresolved_routes_log.csv", "cleaning_report.json"):
+        with open(os.path.join(cold, name), "rb") as a, open(os.path.join(warm, name), "rb") as b:
+            assert a.read() == b.read(), name
+    assert _artifacts(cache_dir, "routes") == routes_artifacts
+
+    # Changing the routes input invalidates the routes stage only
+    edited = str(tmp_path / "routes.dat")
+    with open(routes_src, "rb") as f:
+        lines = f.readlines()
+    _write(edited, b"".join(lines[:-100]))
+    _, _, edited_report = run_full_cleaning_pipeline(airports_src, edited, str(tmp_path / "edited"), cache_dir)
+    assert len(_artifacts(cache_dir, "airports")) == 1
+    assert len(_artifacts(cache_dir, "routes")) == 2
+    assert edited_report["routes_raw_count"] == report["routes_raw_count"] - 100
+
+    # Streaming output is cached separately from the in-memory run
+    run_full_cleaning_pipeline(airports_src, routes_src, str(tmp_path / "streamed"), cache_dir, chunksize=1000)
+    assert len(_artifacts(cache_dir, "routes")) == 3
@@ -0,0 +1,68 @@
+import os
+import random
+import numpy as np
+import pytest
+from src.graph.contraction import ContractionHierarchy, ShortestPathIndex, graph_fingerprint, verify_index
+
+@pytest.fixture(scope="module")
+def index(snapshot_graph):
+    return ShortestPathIndex.build(snapshot_graph)
+
+def test_index_matches_dijkstra(snapshot_graph, index):
+    assert verify_index(snapshot_graph, index, pairs=200, seed=1) == []
+
+def test_index_paths_are_valid_routes(snapshot_graph, index):
+    graph = snapshot_graph
+    rng = random.Random(2)
+    for weight_key in index.hierarchies:
+        w = graph.weights[weight_key]
+        for _ in range(100):
+            a, b = rng.choice(graph.node_codes), rng.choice(graph.node_codes)
+            dist, path = index.query(a, b, weight_key)
+            expected, _ = graph.dijkstra(a, b, weight_key)
+            assert dist == expected
+            if dist is not None:
+                assert path[0] == a and path[-1] == b
+                assert graph._path_weight([graph.node_index[c] for c in path], w) == dist
+
+def test_unknown_codes(index):
+    assert index.query("ZZZ", "ZZZ") == (0.0, ["ZZZ"])
+    assert index.query("ZZZ", "YYY") == (None, [])
+
+def test_save_and_load(snapshot_graph, index, tmp_path):
+    index.save(str(tmp_path))
+    loaded = ShortestPathIndex.load(str(tmp_path), graph=snapshot_graph)
+    assert sorted(loaded.hierarchies) == sorted(index.hierarchies)
+    assert verify_index(snapshot_graph, loaded, pairs=50, seed=3) == []
+
+def test_load_refuses_another_graph(make_graph, tmp_path):
+    graph = make_graph(0)
+    path = str(tmp_path / "ch_delay.npz")
+    ContractionHierarchy.build(graph, "delay").save(path)
+    assert ContractionHierarchy.load(path, graph=graph).fingerprint == graph_fingerprint(graph, "delay")
+    # Another metric's weights are not part of the delay hierarchy
+    graph.set_weights("distance", graph.weights["distance"] + 1)
+    ContractionHierarchy.load(path, graph=graph)
+    with pytest.raises(ValueError, match="different graph"):
+        ContractionHierarchy.load(path, graph=make_graph(1))
+    changed = graph.weights["delay"].copy()
+    changed[0] += 1
+    graph.set_weights("delay", changed)
+    with pytest.raises(ValueError, match="different graph"):
+        ContractionHierarchy.load(path, graph=graph)
+    # A file written before fingerprints were stored cannot be checked, so it is refused too
+    with np.load(path) as data:
+        legacy = {name: data[name] for name in data.files if name not in ("graph_edges", "fingerprint")}
+    np.savez(path, **legacy)
+    with pytest.raises(ValueError, match="no graph fingerprint"):
+        ContractionHierarchy.load(path, graph=graph)
+    with pytest.raises(ValueError):
+        ShortestPathIndex.load(os.path.dirname(path), ["delay"], graph=graph)
+
+def test_small_graphs_with_ties(make_graph):
+    for seed in range(5):
+        graph = make_graph(seed, nodes=20, edges=70)
+        ch = ContractionHierarchy.build(graph, "delay")
+        for a in graph.node_codes:
+            for b in graph.node_codes:
+                assert ch.query(a, b)[0] == graph.dijkstra(a, b, "delay")[0], (seed, a, b)
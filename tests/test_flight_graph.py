@@ -0,0 +1,85 @@
+import os
+from collections import defaultdict
+import numpy as np
+import pytest
+from src.graph.cleaning import load_routes_clean
+from src.graph.flight_graph import FlightEdge, FlightGraph
+
+@pytest.fixture(scope="module")
+def routes(cleaned_dir):
+    return load_routes_clean(os.path.join(cleaned_dir, "routes.csv"))
+
+def edge_tuples(edges):
+    return [(e.dest, e.airline, e.weights) for e in edges]
+
+def test_csr_matches_route_rows(routes):
+    graph = FlightGraph.from_routes_df(routes)
+    expected = defaultdict(list)
+    for src, dst, airline, km, delay, cost in zip(routes["Source airport"], routes["Destination airport"],
+                                                  routes["Airline"], routes["distance_km"], routes["delay"],
+                                                  routes["cost"]):
+        expected[src].append((dst, airline, {"distance": km, "delay": delay, "cost": cost}))
+    # Sources in order of their first route, each with its routes in file order
+    assert list(graph.adj) == list(expected)
+    for src, edges in expected.items():
+        assert edge_tuples(graph.neighbors(src)) == edges
+    assert graph.num_edges == len(routes)
+    assert graph.node_codes == sorted(set(routes["Source airport"]) | set(routes["Destination airport"]))
+    assert np.all(np.diff(graph.offsets) >= 0) and graph.offsets[-1] == len(routes)
+    assert graph.neighbors("missing") == [] and "missing" not in graph
+
+def test_add_edge_matches_bulk_build(routes):
+    bulk = FlightGraph.from_routes_df(routes)
+    graph = FlightGraph.from_routes_df(routes.iloc[:1000])
+    rows = routes.iloc[1000:]
+    for i, (src, dst, airline, km, delay, cost) in enumerate(zip(
+            rows["Source airport"], rows["Destination airport"], rows["Airline"], rows["distance_km"],
+            rows["delay"], rows["cost"])):
+        graph.add_edge(src, FlightEdge(dst, airline, {"distance": km, "delay": delay, "cost": cost}))
+        if i % 1500 == 0:
+            # Reads merge the buffered edges in between
+            assert graph.num_edges == 1001 + i
+    assert graph.num_edges == bulk.num_edges
+    assert graph.node_codes == bulk.node_codes
+    for name in ("offsets", "targets", "source_order"):
+        np.testing.assert_array_equal(getattr(graph, name), getattr(bulk, name), err_msg=name)
+    # Airline numbering follows the order edges reach _build, so compare the names
+    assert ([graph.airline_codes[a] for a in graph.edge_airline.tolist()]
+            == [bulk.airline_codes[a] for a in bulk.edge_airline.tolist()])
+    for key in bulk.weights:
+        np.testing.assert_array_equal(graph.weights[key], bulk.weights[key], err_msg=key)
+
+def test_adj_is_a_cached_read_only_view():
+    graph = FlightGraph()
+    graph.add_edge("A", FlightEdge("B", "X", {"distance": 5.0}))
+    graph.add_edge("B", FlightEdge("A", "Y", {"distance": 1.0}))
+    adj = graph.adj
+    assert graph.adj is adj
+    assert edge_tuples(adj["A"]) == [("B", "X", {"distance": 5.0})]
+    with pytest.raises(TypeError):
+        adj["C"] = []
+    with pytest.raises(AttributeError):
+        adj["A"].append(FlightEdge("C", "X", {"distance": 1.0}))
+    with pytest.raises(TypeError):
+        adj["A"][0].weights["distance"] = 0.0
+    with pytest.raises(AttributeError, match="add_edge"):
+        adj["A"][0].dest = "C"
+    # Changes made through the graph show up in a fresh view
+    graph.set_weights("distance", [2.0, 3.0])
+    assert graph.adj is not adj and [e.weights["distance"] for e in graph.adj["A"]] == [2.0]
+    graph.add_edge("A", FlightEdge("C", "X", {"distance": 1.0}))
+    assert [e.dest for e in graph.adj["A"]] == ["B", "C"] and len(adj["A"]) == 1
+
+def test_missing_metrics_and_weight_updates():
+    graph = FlightGraph()
+    graph.add_edge("A", FlightEdge("B", "X", {"distance": 5.0}))
+    graph.add_edge("B", FlightEdge("C", "Y", {"distance": 1.0, "delay": 2.0}))
+    graph.add_edge("A", FlightEdge("C", "X", {"distance": 9.0}))
+    # A metric an edge lacks is stored as inf and left out of its FlightEdge
+    assert edge_tuples(graph.neighbors("A")) == [("B", "X", {"distance": 5.0}), ("C", "X", {"distance": 9.0})]
+    assert graph.dijkstra("A", "C", "distance") == (6.0, ["A", "B", "C"])
+    assert graph.dijkstra("A", "C", "delay") == (None, [])
+    graph.set_weights("distance", [5.0, 9.0, 20.0])  # slots in CSR order: A-B, A-C, B-C
+    assert graph.dijkstra("A", "C", "distance") == (9.0, ["A", "C"])
+    with pytest.raises(ValueError):
+        graph.set_weights("distance", [1.0])
@@ -0,0 +1,38 @@
+import math
+import random
+import numpy as np
+import pandas as pd
+from src.graph.cleaning import BASE_FARE, FARE_PER_KM, clean_airports, compute_route_metrics, load_airports_local
+from src.graph.geo import haversine, haversine_np
+
+def test_haversine_np_matches_scalar():
+    rng = random.Random(0)
+    points = [(rng.uniform(-90, 90), rng.uniform(-180, 180), rng.uniform(-90, 90), rng.uniform(-180, 180))
+              for _ in range(2000)]
+    # Same point, antipodes and the antimeridian
+    points += [(10.0, 20.0, 10.0, 20.0), (0.0, 0.0, 0.0, 180.0), (45.0, 179.9, 45.0, -179.9), (90.0, 0.0, -90.0, 0.0)]
+    lat1, lon1, lat2, lon2 = map(np.array, zip(*points))
+    expected = [haversine(*p) for p in points]
+    # Bit for bit, so the cleaned distance_km and cost columns match the row-wise baseline exactly
+    np.testing.assert_array_equal(haversine_np(lat1, lon1, lat2, lon2), expected)
+    np.testing.assert_allclose(haversine_np(lat1, lon1, lat2, lon2, exact=False), expected, rtol=1e-12, atol=1e-9)
+    assert math.isclose(float(haversine_np(0.0, 0.0, 0.0, 180.0)), math.pi * 6371.0)
+    # Broadcasts one point against many, and passes NaN through
+    np.testing.assert_array_equal(haversine_np(lat1[0], lon1[0], lat2, lon2),
+                                  [haversine(lat1[0], lon1[0], a, b) for a, b in zip(lat2, lon2)])
+    assert np.isnan(haversine_np(np.nan, 0.0, 0.0, 0.0))
+
+def test_route_metrics_match_rowwise(raw_data):
+    airports = clean_airports(load_airports_local(raw_data[0]))
+    rng = random.Random(1)
+    codes = airports.index.tolist()
+    routes = pd.DataFrame({"Source airport": [rng.choice(codes) for _ in range(500)] + ["???"],
+                           "Destination airport": [rng.choice(codes) for _ in range(500)] + ["JFK"]})
+    out = compute_route_metrics(routes, airports)
+    for src, dst, km in zip(out["Source airport"][:-1], out["Destination airport"][:-1], out["distance_km"][:-1]):
+        a, b = airports.loc[src], airports.loc[dst]
+        assert km == haversine(a["Latitude"], a["Longitude"], b["Latitude"], b["Longitude"])
+    # An unknown code gives NaN, which the cleaning drops
+    assert np.isnan(out["distance_km"].iloc[-1])
+    np.testing.assert_allclose(out["cost"], BASE_FARE + FARE_PER_KM * out["distance_km"])
+    assert (out["delay"] == 0.0).all()
@@ -0,0 +1,63 @@
+import os
+import numpy as np
+import pytest
+from src.graph.cleaning import load_routes_clean
+from src.graph.flight_graph import FlightGraph
+from src.graph.graph_snapshot import load_graph, read_snapshot, write_snapshot
+
+def _assert_same_graph(a: FlightGraph, b: FlightGraph):
+    assert a.node_codes == b.node_codes
+    assert a.airline_codes == b.airline_codes
+    for name in ("offsets", "targets", "edge_airline", "source_order"):
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name), err_msg=name)
+    assert sorted(a.weights) == sorted(b.weights)
+    for key in a.weights:
+        np.testing.assert_array_equal(a.weights[key], b.weights[key], err_msg=key)
+    for name in ("latitude", "longitude"):
+        if getattr(a, name) is None:
+            assert getattr(b, name) is None
+        else:
+            np.testing.assert_array_equal(getattr(a, name), getattr(b, name), err_msg=name)
+
+@pytest.fixture(scope="module")
+def routes_path(cleaned_dir):
+    return os.path.join(cleaned_dir, "routes.csv")
+
+@pytest.mark.parametrize("block", [7, 100_000])
+def test_from_routes_csv_matches_from_routes_df(routes_path, block):
+    _assert_same_graph(FlightGraph.from_routes_csv(routes_path, block=block),
+                       FlightGraph.from_routes_df(load_routes_clean(routes_path)))
+
+def test_snapshot_round_trip(cleaned_dir, routes_path, tmp_path):
+    snapshot = read_snapshot(os.path.join(cleaned_dir, "routes.graph"))
+    assert snapshot.latitude is not None
+    graph = FlightGraph.from_routes_csv(routes_path)
+    graph.set_coordinates(snapshot.node_codes, snapshot.latitude, snapshot.longitude)
+    _assert_same_graph(snapshot, graph)
+
+    # Rewriting a mapped snapshot reproduces the file byte for byte
+    copy = str(tmp_path / "copy.graph")
+    write_snapshot(snapshot, copy)
+    with open(copy, "rb") as a, open(os.path.join(cleaned_dir, "routes.graph"), "rb") as b:
+        assert a.read() == b.read()
+    _assert_same_graph(read_snapshot(copy), graph)
+
+    # Mapped arrays are read-only and answer queries like the built graph
+    assert not snapshot.targets.flags.writeable
+    codes = graph.node_codes
+    for src, dst in zip(codes[::97], codes[::-89]):
+        assert snapshot.dijkstra(src, dst, "distance") == graph.dijkstra(src, dst, "distance")
+
+def test_snapshot_without_coordinates(routes_path, tmp_path):
+    graph = FlightGraph.from_routes_csv(routes_path)
+    path = str(tmp_path / "plain.graph")
+    write_snapshot(graph, path)
+    _assert_same_graph(read_snapshot(path), graph)
+
+def test_load_graph_falls_back_to_csv(routes_path, tmp_path):
+    graph = load_graph(str(tmp_path / "missing.graph"), routes_path)
+    _assert_same_graph(graph, FlightGraph.from_routes_csv(routes_path))
+
+def test_read_snapshot_rejects_other_files(routes_path):
+    with pytest.raises(ValueError):
+        read_snapshot(routes_path)
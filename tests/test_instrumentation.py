@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from src.graph.cleaning import run_full_cleaning_pipeline
+from src.graph.instrumentation import PROFILE_ENV, profile_from_env, profiler
+
+@pytest.mark.parametrize("value", [None, "", "0", "false", "False", "no", "off", " 0 "])
+def test_profile_env_off(value):
+    assert not profile_from_env(value)
+
+@pytest.mark.parametrize("value", ["1", "true", "yes", "on"])
+def test_profile_env_on(value):
+    assert profile_from_env(value)
+
+def test_profile_env_at_import(tmp_path):
+    code = "from src.graph.instrumentation import profiler; print(profiler.enabled)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for value, expected in (("0", "False"), ("1", "True")):
+        env = dict(os.environ, **{PROFILE_ENV: value})
+        out = subprocess.run([sys.executable, "-c", code], cwd=root, env=env, capture_output=True, text=True)
+        assert out.stdout.strip() == expected
+
+def test_pipeline_profile_is_restored(raw_data, tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "enabled", False)
+    _, _, report = run_full_cleaning_pipeline(*raw_data, str(tmp_path / "out"), cache_dir=None, profile=True)
+    assert not profiler.enabled
+    assert {"load_routes", "build_graph"} <= {t["stage"] for t in report["timings"]}
+    with open(tmp_path / "out" / "cleaning_report.json") as f:
+        assert "timings" in json.load(f)
+    # Restored when the run fails too
+    with pytest.raises(OSError):
+        run_full_cleaning_pipeline(str(tmp_path / "missing.dat"), raw_data[1], str(tmp_path / "bad"),
+                                   cache_dir=None, profile=True)
+    assert not profiler.enabled
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+import pytest
+from src.baggage.lost_baggage_tracker import LostBaggageTracker, load_baggage_csv, save_baggage_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_list_and_lookup_stay_in_step():
+    tracker = LostBaggageTracker()
+    for i in range(6):
+        tracker.insert_baggage(f"B{i}", "Check-in", {"owner": f"O{i}", "flight": "AI1"})
+    tracker.insert_baggage("B2", "Security", {"owner": "ignored", "flight": ""})
+    tracker.update_checkpoint("B3", "Gate A")
+    for bag_id in ("B0", "B5", "B3"):
+        assert tracker.remove_baggage(bag_id)
+    assert not tracker.remove_baggage("B3")
+    order = tracker.traverse_order()
+    assert [b["bag_id"] for b in order] == ["B1", "B2", "B4"] == list(tracker.lookup)
+    assert tracker.get_baggage_info("B2") == {"bag_id": "B2", "last_checkpoint": "Security",
+                                              "metadata": {"owner": "O2", "flight": "AI1"}}
+    assert tracker.head.prev is None and tracker.tail.next is None and tracker.tail.prev.bag_id == "B2"
+
+def test_csv_round_trip(tmp_path):
+    tracker = load_baggage_csv(os.path.join(ROOT, "data", "raw", "lost_baggage.csv"))
+    assert len(tracker.lookup) > 0
+    # Commas, quotes and non-ASCII names survive
+    tracker.insert_baggage("B-X", "Gate \"B\", east", {"owner": "Zoë, Jr.", "flight": "0042"})
+    path = str(tmp_path / "lost.csv")
+    save_baggage_csv(tracker, path)
+    assert load_baggage_csv(path).traverse_order() == tracker.traverse_order()
+    assert load_baggage_csv(str(tmp_path / "missing.csv")).traverse_order() == []
+
+@pytest.mark.parametrize("code", [
+    "from src.baggage.lost_baggage_tracker import load_baggage_csv; load_baggage_csv('data/raw/lost_baggage.csv')",
+    "from src.baggage.baggage_flow import load_baggage_data; load_baggage_data('data/raw/baggage.csv')",
+    "from src.graph.graph_snapshot import load_graph; g = load_graph(SNAPSHOT, ROUTES); g.dijkstra(g.node_codes[0], g.node_codes[1])",
+])
+def test_tools_do_not_import_pandas(code, cleaned_dir):
+    code = code.replace("SNAPSHOT", repr(os.path.join(cleaned_dir, "routes.graph"))).replace(
+        "ROUTES", repr(os.path.join(cleaned_dir, "routes.csv")))
+    check = code + "; import sys; print('pandas' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().splitlines()[-1] == "False"
@@ -0,0 +1,90 @@
+import asyncio
+import contextlib
+import os
+import threading
+import time
+import pytest
+from src.graph.graph_snapshot import read_snapshot
+from src.graph.query_server import RouteQueryServer, answer_query, send_requests
+
+@contextlib.contextmanager
+def running(server, socket_path):
+    """Run server on a background event loop; yields its unix: address"""
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(server.serve(unix_path=socket_path))
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not os.path.exists(socket_path):
+        assert time.time() < deadline, "query server did not start"
+        time.sleep(0.01)
+    try:
+        yield f"unix:{socket_path}"
+    finally:
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join(5)
+
+def make_server(cleaned_dir, **options):
+    return RouteQueryServer(os.path.join(cleaned_dir, "routes.graph"), os.path.join(cleaned_dir, "routes.csv"),
+                            workers=0, **options)
+
+@pytest.fixture
+def server_address(cleaned_dir, tmp_path):
+    """unix: address of a RouteQueryServer (workers=0) running on a background event loop"""
+    with running(make_server(cleaned_dir), str(tmp_path / "routes.sock")) as address:
+        yield address
+
+def test_answers_match_local_queries(server_address, snapshot_graph):
+    codes = snapshot_graph.node_codes
+    messages = [{"from": codes[i], "to": codes[-1 - i], "weight": weight, "algorithm": algorithm}
+                for i, (weight, algorithm) in enumerate([("distance", "dijkstra"), ("cost", "astar"),
+                                                         ("delay", "bidirectional"), ("delay", "spfa"),
+                                                         ("distance", "bellman_ford")])]
+    responses = send_requests(server_address, messages)
+    for message, response in zip(messages, responses):
+        expected = answer_query(snapshot_graph, message)
+        assert response["distance"] == expected["distance"]
+        assert response["path"] == expected["path"]
+        assert "settled" in response["stats"]
+
+def test_errors_and_control_messages(server_address, cleaned_dir):
+    bad_algorithm, bad_weight, status, reloaded = send_requests(server_address, [
+        {"from": "JFK", "to": "LHR", "algorithm": "teleport"},
+        {"from": "JFK", "to": "LHR", "weight": "comfort"},
+        {"op": "status"},
+        {"op": "reload", "snapshot": os.path.join(cleaned_dir, "routes.graph")},
+    ])
+    assert bad_algorithm["error"].startswith("ValueError") and bad_weight["error"].startswith("KeyError")
+    graph = read_snapshot(os.path.join(cleaned_dir, "routes.graph"))
+    assert status["served"] == 0
+    assert status["graph"]["nodes"] == reloaded["reloaded"]["nodes"] == len(graph.node_codes)
+    assert reloaded["reloaded"]["loaded_at"] >= status["graph"]["loaded_at"]
+
+def test_pipelined_requests_are_bounded(cleaned_dir, tmp_path, snapshot_graph):
+    server = make_server(cleaned_dir, max_in_flight=3)
+    dispatch = server._dispatch
+    pending = [0, 0]  # now, most at once
+
+    async def counted(message):
+        pending[0] += 1
+        pending[1] = max(pending)
+        try:
+            return await dispatch(message)
+        finally:
+            pending[0] -= 1
+    server._dispatch = counted
+    codes = snapshot_graph.node_codes
+    messages = [{"from": codes[i], "to": codes[-1 - i]} for i in range(100)]
+    with running(server, str(tmp_path / "routes.sock")) as address:
+        responses = send_requests(address, messages)
+        status, = send_requests(address, [{"op": "status"}])
+    assert [r["path"] for r in responses] == [snapshot_graph.dijkstra(m["from"], m["to"])[1] for m in messages]
+    assert pending[1] == 3 and status["stalls"] > 0
@@ -0,0 +1,55 @@
+import random
+import numpy as np
+import pytest
+from src.graph.reachability import ReachabilityIndex
+
+def _bfs(graph, s):
+    seen = {s}
+    stack = [s]
+    while stack:
+        u = stack.pop()
+        for v in graph.targets[graph.offsets[u]:graph.offsets[u + 1]].tolist():
+            if v not in seen:
+                seen.add(v)
+                stack.append(v)
+    return seen
+
+@pytest.mark.parametrize("seed", range(4))
+def test_reachable_matches_search(make_graph, seed):
+    # Sparse graphs, so there are several components and one-way links between them
+    graph = make_graph(seed, nodes=40, edges=60)
+    index = ReachabilityIndex.build(graph.offsets, graph.targets)
+    n = len(graph.node_codes)
+    closures = [_bfs(graph, s) for s in range(n)]
+    assert 1 < index.num_components < n
+    for s in range(n):
+        for t in range(n):
+            assert index.reachable(s, t) == (t in closures[s])
+    rng = random.Random(seed)
+    for _ in range(10):
+        nodes = rng.sample(range(n), 3)
+        expected = [any(t in closures[s] for t in nodes) for s in range(n)]
+        np.testing.assert_array_equal(index.reaching(nodes), expected)
+
+def test_graph_rejects_unreachable_pairs(snapshot_graph):
+    graph = snapshot_graph
+    rng = random.Random(5)
+    sources = rng.sample(range(len(graph.node_codes)), 5)
+    for s in sources:
+        closure = _bfs(graph, s)
+        for t in rng.sample(range(len(graph.node_codes)), 60):
+            source, target = graph.node_codes[s], graph.node_codes[t]
+            assert graph.reachable(source, target) == (t in closure)
+            dist, path = graph.dijkstra(source, target)
+            assert (dist is not None) == (t in closure)
+            if t not in closure:
+                assert graph.last_stats.get("rejected") is True
+    assert graph.reachable("ZZZ", "ZZZ") and not graph.reachable("ZZZ", graph.node_codes[0])
+
+def test_one_to_many_skips_unreachable_targets(snapshot_graph):
+    graph = snapshot_graph
+    origin = graph.node_codes[0]
+    unreachable = [c for c in graph.node_codes if not graph.reachable(origin, c)][:5]
+    assert unreachable
+    assert np.isinf(graph.one_to_many(origin, unreachable)).all()
+    assert graph.last_stats["settled"] == 0
@@ -0,0 +1,86 @@
+import random
+import pytest
+
+def _legs(graph, weight_key):
+    """Cheapest weight of each (u, v) leg"""
+    w = graph.weights[weight_key]
+    legs = {}
+    for u in range(len(graph.node_codes)):
+        for slot in range(graph.offsets[u], graph.offsets[u + 1]):
+            key = (u, int(graph.targets[slot]))
+            legs[key] = min(legs.get(key, float("inf")), float(w[slot]))
+    return legs
+
+def _simple_paths(legs, s, t, n):
+    out = {u: [] for u in range(n)}
+    for u, v in legs:
+        if u != v:
+            out[u].append(v)
+    paths, stack = [], [[s]]
+    while stack:
+        path = stack.pop()
+        if path[-1] == t:
+            paths.append(path)
+            continue
+        stack.extend(path + [v] for v in out[path[-1]] if v not in path)
+    return paths
+
+def _cost(legs, path):
+    total = 0.0
+    for u, v in zip(path, path[1:]):
+        total += legs[(u, v)]
+    return total
+
+@pytest.mark.parametrize("seed", range(4))
+def test_k_shortest_paths_match_enumeration(make_graph, seed):
+    graph = make_graph(seed, nodes=9, edges=30)
+    legs = _legs(graph, "distance")
+    n = len(graph.node_codes)
+    rng = random.Random(seed)
+    for _ in range(8):
+        s, t = rng.sample(range(n), 2)
+        source, target = graph.node_codes[s], graph.node_codes[t]
+        expected = sorted(_cost(legs, p) for p in _simple_paths(legs, s, t, n))
+        routes = graph.k_shortest_paths(source, target, k=6)
+        assert [cost for cost, _, _ in routes] == expected[:6]
+        seen = set()
+        for cost, path, airlines in routes:
+            ids = [graph.node_index[c] for c in path]
+            assert path[0] == source and path[-1] == target and len(set(path)) == len(path)
+            assert _cost(legs, ids) == cost and len(airlines) == len(path) - 1
+            assert tuple(path) not in seen
+            seen.add(tuple(path))
+
+def _hop_limited(legs, s, t, n, max_legs):
+    best = [float("inf")] * n
+    best[s] = 0.0
+    for _ in range(max_legs):
+        nxt = list(best)
+        for (u, v), w in legs.items():
+            nxt[v] = min(nxt[v], best[u] + w)
+        best = nxt
+    return best[t]
+
+@pytest.mark.parametrize("seed", range(4))
+def test_hop_limited_path_matches_dynamic_programming(make_graph, seed):
+    graph = make_graph(seed, nodes=12, edges=40)
+    legs = _legs(graph, "delay")
+    n = len(graph.node_codes)
+    for s in range(n):
+        for t in range(n):
+            for max_legs in (1, 2, 3):
+                dist, path = graph.hop_limited_path(graph.node_codes[s], graph.node_codes[t], max_legs, "delay")
+                expected = 0.0 if s == t else _hop_limited(legs, s, t, n, max_legs)
+                if expected == float("inf"):
+                    assert (dist, path) == (None, [])
+                    continue
+                assert dist == expected and len(path) - 1 <= max_legs
+                assert _cost(legs, [graph.node_index[c] for c in path]) == dist
+
+def test_k_shortest_paths_on_routes(snapshot_graph):
+    graph = snapshot_graph
+    origin = graph.node_codes[0]
+    target = next(c for c in graph.node_codes[::-1] if graph.reachable(origin, c))
+    routes = graph.k_shortest_paths(origin, target, k=5, weight_key="cost")
+    assert routes[0][0] == graph.dijkstra(origin, target, "cost")[0]
+    assert [r[0] for r in routes] == sorted(r[0] for r in routes)
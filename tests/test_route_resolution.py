@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.graph.cleaning import (build_airport_id_map, clean_airports, clean_route_chunk, load_airports_local,
+                                load_routes_local)
+
+@pytest.fixture(scope="module")
+def inputs(raw_data):
+    airports_raw = load_airports_local(raw_data[0])
+    airports_clean = clean_airports(airports_raw)
+    routes = load_routes_local(raw_data[1])
+    # Cases the raw sample may lack: case and spaces, unknown codes with and without a good ID
+    extra = routes.iloc[:6].copy()
+    extra["Source airport"] = [" jfk ", "YYY", "ZZZ", "ZZZ", "lhr", "\\N"]
+    extra["Source airport ID"] = [np.nan, 3797.0, 507.0, np.nan, 99999999.0, np.nan]
+    extra["Destination airport"] = ["cdg", "ZZY", "fra", "\\N", "QQQ", "LAX"]
+    extra["Destination airport ID"] = [1382.0, np.nan, np.nan, 340.0, np.nan, 3484.0]
+    routes = pd.concat([routes, extra], ignore_index=True)
+    return airports_raw, airports_clean, routes
+
+def resolve_rowwise(routes, airports_clean, airports_raw):
+    """The row-at-a-time resolution the vectorized code replaced: code first, then the first raw row of the ID"""
+    first_by_id = {}
+    for aid, iata, icao in zip(airports_raw["Airport ID"], airports_raw["IATA"], airports_raw["ICAO"]):
+        primary = iata if isinstance(iata, str) else icao
+        first_by_id.setdefault(float(aid), primary.strip().upper() if isinstance(primary, str) else primary)
+    known = set(airports_clean.index)
+
+    def resolve(code, aid):
+        if code in known:
+            return code
+        try:
+            primary = first_by_id.get(float(aid))
+        except (TypeError, ValueError):
+            return None
+        return primary if primary in known else None
+
+    resolved, log = {}, []
+    for i, row in routes.iterrows():
+        src_code = str(row["Source airport"]).strip().upper()
+        dst_code = str(row["Destination airport"]).strip().upper()
+        src = resolve(src_code, row["Source airport ID"])
+        dst = resolve(dst_code, row["Destination airport ID"])
+        if src is None or dst is None:
+            reason = []
+            if src is None:
+                reason.append(f"src_unresolved:{src_code}|ID:{row['Source airport ID']}")
+            if dst is None:
+                reason.append(f"dst_unresolved:{dst_code}|ID:{row['Destination airport ID']}")
+            log.append((i, ";".join(reason), src_code, dst_code))
+        else:
+            resolved[i] = (src, dst)
+    return resolved, log
+
+def test_vectorized_resolution_matches_rowwise(inputs):
+    airports_raw, airports_clean, routes = inputs
+    expected, expected_log = resolve_rowwise(routes, airports_clean, airports_raw)
+    resolved_df, log, summary = clean_route_chunk(routes.copy(), airports_clean,
+                                                  build_airport_id_map(airports_clean, airports_raw))
+    assert list(log.itertuples(index=False, name=None)) == expected_log
+    got = dict(zip(resolved_df.index, zip(resolved_df["Source airport"], resolved_df["Destination airport"])))
+    # Routes resolved to an airport without coordinates are dropped after resolution
+    assert got == {i: pair for i, pair in expected.items() if i in got}
+    assert summary["dropped_due_distance"] == len(expected) - len(got)
+    assert summary["unresolved_logged"] == len(expected_log) and summary["total_input"] == len(routes)
+    # The injected rows exercise each path
+    tail = len(routes) - 6
+    assert got[tail] == ("JFK", "CDG") and got[tail + 2] == ("LHR", "FRA")
+    assert {i for i, *_ in expected_log} >= {tail + 1, tail + 3, tail + 4, tail + 5}
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import socket
+import threading
+from src.baggage.scan_ingest import ScanIngestor, ScanIngestPipeline, synthetic_scan_events, write_scan_events
+
+def state(ingestor):
+    """Queued bags per checkpoint in pop order, locations and lost bags"""
+    queues = {}
+    for checkpoint, heap in ingestor.queues.items():
+        live = sorted((e for e in heap.heap if e[3] is not None), key=lambda e: (e[0], e[1]))
+        queues[checkpoint] = [(e[3].passenger_id, e[3].priority, e[3].risk_level) for e in live]
+    lost = {bag_id: node.last_checkpoint for bag_id, node in ingestor.tracker.lookup.items()}
+    return queues, dict(ingestor.location), lost
+
+def test_synthetic_stream_is_consistent():
+    ingestor = ScanIngestor()
+    ingestor.apply_batch(list(synthetic_scan_events(20_000, seed=5, in_flight=300, lost_rate=0.02)))
+    assert ingestor.stats["errors"] == 0 and ingestor.stats["events"] == 20_000
+    assert sum(ingestor.queued().values()) == len(ingestor.location) <= 300
+    for bag_id, checkpoint in ingestor.location.items():
+        assert bag_id in ingestor.queues[checkpoint]
+    assert list(synthetic_scan_events(50, seed=5)) == list(synthetic_scan_events(50, seed=5))
+
+def test_pop_then_scan():
+    ingestor = ScanIngestor()
+    ingestor.apply_batch(['{"event": "scan", "bag": "B1", "checkpoint": "Security", "priority": 3, '
+                          '"bag_type": "fragile", "risk_level": "low"}',
+                          '{"event": "scan", "bag": "B2", "checkpoint": "Security", "priority": 1, '
+                          '"bag_type": "check-in", "risk_level": "high"}'])
+    bag = ingestor.pop("Security")
+    assert bag.passenger_id == "B2" and "B2" not in ingestor.location
+    assert ingestor.pop("Gate A") is None
+    # Scanned again after leaving its queue: queued afresh instead of failing
+    ingestor.apply_batch(['{"event": "scan", "bag": "B2", "checkpoint": "Gate A", "priority": 1, '
+                          '"bag_type": "check-in", "risk_level": "high"}'])
+    assert ingestor.location["B2"] == "Gate A" and ingestor.stats["errors"] == 0
+    # Popped from the heap directly, so location is stale; the next scan still queues it
+    ingestor.queues["Security"].pop()
+    ingestor.apply_batch(['{"event": "scan", "bag": "B1", "checkpoint": "Loading", "priority": 3, '
+                          '"bag_type": "fragile", "risk_level": "low"}'])
+    assert ingestor.queued() == {"Security": 0, "Gate A": 1, "Loading": 1}
+    assert ingestor.stats["errors"] == 0
+
+def test_bad_events_are_counted():
+    ingestor = ScanIngestor()
+    ingestor.apply_batch(["not json", '{"event": "teleport", "bag": "B"}', '{"event": "load", "bag": "B"}',
+                          "", '{"event": "lost", "bag": "B", "checkpoint": "Belt 3"}'])
+    assert ingestor.stats["errors"] == 3 and ingestor.stats["events"] == 4
+    assert ingestor.tracker.lookup["B"].last_checkpoint == "Belt 3"
+
+def test_file_ingest_matches_one_batch(tmp_path):
+    path = write_scan_events(str(tmp_path / "events.jsonl"), 5000, seed=2, in_flight=200, lost_rate=0.02)
+    whole = ScanIngestor()
+    with open(path) as f:
+        whole.apply_batch(f.read().split("\n"))
+    # Tiny reads cut lines across micro-batches; one pending batch forces backpressure
+    pipeline = ScanIngestPipeline(max_pending=1, read_size=97)
+    stats = asyncio.run(pipeline.ingest_file(path))
+    assert stats["events"] == 5000 and stats["batches"] > 1 and pipeline.stats["stalls"] > 0
+    assert state(pipeline.ingestor) == state(whole)
+
+def test_socket_ingest(tmp_path):
+    path = write_scan_events(str(tmp_path / "events.jsonl"), 3000, seed=4, in_flight=100)
+    sock_path = str(tmp_path / "ingest.sock")
+    pipeline = ScanIngestPipeline(read_size=512)
+    loop = asyncio.new_event_loop()
+
+    def run():
+        try:
+            loop.run_until_complete(pipeline.serve(unix_path=sock_path))
+        except asyncio.CancelledError:
+            pass
+    thread = threading.Thread(target=run)
+    thread.start()
+    try:
+        for _ in range(200):
+            if os.path.exists(sock_path):
+                break
+            threading.Event().wait(0.01)
+        with open(path, "rb") as f:
+            lines = f.read().split(b"\n")
+        # Two connections, the second once the first is applied, so arrival order matches the file
+        for half in (0, 1):
+            with socket.socket(socket.AF_UNIX) as sock:
+                sock.connect(sock_path)
+                sock.sendall(b"\n".join(lines[half * 1500:(half + 1) * 1500]) + b"\n")
+            for _ in range(500):
+                if pipeline.ingestor.stats["events"] == (half + 1) * 1500:
+                    break
+                threading.Event().wait(0.01)
+    finally:
+        for task in asyncio.all_tasks(loop):
+            loop.call_soon_threadsafe(task.cancel)
+        thread.join(5)
+        loop.close()
+    whole = ScanIngestor()
+    with open(path) as f:
+        whole.apply_batch(f.read().split("\n"))
+    assert state(pipeline.ingestor) == state(whole)
@@ -0,0 +1,72 @@
+import random
+import pytest
+
+def _pairs(graph, count, seed):
+    rng = random.Random(seed)
+    return [(rng.choice(graph.node_codes), rng.choice(graph.node_codes)) for _ in range(count)]
+
+@pytest.mark.parametrize("weight_key", ["distance", "delay", "cost"])
+@pytest.mark.parametrize("engine", ["astar", "bidirectional_dijkstra"])
+def test_engines_match_dijkstra(snapshot_graph, engine, weight_key):
+    graph = snapshot_graph
+    budget = graph.tree_cache.max_bytes
+    graph.tree_cache.resize(0)
+    try:
+        for a, b in _pairs(graph, 150, 3) + [(graph.node_codes[0], graph.node_codes[0])]:
+            expected = graph.dijkstra(a, b, weight_key)
+            assert getattr(graph, engine)(a, b, weight_key) == expected, (a, b)
+    finally:
+        graph.tree_cache.resize(budget)
+
+RECORDED_AS = {"dijkstra": "dijkstra", "astar": "dijkstra", "bidirectional_dijkstra": "dijkstra", "spfa": "spfa",
+               "bellman_ford_vectorized": "bellman_ford_vectorized", "hop_limited_path": "hop_limited",
+               "k_shortest_paths": "yen"}
+
+@pytest.mark.parametrize("engine", sorted(RECORDED_AS))
+def test_early_exits_replace_last_stats(snapshot_graph, engine):
+    graph = snapshot_graph
+    origin = graph.node_codes[0]
+    reachable = [c for c in graph.node_codes if c != origin and graph.reachable(origin, c)]
+    graph.tree_cache.invalidate()
+    graph.dijkstra(origin, reachable[-1])
+    assert graph.last_stats["settled"] > 0
+    if engine in ("hop_limited_path", "k_shortest_paths"):
+        # These reject unknown codes; an unreachable pair is their early exit
+        unreachable = next(c for c in graph.node_codes if not graph.reachable(origin, c))
+        getattr(graph, engine)(origin, unreachable, 2)
+    else:
+        getattr(graph, engine)("ZZZ", origin)
+    assert graph.last_stats["algorithm"] == RECORDED_AS[engine]
+    for counter in ("settled", "passes", "spur_searches"):
+        assert graph.last_stats.get(counter, 0) == 0
+
+def _lattice(seed, size=7):
+    """size x size grid of airports 0.1 degrees apart, every leg costing 1, so most pairs tie on many paths"""
+    from src.graph.flight_graph import FlightEdge, FlightGraph
+    rng = random.Random(seed)
+    codes = [f"G{i:02d}" for i in rng.sample(range(size * size), size * size)]
+    graph = FlightGraph()
+    for i in range(size):
+        for j in range(size):
+            for di, dj in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+                if 0 <= i + di < size and 0 <= j + dj < size:
+                    graph.add_edge(codes[i * size + j],
+                                   FlightEdge(codes[(i + di) * size + j + dj], "XX", {"distance": 1.0}))
+    graph._compact()
+    graph.set_coordinates(codes, [0.1 * (k // size) for k in range(len(codes))],
+                          [0.1 * (k % size) for k in range(len(codes))])
+    return graph
+
+@pytest.mark.parametrize("engine", ["astar", "bidirectional_dijkstra"])
+def test_engines_break_ties_like_dijkstra(engine, make_graph):
+    graphs = [_lattice(seed) for seed in range(3)] + [make_graph(seed) for seed in range(10)]
+    for graph in graphs:
+        graph.tree_cache.resize(0)
+        for a, b in _pairs(graph, 60, 5):
+            for weight_key in ("distance", "delay"):
+                expected = graph.dijkstra(a, b, weight_key)
+                assert getattr(graph, engine)(a, b, weight_key) == expected, (a, b, weight_key)
+    lattice = graphs[0]
+    # The heuristic is usable on the lattice, so A* really searched rather than running dijkstra
+    lattice.astar(lattice.node_codes[0], lattice.node_codes[-1])
+    assert lattice.last_stats["algorithm"] == "astar"
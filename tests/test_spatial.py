@@ -0,0 +1,52 @@
+import os
+import numpy as np
+import pytest
+from src.graph.geo import haversine_np
+from src.graph.spatial import AirportIndex
+
+@pytest.fixture(scope="module")
+def airports(cleaned_dir):
+    index = AirportIndex.load(os.path.join(cleaned_dir, "airports_index.npz"))
+    return index, np.asarray(index.latitude), np.asarray(index.longitude)
+
+@pytest.fixture(scope="module")
+def points():
+    rng = np.random.default_rng(0)
+    # Include the poles and the antimeridian, where longitude wraps
+    lats = np.concatenate([rng.uniform(-90, 90, 300), [90.0, -90.0, 0.0, 51.5]])
+    lons = np.concatenate([rng.uniform(-180, 180, 300), [0.0, 0.0, 180.0, -179.99]])
+    return lats, lons
+
+def test_nearest_matches_brute_force(airports, points):
+    index, lat, lon = airports
+    lats, lons = points
+    positions, km = index.query(lats, lons, k=5)
+    for i in range(len(lats)):
+        brute = haversine_np(lats[i], lons[i], lat, lon)
+        np.testing.assert_allclose(km[i], np.sort(brute)[:5], atol=1e-6)
+        np.testing.assert_allclose(brute[positions[i]], km[i], atol=1e-6)
+
+def test_radius_matches_brute_force(airports, points):
+    index, lat, lon = airports
+    lats, lons = points
+    for radius in (50.0, 400.0):
+        for i, (positions, km) in enumerate(index.query_radius(lats, lons, radius)):
+            brute = haversine_np(lats[i], lons[i], lat, lon)
+            # Leave out airports within rounding of the boundary
+            assert set(np.flatnonzero(brute <= radius - 1e-6)) <= set(positions.tolist())
+            assert set(positions.tolist()) <= set(np.flatnonzero(brute <= radius + 1e-6))
+            assert (np.diff(km) >= 0).all()
+
+def test_single_point_helpers_and_padding(airports):
+    index, _, _ = airports
+    code = index.codes[0]
+    (nearest, km), = index.nearest(index.latitude[0], index.longitude[0])
+    assert km == pytest.approx(0.0, abs=1e-6)
+    assert code in [c for c, _ in index.within(index.latitude[0], index.longitude[0], 1.0)]
+    small = AirportIndex(["A", "B"], [0.0, 1.0], [0.0, 1.0])
+    positions, km = small.query(0.0, 0.0, k=4)
+    assert positions[0].tolist()[2:] == [-1, -1] and np.isinf(km[0, 2:]).all()
+
+def test_from_graph_uses_graph_nodes(snapshot_graph):
+    index = AirportIndex.from_graph(snapshot_graph)
+    assert set(index.codes) <= set(snapshot_graph.node_codes)
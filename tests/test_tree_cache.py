@@ -0,0 +1,93 @@
+import os
+import random
+import numpy as np
+import pytest
+from src.graph.flight_graph import TreeCache
+from src.graph.graph_snapshot import read_snapshot
+
+@pytest.fixture
+def graphs(cleaned_dir):
+    """The same graph twice: with the default tree cache and with caching off"""
+    path = os.path.join(cleaned_dir, "routes.graph")
+    cached, plain = read_snapshot(path), read_snapshot(path)
+    plain.tree_cache.resize(0)
+    return cached, plain
+
+def test_covers():
+    dist = np.array([0.0, 2.0, 5.0, np.inf, -np.inf])
+    assert TreeCache.covers(dist, np.inf, None) and TreeCache.covers(dist, np.inf, 3)
+    assert TreeCache.covers(dist, 5.0, 1) and TreeCache.covers(dist, 5.0, 2)
+    assert not TreeCache.covers(dist, 2.0, 2)
+    assert not TreeCache.covers(dist, 5.0, 3) and not TreeCache.covers(dist, 5.0, 4)
+    assert not TreeCache.covers(dist, 5.0, None)
+
+def test_lru_budget_and_invalidation():
+    tree = lambda: (np.zeros(100), np.zeros(100, dtype=np.int32))  # 1200 bytes
+    cache = TreeCache(max_bytes=3000)
+    cache.put(1, "distance", *tree())
+    cache.put(2, "distance", *tree())
+    assert cache.get(1, "distance") is not None
+    cache.put(3, "delay", *tree())
+    # 2 was least recently used
+    assert len(cache) == 2 and cache.evictions == 1 and cache.get(2, "distance") is None
+    cache.invalidate("delay")
+    assert len(cache) == 1 and cache.nbytes == 1200
+    cache.resize(0)
+    assert len(cache) == 0 and cache.nbytes == 0
+    dist, _ = tree()
+    cache.resize(3000)
+    cache.put(1, "distance", dist, np.zeros(100, dtype=np.int32), radius=1.0)
+    assert not dist.flags.writeable
+    assert cache.get(1, "distance") is None and cache.get(1, "distance", 5) is not None
+
+@pytest.mark.parametrize("weight_key", ["distance", "delay"])
+def test_cached_answers_match_fresh_searches(graphs, weight_key):
+    cached, plain = graphs
+    rng = random.Random(11)
+    origins = rng.sample(cached.node_codes, 8)
+    pairs = [(rng.choice(origins), rng.choice(cached.node_codes)) for _ in range(400)]
+    for a, b in pairs:
+        assert cached.dijkstra(a, b, weight_key) == plain.dijkstra(a, b, weight_key), (a, b)
+    stats = cached.tree_cache.stats()
+    assert stats["hits"] > stats["misses"] > 0
+    assert stats["entries"] <= len(origins)
+
+def test_miss_runs_the_targeted_search(graphs):
+    cached, plain = graphs
+    graph = cached
+    origin = graph.node_codes[0]
+    targets = [c for c in graph.node_codes if c != origin and graph.reachable(origin, c)]
+    near = min(targets, key=lambda c: plain.dijkstra(origin, c)[0])
+    far = max(targets, key=lambda c: plain.dijkstra(origin, c)[0])
+
+    # A miss settles exactly what the uncached search settles, not the whole tree
+    plain.dijkstra(origin, near)
+    cached.dijkstra(origin, near)
+    assert cached.last_stats["cache"] == "miss"
+    assert cached.last_stats["settled"] == plain.last_stats["settled"] < len(targets)
+
+    # The kept part of the tree does not reach the far airport: a second miss grows it
+    cached.dijkstra(origin, far)
+    assert cached.last_stats["cache"] == "miss"
+    cached.dijkstra(origin, near)
+    assert cached.last_stats == {"algorithm": "dijkstra", "settled": 0, "cache": "hit"}
+
+def test_partial_trees_do_not_answer_one_to_all(graphs):
+    cached, plain = graphs
+    origin = cached.node_codes[0]
+    target = next(c for c in cached.node_codes[::-1] if cached.reachable(origin, c))
+    cached.dijkstra(origin, target)
+    dist, pred = cached.one_to_all(origin)
+    assert cached.last_stats["cache"] == "miss"
+    np.testing.assert_array_equal(dist, plain.one_to_all(origin)[0])
+    # The full tree now answers point queries too
+    cached.dijkstra(origin, target)
+    assert cached.last_stats["cache"] == "hit"
+
+def test_weight_changes_drop_cached_trees(graphs):
+    cached, _ = graphs
+    origin = cached.node_codes[0]
+    cached.one_to_all(origin, "delay")
+    assert len(cached.tree_cache) == 1
+    cached.set_weights("delay", np.asarray(cached.weights["delay"]) + 1.0)
+    assert len(cached.tree_cache) == 0
@@ -0,0 +1,78 @@
+import os
+import random
+import numpy as np
+import pytest
+from src.graph.graph_snapshot import read_snapshot
+
+def _fresh_tree(graph, source, weight_key):
+    dist, prev, _ = graph._shortest_path_tree(graph.node_index[source], graph.weights[weight_key])
+    return np.array(dist), np.array(prev)
+
+def _assert_valid_tree(graph, source, weight_key):
+    dist, pred = graph.watched_tree(source, weight_key)
+    expected, _ = _fresh_tree(graph, source, weight_key)
+    np.testing.assert_array_equal(dist, expected)
+    w = graph.weights[weight_key]
+    s = graph.node_index[source]
+    for v in np.flatnonzero(np.isfinite(dist)):
+        if v == s:
+            continue
+        u = pred[v]
+        slots = np.arange(graph.offsets[u], graph.offsets[u + 1])
+        slots = slots[graph.targets[slots] == v]
+        # pred[v] reaches v at exactly its distance
+        assert (dist[u] + w[slots] == dist[v]).any(), (source, graph.node_codes[v])
+
+def _random_updates(graph, rng, weight_key, rounds, batch):
+    w = graph.weights[weight_key]
+    for _ in range(rounds):
+        slots = rng.sample(range(len(graph.targets)), batch)
+        values = []
+        for slot in slots:
+            r = rng.random()
+            values.append(np.inf if r < 0.1 else float(w[slot]) * rng.choice((0.0, 0.5, 2.0, 10.0))
+                          if r < 0.6 else float(rng.randint(0, 4)))
+        graph.update_weights(weight_key, slots, values)
+        yield
+
+@pytest.mark.parametrize("seed", range(5))
+def test_repair_matches_rebuild_on_small_graphs(make_graph, seed):
+    graph = make_graph(seed, nodes=25, edges=100)
+    rng = random.Random(seed)
+    sources = rng.sample(graph.node_codes, 4)
+    for source in sources:
+        graph.watch(source, "distance")
+        graph.watched_tree(source, "distance")
+    for _ in _random_updates(graph, rng, "distance", rounds=30, batch=3):
+        for source in sources:
+            _assert_valid_tree(graph, source, "distance")
+
+def test_repair_on_routes(cleaned_dir):
+    graph = read_snapshot(os.path.join(cleaned_dir, "routes.graph"))
+    rng = random.Random(3)
+    sources = rng.sample(graph.node_codes, 3)
+    for source in sources:
+        graph.watch(source, "delay")
+        graph.watched_tree(source, "delay")
+    for _ in _random_updates(graph, rng, "delay", rounds=8, batch=20):
+        assert graph.last_stats["algorithm"] == "repair" and graph.last_stats["trees"] == len(sources)
+        for source in sources:
+            _assert_valid_tree(graph, source, "delay")
+    # dijkstra answers from the repaired tree
+    target = next(c for c in graph.node_codes[::-1] if graph.reachable(sources[0], c))
+    graph.dijkstra(sources[0], target, "delay")
+    assert graph.last_stats["cache"] == "watched"
+
+def test_update_route_and_unwatched_metrics(cleaned_dir):
+    graph = read_snapshot(os.path.join(cleaned_dir, "routes.graph"))
+    source = graph.node_codes[0]
+    graph.watch(source, "delay")
+    graph.watched_tree(source, "delay")
+    edge_source = graph.node_codes[int(np.flatnonzero(np.diff(graph.offsets))[0])]
+    target = graph.node_codes[int(graph.targets[graph.offsets[graph.node_index[edge_source]]])]
+    assert graph.update_route(edge_source, target, "delay", 500.0) >= 1
+    assert (graph.weights["delay"][graph.edge_slots(edge_source, target)] == 500.0).all()
+    _assert_valid_tree(graph, source, "delay")
+    # Replacing the whole metric marks the tree for regrowing instead of repairing it
+    graph.set_weights("delay", np.zeros(len(graph.targets)))
+    _assert_valid_tree(graph, source, "delay")